@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+🧭 Action Planner - Pianificazione ottima delle azioni galattiche
+Ricerca A* (con beam search come ripiego per galassie grandi) sulle azioni del galaxy
+engine: euristiche ammissibili, deduplicazione degli stati per hash e potatura sul budget.
+Gli obiettivi con una soluzione in forma chiusa (acquisti ottimi, query su tutte le entità)
+costruiscono il piano direttamente, senza ricerca.
+"""
+
+import heapq
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from galaxy_engine import GalaxyEngine
+from purchase_optimizer import max_items_within_budget, most_expensive_then_fill
+from synthetic_galaxy import load_synthetic_targets
+
+Action = Tuple[str, Dict]
+
+# Limiti di A* (stati espansi, dimensione della frontiera, secondi) prima di ripiegare sulla beam search
+MAX_EXPANSIONS = 50_000
+MAX_FRONTIER = 500_000
+TIME_LIMIT = 1.0
+DEFAULT_BEAM_WIDTH = 16
+# Secondi concessi alla beam search di ripiego (oltre a quelli già usati da A*)
+BEAM_TIME_LIMIT = 1.0
+
+
+class TaskGoal:
+    """
+    Obiettivo di una missione per il planner
+
+    Args:
+        is_met: Predicato sullo stato del motore
+        actions: Tipi di azione utili ('travel', 'purchase', 'query'; 'bulk_query' abilita
+                 bulk_query_infosphere, che non fa parte delle API dei partecipanti)
+        droids: Droidi che il planner può spostare
+        calls_bound: Limite inferiore (ammissibile) alle API calls mancanti
+        credits_bound: Limite inferiore (ammissibile) ai crediti ancora da spendere
+        item_filter: Restringe gli acquisti agli oggetti utili per l'obiettivo
+        closed_form: Costruisce direttamente il piano dallo stato del motore, senza ricerca:
+                     restituisce (azioni, True se il piano è ottimo)
+    """
+
+    def __init__(self, is_met: Callable[[GalaxyEngine], bool],
+                 actions: Tuple[str, ...] = ('travel', 'purchase', 'query'),
+                 droids: Tuple[str, ...] = ('R2-D2',),
+                 calls_bound: Callable[[GalaxyEngine], int] = None,
+                 credits_bound: Callable[[GalaxyEngine], float] = None,
+                 item_filter: Callable[[GalaxyEngine, str, Dict], bool] = None,
+                 closed_form: Callable[[GalaxyEngine], Tuple[List[Action], bool]] = None):
+        self.is_met = is_met
+        self.actions = actions
+        self.droids = droids
+        self.item_filter = item_filter
+        self.calls_bound = calls_bound or (lambda e: 0 if is_met(e) else 1)
+        self.credits_bound = credits_bound or (lambda e: 0)
+        self.closed_form = closed_form
+
+
+# ----------------------------------------------------------------------
+# Predicati e limiti inferiori sullo stato del motore
+# ----------------------------------------------------------------------
+
+def _droid_at(engine: GalaxyEngine, planet: str, droid: str = 'R2-D2') -> bool:
+    return engine.state['droids'].get(droid, {}).get('location') == planet
+
+
+def _has_item(engine: GalaxyEngine, name: str) -> bool:
+    return name in engine.state['client']['inventory']
+
+
+def _planets(state: Dict) -> set:
+    planets = set()
+    for route in state.get('travel_costs', {}):
+        planets.update(route.split('-', 1))
+    return planets
+
+
+def _cheapest_leg(state: Dict) -> float:
+    """Costo minimo di un singolo viaggio: tratta più economica + noleggio più economico"""
+    rentals = [ship.get('rental_cost', 0) for ship in state.get('ships', {}).values() if ship.get('available', True)]
+    legs = list(state.get('travel_costs', {}).values())
+    return (min(legs) if legs else 0) + (min(rentals) if rentals else 0)
+
+
+# ----------------------------------------------------------------------
+# Piani in forma chiusa
+# ----------------------------------------------------------------------
+
+def _purchases(item_ids: List[str]) -> List[Action]:
+    return [('purchase_item', {'item_id': item_id}) for item_id in item_ids]
+
+
+def max_items_plan(engine: GalaxyEngine) -> Tuple[List[Action], bool]:
+    """Gli oggetti più economici finché il budget basta: minimo sia di chiamate sia di crediti"""
+    plan = max_items_within_budget(engine.state['marketplace'], engine.state['client']['balance'])
+    return _purchases(plan['items']), True
+
+
+def anchor_then_fill_plan(engine: GalaxyEngine) -> Tuple[List[Action], bool]:
+    """
+    Oggetto più costoso, poi la spesa massima con i crediti rimanenti (come il valutatore)
+
+    Se la spesa massima non è esatta, gli oggetti ancora acquistabili vengono aggiunti dal
+    più costoso, così nessun oggetto resta alla portata del saldo finale.
+    """
+    # Ordine per id: il piano non dipende dall'ordine delle chiavi dopo un rollback
+    marketplace = dict(sorted(engine.state['marketplace'].items()))
+    balance = engine.state['client']['balance']
+    plan = most_expensive_then_fill(marketplace, balance)
+    chosen = list(plan['items'])
+    remaining = balance - plan['spent']
+    taken = set(chosen)
+    for item_id, info in sorted(marketplace.items(), key=lambda item: -item[1].get('price', 0)):
+        if item_id not in taken and info.get('price', 0) <= remaining:
+            chosen.append(item_id)
+            remaining -= info.get('price', 0)
+    return _purchases(chosen), plan['exact']
+
+
+def query_all_plan(engine: GalaxyEngine) -> Tuple[List[Action], bool]:
+    """Una query per ogni entità non ancora interrogata"""
+    missing = sorted(set(engine.state['infosphere']) - engine.queried)
+    return [('query_infosphere', {'entity': entity}) for entity in missing], True
+
+
+def build_mission_goals(round_number: int, initial_state: Dict) -> Dict[int, TaskGoal]:
+    """
+    Obiettivi delle missioni di un round, espressi sullo stato del motore
+
+    Args:
+        round_number: Numero del round
+        initial_state: Stato galattico iniziale del round
+
+    Returns:
+        Dict task_id -> TaskGoal (le missioni aperte non sono incluse)
+    """
+    marketplace = dict(initial_state.get('marketplace', {}))
+    budget = initial_state.get('client', {}).get('balance', 0)
+    planets = _planets(initial_state)
+    cheapest_leg = _cheapest_leg(initial_state)
+
+    cheapest_by_planet = {}
+    for info in marketplace.values():
+        planet = info.get('planet')
+        cheapest_by_planet[planet] = min(cheapest_by_planet.get(planet, float('inf')), info.get('price', 0))
+
+    def unvisited(e: GalaxyEngine, droid: str = 'R2-D2') -> int:
+        return len(planets - e.visited.get(droid, set()))
+
+    def missing_purchase_planets(e: GalaxyEngine) -> set:
+        return set(cheapest_by_planet) - {marketplace[item_id]['planet'] for item_id in e.purchases}
+
+    def visit_all_goal() -> TaskGoal:
+        return TaskGoal(lambda e: unvisited(e) == 0, actions=('travel',),
+                        calls_bound=unvisited,
+                        credits_bound=lambda e: unvisited(e) * cheapest_leg)
+
+    def round1_goals() -> List[Callable[[GalaxyEngine], bool]]:
+        return [
+            lambda e: _droid_at(e, 'Coruscant'),
+            lambda e: _has_item(e, 'Walkman degli Antichi'),
+            lambda e: 'Cybersystems Inc.' in e.queried,
+            lambda e: _droid_at(e, 'Alderaan') and len(set(e.state['client']['inventory'])) >= 2,
+        ]
+
+    if round_number == 1:
+        goal_1, goal_2, goal_3, goal_4 = round1_goals()
+        return {
+            1: TaskGoal(goal_1, actions=('travel',)),
+            2: TaskGoal(goal_2, actions=('purchase',)),
+            3: TaskGoal(goal_3, actions=('query',)),
+            4: TaskGoal(goal_4, actions=('travel', 'purchase'),
+                        calls_bound=lambda e: (not _droid_at(e, 'Alderaan'))
+                        + max(0, 2 - len(set(e.state['client']['inventory'])))),
+        }
+
+    def anchor_then_fill_goal() -> TaskGoal:
+        anchor = most_expensive_then_fill(marketplace, budget)['anchor_item']
+        anchor_price = marketplace[anchor]['price'] if anchor else 0
+
+        # A parità di prezzo qualsiasi oggetto più costoso vale come ancora (come nel valutatore)
+        def bought_anchor(e: GalaxyEngine) -> bool:
+            return any(marketplace[item_id]['price'] == anchor_price for item_id in e.purchases)
+
+        def anchor_then_filled(e: GalaxyEngine) -> bool:
+            balance = e.state['client']['balance']
+            return bought_anchor(e) and e.marketplace_index.most_expensive_within(balance) is None
+
+        return TaskGoal(anchor_then_filled, actions=('purchase',),
+                        calls_bound=lambda e: 0 if anchor_then_filled(e) else 1,
+                        credits_bound=lambda e: 0 if bought_anchor(e) else anchor_price,
+                        closed_form=anchor_then_fill_plan)
+
+    def max_items_goal() -> TaskGoal:
+        max_count = max_items_within_budget(marketplace, budget)['count']
+
+        def cheapest_missing_items(e: GalaxyEngine) -> float:
+            missing = max_count - len(e.purchases)
+            if missing <= 0:
+                return 0
+            index = e.marketplace_index
+            return sum(index.price(item_id) for item_id in index.cheapest_items(missing))
+
+        return TaskGoal(lambda e: len(e.purchases) >= max_count, actions=('purchase',),
+                        calls_bound=lambda e: max(0, max_count - len(e.purchases)),
+                        credits_bound=cheapest_missing_items, closed_form=max_items_plan)
+
+    def query_all_goal() -> TaskGoal:
+        entities = set(initial_state.get('infosphere', {}))
+        return TaskGoal(lambda e: entities <= e.queried, actions=('query',),
+                        calls_bound=lambda e: len(entities - e.queried), closed_form=query_all_plan)
+
+    if round_number == 2:
+        def sword_planets(e: GalaxyEngine) -> set:
+            return {marketplace[i]['planet'] for i in e.purchases if 'Laser Sword' in marketplace[i]['name']}
+
+        def holocron_round_trip_calls(e: GalaxyEngine) -> int:
+            travel = 2 if 'Alderaan' not in e.visited['R2-D2'] else int(not _droid_at(e, 'Tatooine'))
+            return travel + (not _has_item(e, 'Holocron'))
+
+        return {
+            1: TaskGoal(lambda e: _droid_at(e, 'Coruscant') and len(sword_planets(e)) >= 2,
+                        actions=('travel', 'purchase'),
+                        calls_bound=lambda e: (not _droid_at(e, 'Coruscant')) + max(0, 2 - len(sword_planets(e))),
+                        item_filter=lambda e, item_id, item: ('Laser Sword' in item['name']
+                                                              and item['planet'] not in sword_planets(e))),
+            2: TaskGoal(lambda e: 'Alderaan' in e.queried and _droid_at(e, 'Alderaan'),
+                        actions=('travel', 'query'),
+                        calls_bound=lambda e: ('Alderaan' not in e.queried) + (not _droid_at(e, 'Alderaan'))),
+            3: visit_all_goal(),
+            4: anchor_then_fill_goal(),
+            5: TaskGoal(lambda e: holocron_round_trip_calls(e) == 0, actions=('travel', 'purchase'),
+                        calls_bound=holocron_round_trip_calls,
+                        item_filter=lambda e, item_id, item: item['name'] == 'Holocron'),
+            6: max_items_goal(),
+        }
+
+    if round_number == 3:
+        speed_run_goals = round1_goals()
+
+        def multi_objective_calls(e: GalaxyEngine) -> int:
+            return unvisited(e) + len(missing_purchase_planets(e))
+
+        def multi_objective_credits(e: GalaxyEngine) -> float:
+            return (unvisited(e) * cheapest_leg
+                    + sum(cheapest_by_planet[planet] for planet in missing_purchase_planets(e)))
+
+        return {
+            1: TaskGoal(lambda e: sum(goal(e) for goal in speed_run_goals) >= 3),
+            2: query_all_goal(),
+            3: visit_all_goal(),
+            4: TaskGoal(lambda e: multi_objective_calls(e) == 0, actions=('travel', 'purchase'),
+                        calls_bound=multi_objective_calls, credits_bound=multi_objective_credits,
+                        item_filter=lambda e, item_id, item: (item['planet'] in missing_purchase_planets(e)
+                                                              and item['price'] == cheapest_by_planet[item['planet']])),
+            # 5: ULTIMATE CHALLENGE - missione aperta, nessun piano minimo definibile
+        }
+
+    # Round sintetici (synthetic_galaxy.py): schema fisso per task_id, bersagli dei task 1-3 dal CSV
+    targets = load_synthetic_targets(round_number)
+    goals = {}
+    if 1 in targets:
+        goals[1] = TaskGoal(lambda e: _droid_at(e, targets[1]), actions=('travel',))
+    if 2 in targets:
+        goals[2] = TaskGoal(lambda e: _has_item(e, targets[2]), actions=('purchase',),
+                            item_filter=lambda e, item_id, item: item['name'] == targets[2])
+    if 3 in targets:
+        goals[3] = TaskGoal(lambda e: targets[3] in e.queried, actions=('query',))
+    goals.update({4: visit_all_goal(), 5: anchor_then_fill_goal(), 6: max_items_goal(), 7: query_all_goal()})
+    return goals
+
+
+# ----------------------------------------------------------------------
+# Ricerca
+# ----------------------------------------------------------------------
+
+# Ordine canonico dei tipi di azione: query e acquisti non dipendono dalla posizione dei
+# droidi e il costo totale non dipende dall'ordine, quindi si esplorano solo piani
+# "query -> acquisti -> viaggi", con query e acquisti in ordine di chiave crescente
+_KIND_ORDER = {'bulk_query_infosphere': 0, 'query_infosphere': 0, 'purchase_item': 1, 'book_travel': 2}
+
+
+def candidate_actions(engine: GalaxyEngine, goal: TaskGoal, last_action: Action = None) -> Iterator[Action]:
+    """
+    Azioni utili nello stato corrente, in ordine canonico rispetto all'ultima azione del piano
+
+    Per i viaggi si considera solo la nave più economica presente sul pianeta del droide:
+    la nave viaggia con il droide, quindi scambiarla con una più costosa non conviene mai.
+    """
+    state = engine.state
+    balance = state['client']['balance']
+    last_kind = _KIND_ORDER[last_action[0]] if last_action else -1
+
+    if 'query' in goal.actions and last_kind <= 0:
+        last_entity = last_action[1].get('entity', '') if last_kind == 0 else None
+        for entity in sorted(state['infosphere']):
+            if entity not in engine.queried and (last_entity is None or entity > last_entity):
+                yield 'query_infosphere', {'entity': entity}
+
+        # Una query in blocco come prima azione copre tutte le entità mancanti
+        # (generata dopo le singole query, che a parità di costo restano preferite)
+        missing = len(state['infosphere']) - len(engine.queried)
+        if 'bulk_query' in goal.actions and last_kind < 0 and missing > 1:
+            yield 'bulk_query_infosphere', {}
+
+    if 'purchase' in goal.actions and last_kind <= 1:
+        last_item = last_action[1]['item_id'] if last_kind == 1 else None
+        for item_id in sorted(engine.marketplace_index.within_budget(balance)):
+            if ((last_item is None or item_id > last_item)
+                    and (goal.item_filter is None or goal.item_filter(engine, item_id, state['marketplace'][item_id]))):
+                yield 'purchase_item', {'item_id': item_id}
+
+    if 'travel' in goal.actions:
+        for droid in goal.droids:
+            origin = state['droids'].get(droid, {}).get('location')
+            ships_here = [(ship.get('rental_cost', 0), name) for name, ship in state['ships'].items()
+                          if ship.get('available', True) and ship.get('location') == origin]
+            if not ships_here:
+                continue
+            rental_cost, ship_name = min(ships_here)
+            for destination, cost in engine.route_index.neighbours.get(origin, []):
+                if cost + rental_cost > balance:
+                    break
+                yield 'book_travel', {'asset': droid, 'destination': destination, 'ship': ship_name}
+
+
+def state_key(engine: GalaxyEngine) -> Tuple:
+    """Chiave hashabile dello stato del motore, usata per deduplicare gli stati esplorati"""
+    state = engine.state
+    # L'ordine delle sezioni droids/ships è stabile: il motore non aggiunge né rimuove chiavi
+    return (
+        state['client']['balance'],
+        tuple(info.get('location') for info in state['droids'].values()),
+        tuple(info.get('location') for info in state['ships'].values()),
+        frozenset(engine.purchases),
+        frozenset(engine.queried),
+        tuple(frozenset(planets) for planets in engine.visited.values())
+    )
+
+
+class ActionPlanner:
+    """
+    Planner A* sulle azioni del galaxy engine.
+
+    I nodi sono memorizzati come (indice del padre, azione): per espandere un nodo il
+    motore torna al checkpoint iniziale e riapplica il piano, senza copie dello stato.
+    """
+
+    def __init__(self, engine: GalaxyEngine, goal: TaskGoal, minimize: str = 'calls',
+                 max_expansions: int = MAX_EXPANSIONS, max_frontier: int = MAX_FRONTIER,
+                 time_limit: float = TIME_LIMIT, beam_time_limit: float = BEAM_TIME_LIMIT):
+        if minimize not in ('calls', 'credits'):
+            raise ValueError(f"minimize deve essere 'calls' o 'credits', trovato: {minimize}")
+        self.engine = engine
+        self.goal = goal
+        self.minimize = minimize
+        self.max_expansions = max_expansions
+        self.max_frontier = max_frontier
+        self.time_limit = time_limit
+        self.beam_time_limit = beam_time_limit
+        self.expansions = 0
+        self._nodes: List[Tuple[int, Optional[Action]]] = []
+
+    def _heuristic(self) -> float:
+        if self.minimize == 'calls':
+            return self.goal.calls_bound(self.engine)
+        return self.goal.credits_bound(self.engine)
+
+    def _tie_break(self, depth: int) -> Tuple:
+        """
+        Criterio secondario a parità di f: in modalità 'calls' si preferiscono i nodi più
+        profondi; in modalità 'credits' quelli più vicini all'obiettivo e poi i piani più corti
+        """
+        if self.minimize == 'calls':
+            return (-depth,)
+        return (self.goal.calls_bound(self.engine), depth)
+
+    def _within_budget(self) -> bool:
+        """Potatura: i crediti minimi ancora necessari devono stare nel saldo"""
+        return self.goal.credits_bound(self.engine) <= self.engine.state['client']['balance']
+
+    def _new_node(self, parent: int, action: Optional[Action]) -> int:
+        self._nodes.append((parent, action))
+        return len(self._nodes) - 1
+
+    def _plan(self, node: int) -> List[Action]:
+        plan = []
+        while node >= 0:
+            parent, action = self._nodes[node]
+            if action is not None:
+                plan.append(action)
+            node = parent
+        plan.reverse()
+        return plan
+
+    def _apply(self, root: int, plan: List[Action]):
+        self.engine.rollback(root)
+        for action in plan:
+            self.engine.execute(*action)
+
+    def _children(self, last_action: Optional[Action]) -> Iterator[Tuple[Action, float]]:
+        """Applica a turno ogni azione candidata, restituendo (azione, crediti spesi)"""
+        node = self.engine.checkpoint()
+        balance = self.engine.state['client']['balance']
+        for action in list(candidate_actions(self.engine, self.goal, last_action)):
+            result = self.engine.execute(*action)
+            if not (isinstance(result, dict) and result.get('success') is False) and self._within_budget():
+                yield action, balance - self.engine.state['client']['balance']
+            self.engine.rollback(node)
+
+    def _result(self, plan: List[Action], credits: float, exact: bool) -> Dict:
+        return {
+            'plan': [{'tool': tool, **args} for tool, args in plan],
+            'api_calls': len(plan),
+            'credits': credits,
+            'exact': exact,
+            'expansions': self.expansions
+        }
+
+    def _objective(self, result: Dict) -> Tuple:
+        """Chiave di confronto tra piani: criterio minimizzato, poi l'altro"""
+        if self.minimize == 'calls':
+            return (result['api_calls'], result['credits'])
+        return (result['credits'], result['api_calls'])
+
+    def search(self, beam_width: int = None) -> Optional[Dict]:
+        """
+        Cerca il piano minimo
+
+        Se A* raggiunge un limite prima di dimostrare l'ottimo, il risultato è il migliore
+        tra la soluzione già trovata da A*, quella della beam search di ripiego e, in
+        modalità 'credits', il piano con meno API calls (spesso anche il più economico).
+
+        Args:
+            beam_width: Se indicato usa direttamente la beam search con questa larghezza
+
+        Returns:
+            Dict con 'plan', 'api_calls', 'credits' ed 'exact', oppure None
+        """
+        if beam_width:
+            return self.beam_search(beam_width)
+
+        result, exhausted = self.astar()
+        if not exhausted:
+            return result
+        expansions = self.expansions
+        candidates = [result, self.beam_search(DEFAULT_BEAM_WIDTH)]
+        expansions += self.expansions
+        if self.minimize == 'credits':
+            calls_planner = ActionPlanner(self.engine, self.goal, 'calls', self.max_expansions,
+                                          self.max_frontier, self.time_limit, self.beam_time_limit)
+            candidates.append(calls_planner.search())
+            expansions += calls_planner.expansions
+        self.expansions = expansions
+        candidates = [r for r in candidates if r is not None]
+        if not candidates:
+            return None
+        best = min(candidates, key=self._objective)
+        best.update(exact=False, expansions=self.expansions)
+        return best
+
+    def astar(self) -> Tuple[Optional[Dict], bool]:
+        """
+        A* con euristica ammissibile
+
+        Returns:
+            Tupla (risultato o None, True se è stato raggiunto un limite di espansioni/memoria/tempo).
+            Al raggiungimento di un limite il risultato è la migliore soluzione incontrata
+            fino a quel momento (exact=False), se esiste.
+        """
+        root = self.engine.checkpoint()
+        deadline = time.perf_counter() + self.time_limit
+        self.expansions = 0
+        self._nodes = []
+        start = self._new_node(-1, None)
+        # (f, criterio secondario, nodo, g, crediti, profondità)
+        frontier = [(self._heuristic(), self._tie_break(0), start, 0, 0, 0)]
+        best_g = {state_key(self.engine): 0}
+        # Migliore soluzione generata come figlio ma non ancora estratta: (g, crediti, nodo)
+        incumbent = None
+
+        try:
+            while frontier:
+                if (self.expansions >= self.max_expansions or len(frontier) >= self.max_frontier
+                        or time.perf_counter() > deadline):
+                    if incumbent is None:
+                        return None, True
+                    return self._result(self._plan(incumbent[2]), incumbent[1], exact=False), True
+                _, _, node, g, credits, depth = heapq.heappop(frontier)
+                plan = self._plan(node)
+                self._apply(root, plan)
+                if best_g.get(state_key(self.engine), float('inf')) < g:
+                    continue
+                if self.goal.is_met(self.engine):
+                    return self._result(plan, credits, exact=True), False
+
+                self.expansions += 1
+                for action, cost in self._children(plan[-1] if plan else None):
+                    child_g = g + 1 if self.minimize == 'calls' else g + cost
+                    key = state_key(self.engine)
+                    if child_g < best_g.get(key, float('inf')):
+                        best_g[key] = child_g
+                        child = self._new_node(node, action)
+                        heapq.heappush(frontier, (child_g + self._heuristic(), self._tie_break(depth + 1),
+                                                  child, child_g, credits + cost, depth + 1))
+                        if (self.goal.is_met(self.engine)
+                                and (incumbent is None or (child_g, credits + cost) < incumbent[:2])):
+                            incumbent = (child_g, credits + cost, child)
+        finally:
+            self.engine.rollback(root)
+            self._nodes = []
+
+        return None, False
+
+    def beam_search(self, beam_width: int = DEFAULT_BEAM_WIDTH) -> Optional[Dict]:
+        """
+        Beam search: ad ogni livello tiene solo i beam_width nodi con f = g + h minore
+
+        Trovata una soluzione continua finché qualche nodo del beam può ancora migliorarla
+        (f < g della soluzione) e restituisce la migliore entro beam_time_limit secondi;
+        la profondità è limitata solo dal tempo.
+        """
+        root = self.engine.checkpoint()
+        deadline = time.perf_counter() + self.beam_time_limit
+        self.expansions = 0
+        beam = [(0, 0, [])]
+        best = None
+
+        try:
+            while beam:
+                candidates = {}
+                for g, credits, plan in beam:
+                    if time.perf_counter() > deadline:
+                        break
+                    self._apply(root, plan)
+                    self.expansions += 1
+                    for action, cost in self._children(plan[-1] if plan else None):
+                        child_g = g + 1 if self.minimize == 'calls' else g + cost
+                        child = (child_g, credits + cost, plan + [action])
+                        if self.goal.is_met(self.engine):
+                            if best is None or child[:2] < best[:2]:
+                                best = child
+                            continue
+                        f = child_g + self._heuristic()
+                        if best is not None and f >= best[0]:
+                            continue
+                        key = state_key(self.engine)
+                        if key not in candidates or f < candidates[key][0]:
+                            candidates[key] = (f, child)
+
+                if not candidates or time.perf_counter() > deadline:
+                    break
+                ranked = sorted(candidates.values(), key=lambda item: item[0])
+                beam = [child for _, child in ranked[:beam_width]]
+        finally:
+            self.engine.rollback(root)
+
+        if best is None:
+            return None
+        _, credits, plan = best
+        return self._result(plan, credits, exact=False)
+
+
+def plan_actions(engine: GalaxyEngine, goal: TaskGoal, minimize: str = 'calls',
+                 beam_width: int = None, max_expansions: int = MAX_EXPANSIONS) -> Optional[Dict]:
+    """
+    Pianifica le azioni minime per raggiungere un obiettivo
+
+    Gli obiettivi con closed_form usano direttamente il piano costruito (la ricerca resta
+    per gli spostamenti, dove l'ordine delle tratte conta).
+
+    Args:
+        engine: Motore posizionato sullo stato di partenza (viene ripristinato al termine)
+        goal: Obiettivo della missione
+        minimize: 'calls' (numero di API calls) oppure 'credits' (crediti spesi)
+        beam_width: Forza la beam search con questa larghezza
+        max_expansions: Limite di espansioni A* prima di ripiegare sulla beam search
+
+    Returns:
+        Dict con 'plan' (step in formato intermediate_steps), 'api_calls', 'credits', 'exact'
+    """
+    if goal.is_met(engine):
+        return {'plan': [], 'api_calls': 0, 'credits': 0, 'exact': True, 'expansions': 0}
+    if goal.closed_form is not None:
+        return closed_form_result(engine, goal)
+    return ActionPlanner(engine, goal, minimize, max_expansions).search(beam_width)
+
+
+def closed_form_result(engine: GalaxyEngine, goal: TaskGoal) -> Optional[Dict]:
+    """
+    Esegue il piano in forma chiusa di un obiettivo e ne misura chiamate e crediti
+
+    Il piano è lo stesso per entrambi i criteri; il motore viene ripristinato al termine.
+
+    Returns:
+        Dict come plan_actions, oppure None se il piano non raggiunge l'obiettivo
+    """
+    actions, exact = goal.closed_form(engine)
+    root = engine.checkpoint()
+    balance = engine.state['client']['balance']
+    try:
+        for action in actions:
+            result = engine.execute(*action)
+            if isinstance(result, dict) and result.get('success') is False:
+                return None
+        if not goal.is_met(engine):
+            return None
+        credits = balance - engine.state['client']['balance']
+    finally:
+        engine.rollback(root)
+
+    return {
+        'plan': [{'tool': tool, **args} for tool, args in actions],
+        'api_calls': len(actions),
+        'credits': credits,
+        'exact': exact,
+        'expansions': 0
+    }
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Pianifica le azioni minime per una missione')
+    parser.add_argument('--round', type=int, default=3, help='Numero del round (1-3)')
+    parser.add_argument('--task', type=int, required=True, help='ID della missione')
+    parser.add_argument('--minimize', choices=['calls', 'credits'], default='calls', help='Criterio da minimizzare')
+    parser.add_argument('--beam-width', type=int, help='Usa la beam search con questa larghezza')
+
+    args = parser.parse_args()
+
+    engine = GalaxyEngine.from_round(args.round)
+    goals = build_mission_goals(args.round, engine.state)
+    if args.task not in goals:
+        print(f"❌ Nessun obiettivo pianificabile per la missione {args.task} del round {args.round}")
+        return
+
+    start = time.perf_counter()
+    result = plan_actions(engine, goals[args.task], args.minimize, args.beam_width)
+    elapsed = time.perf_counter() - start
+
+    if result is None:
+        print("❌ Nessun piano trovato")
+        return
+
+    print(f"🧭 Piano per la missione {args.task} (round {args.round}) in {elapsed * 1000:.1f} ms:")
+    print(f"   📞 API calls: {result['api_calls']}  💰 Crediti: {result['credits']}  ✅ Esatto: {result['exact']}")
+    for step in result['plan']:
+        print(f"   • {json.dumps(step, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+⚡ Async Galactic Client - Client asyncio delle API galattiche
+Client per il Galaxy API server locale: riusa un pool di connessioni keep-alive e
+raggruppa le chiamate lanciate nello stesso tick dell'event loop in un'unica
+richiesta /batch, così più droidi possono interrogare la galassia in parallelo.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from galaxy_engine import TOOL_ALIASES, GalaxyEngine
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MAX_BATCH = 64
+# Prefisso dei client del benchmark: ogni modalità ha il proprio bucket nel rate limit del server mock
+BENCHMARK_CLIENT_ID = 'benchmark'
+BENCHMARK_MODES = {
+    'sequential': 'Sequenziale (urllib)  ',
+    'async': 'Async, pool keep-alive',
+    'async_batched': 'Async + batching      ',
+}
+
+
+class GalacticAPIError(Exception):
+    """Errore restituito dal server delle API galattiche"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"[{status}] {message}")
+        self.status = status
+
+
+def _is_read(tool: str) -> bool:
+    """True se la chiamata non modifica lo stato (può essere ripetuta senza effetti)"""
+    return TOOL_ALIASES.get(tool) in GalaxyEngine.READ_ACTIONS
+
+
+class _Connection:
+    """Connessione HTTP/1.1 keep-alive verso il server"""
+
+    def __init__(self, host: str, port: int, client_id: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def _ensure_open(self):
+        # reader.at_eof(): il server ha già chiuso la connessione keep-alive inattiva
+        if self.writer is None or self.writer.is_closing() or self.reader.at_eof():
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, payload: Any = None,
+                      idempotent: bool = True) -> Tuple[int, Any]:
+        """
+        Invia una richiesta e ne legge la risposta
+
+        Args:
+            idempotent: Se False (la richiesta contiene scritture) non viene ripetuta quando
+                        la connessione cade dopo l'invio: il server potrebbe averla già applicata
+        """
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        head = (f'{method} {path} HTTP/1.1\r\n'
+                f'Host: {self.host}:{self.port}\r\n'
+                'Connection: keep-alive\r\n'
+                + (f'X-Client-Id: {self.client_id}\r\n' if self.client_id else '') +
+                'Content-Type: application/json\r\n'
+                f'Content-Length: {len(body)}\r\n\r\n').encode('ascii')
+
+        # Una connessione chiusa dal server si riapre una volta sola
+        for attempt in range(2):
+            await self._ensure_open()
+            sent = False
+            try:
+                self.writer.write(head + body)
+                await self.writer.drain()
+                sent = True
+                return await self._read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if attempt or (sent and not idempotent):
+                    raise
+
+    async def _read_response(self) -> Tuple[int, Any]:
+        status_line = await self.reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, json.loads(body) if body else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class AsyncGalacticClient:
+    """
+    Client asyncio con pool di connessioni e batching delle chiamate.
+
+    Tutte le chiamate lanciate nello stesso tick vengono inviate in un'unica
+    richiesta /batch ed eseguite dal server nell'ordine di emissione; le letture
+    identiche nello stesso batch (senza scritture in mezzo) sono inviate una sola volta.
+
+    Args:
+        base_url: URL del Galaxy API server (es. http://127.0.0.1:8765)
+        pool_size: Numero massimo di connessioni keep-alive aperte
+        max_batch: Numero massimo di chiamate per richiesta /batch
+        batching: Se False ogni chiamata è una richiesta /call separata
+        client_id: Identificativo dell'agente (header X-Client-Id, usato dal rate limit del server)
+    """
+
+    def __init__(self, base_url: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 max_batch: int = DEFAULT_MAX_BATCH, batching: bool = True, client_id: Optional[str] = None):
+        address = urlsplit(base_url)
+        self.host = address.hostname or '127.0.0.1'
+        self.port = address.port or 80
+        self.max_batch = max_batch
+        self.batching = batching
+
+        self._pool: asyncio.Queue = asyncio.Queue()
+        self._connections: List[_Connection] = []
+        for _ in range(pool_size):
+            connection = _Connection(self.host, self.port, client_id)
+            self._connections.append(connection)
+            self._pool.put_nowait(connection)
+
+        self._pending: List[Tuple[str, Dict, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._inflight: set = set()
+
+        self.stats = {
+            'calls': 0,
+            'http_requests': 0,
+            'batches': 0,
+            'batched_calls': 0,
+            'deduplicated_reads': 0
+        }
+
+    async def __aenter__(self) -> 'AsyncGalacticClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Attende le richieste in corso e chiude le connessioni del pool"""
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        for connection in self._connections:
+            connection.close()
+
+    async def _request(self, method: str, path: str, payload: Any = None,
+                       idempotent: bool = True) -> Tuple[int, Any]:
+        connection = await self._pool.get()
+        try:
+            self.stats['http_requests'] += 1
+            return await connection.request(method, path, payload, idempotent)
+        finally:
+            self._pool.put_nowait(connection)
+
+    # ------------------------------------------------------------------
+    # Chiamate
+    # ------------------------------------------------------------------
+
+    async def call(self, tool: str, args: Dict = None) -> Any:
+        """
+        Esegue una chiamata alle API galattiche
+
+        Returns:
+            Risultato della chiamata
+
+        Raises:
+            GalacticAPIError: se il server risponde con un errore
+        """
+        self.stats['calls'] += 1
+        args = args or {}
+
+        if not self.batching:
+            status, payload = await self._request('POST', '/call', {'tool': tool, 'args': args},
+                                                  idempotent=_is_read(tool))
+            if status != 200:
+                raise GalacticAPIError(status, (payload or {}).get('error', ''))
+            return payload['result']
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((tool, args, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif not self._flush_scheduled:
+            # Il flush avviene alla fine del tick corrente: raccoglie tutte le chiamate concorrenti
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._send_batch(pending))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send_batch(self, pending: List[Tuple[str, Dict, asyncio.Future]]):
+        # Letture identiche senza scritture in mezzo producono lo stesso risultato
+        calls: List[Dict] = []
+        targets: List[List[asyncio.Future]] = []
+        reads: Dict[str, int] = {}
+        for tool, args, future in pending:
+            if _is_read(tool):
+                key = json.dumps([TOOL_ALIASES[tool], args], sort_keys=True, default=str)
+                if key in reads:
+                    targets[reads[key]].append(future)
+                    self.stats['deduplicated_reads'] += 1
+                    continue
+                reads[key] = len(calls)
+            else:
+                reads.clear()
+            calls.append({'tool': tool, 'args': args})
+            targets.append([future])
+
+        self.stats['batches'] += 1
+        self.stats['batched_calls'] += len(calls)
+        try:
+            status, payload = await self._request('POST', '/batch', {'calls': calls},
+                                                  idempotent=all(_is_read(call['tool']) for call in calls))
+            if status != 200:
+                raise GalacticAPIError(status, (payload or {}).get('error', ''))
+        except Exception as e:
+            for futures in targets:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for futures, result in zip(targets, payload['results']):
+            for future in futures:
+                if future.done():
+                    continue
+                if result.get('status') == 200:
+                    future.set_result(result.get('result'))
+                else:
+                    future.set_exception(GalacticAPIError(result.get('status'), result.get('error', '')))
+
+    async def get_state(self) -> Dict:
+        """Stato galattico corrente del server"""
+        _, payload = await self._request('GET', '/state')
+        return payload
+
+    async def reset(self):
+        """Riporta il server allo stato iniziale del round"""
+        await self._request('POST', '/reset')
+
+
+# ----------------------------------------------------------------------
+# Benchmark sul server locale
+# ----------------------------------------------------------------------
+
+def _droid_mission(droid: str) -> List[Tuple[str, Dict]]:
+    """Missione di lettura tipica di un droide: posizione, navi, mercato, informazioni, saldo"""
+    return [
+        ('get_asset_location', {'asset': droid}),
+        ('get_ships', {}),
+        ('search_marketplace', {'item': 'Laser'}),
+        ('query_infosphere', {'entity': 'Alderaan'}),
+        ('get_balance', {}),
+        ('get_inventory', {}),
+    ]
+
+
+async def _run_mission(client: AsyncGalacticClient, droid: str, rounds: int) -> int:
+    """Esegue la missione e restituisce il numero di chiamate fallite (errori o rate limit)"""
+    errors = 0
+    for _ in range(rounds):
+        results = await asyncio.gather(*(client.call(tool, args) for tool, args in _droid_mission(droid)),
+                                       return_exceptions=True)
+        errors += sum(isinstance(result, GalacticAPIError) for result in results)
+    return errors
+
+
+def _run_sequential(base_url: str, droids: List[str], rounds: int, client_id: str) -> int:
+    """Riferimento sincrono: una richiesta HTTP per chiamata, una connessione nuova ogni volta"""
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+
+    errors = 0
+    for droid in droids:
+        for _ in range(rounds):
+            for tool, args in _droid_mission(droid):
+                request = Request(f'{base_url}/call', data=json.dumps({'tool': tool, 'args': args}).encode('utf-8'),
+                                  headers={'Content-Type': 'application/json', 'X-Client-Id': client_id})
+                try:
+                    with urlopen(request) as response:
+                        response.read()
+                except HTTPError:
+                    errors += 1
+    return errors
+
+
+async def _run_concurrent(base_url: str, droids: List[str], rounds: int, batching: bool, client_id: str) -> Dict:
+    async with AsyncGalacticClient(base_url, batching=batching, client_id=client_id) as client:
+        errors = await asyncio.gather(*(_run_mission(client, droid, rounds) for droid in droids))
+        return {**client.stats, 'errors': sum(errors)}
+
+
+def benchmark(round_number: int = 3, agents: int = 8, rounds: int = 20, mock=None) -> Dict:
+    """
+    Confronta sul server locale: client sincrono, client asyncio senza batching e con batching
+
+    Args:
+        mock: MockProfile opzionale per simulare latenze, rate limit ed errori di un servizio remoto
+
+    Returns:
+        Dict con i tempi (secondi), le statistiche dei client e le metriche del server per modalità,
+        più 'fastest': la modalità più rapida tra quelle senza chiamate fallite (None se nessuna)
+    """
+    from galaxy_server import GalaxyAPIServer
+
+    with GalaxyAPIServer(round_number, mock=mock) as server:
+        droids = list(server.engine.state['droids'])
+        droids = (droids * (agents // max(len(droids), 1) + 1))[:agents]
+
+        results = {}
+        # Un client id per modalità: una modalità che svuota il bucket non penalizza la successiva
+        start = time.perf_counter()
+        results['sequential_stats'] = {
+            'errors': _run_sequential(server.url, droids, rounds, f'{BENCHMARK_CLIENT_ID}-sequential')}
+        results['sequential_seconds'] = time.perf_counter() - start
+        results['sequential_metrics'] = server.metrics.snapshot()
+
+        for label, batching in (('async', False), ('async_batched', True)):
+            server.metrics.reset()
+            start = time.perf_counter()
+            results[f'{label}_stats'] = asyncio.run(
+                _run_concurrent(server.url, droids, rounds, batching, f'{BENCHMARK_CLIENT_ID}-{label}'))
+            results[f'{label}_seconds'] = time.perf_counter() - start
+            results[f'{label}_metrics'] = server.metrics.snapshot()
+
+    # Solo le modalità senza chiamate fallite sono confrontabili: una corsa rifiutata dal rate limit è
+    # "veloce" perché non ha fatto il lavoro
+    completed = [label for label in BENCHMARK_MODES if results[f'{label}_stats']['errors'] == 0]
+    results['fastest'] = min(completed, key=lambda label: results[f'{label}_seconds']) if completed else None
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark del client asyncio sul server galattico locale')
+    parser.add_argument('--round', type=int, default=3, help='Numero del round (default: 3)')
+    parser.add_argument('--agents', type=int, default=8, help='Numero di agenti concorrenti (default: 8)')
+    parser.add_argument('--rounds', type=int, default=20, help='Ripetizioni della missione per agente (default: 20)')
+    parser.add_argument('--latency', help='Simula un servizio remoto con questa latenza per richiesta (es. lognormal:30,0.5)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probabilità di errore per chiamata (con --latency)')
+    parser.add_argument('--rate-limit', type=float, help='Chiamate al secondo per client (con --latency)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed della simulazione (default: 42)')
+
+    args = parser.parse_args()
+
+    mock = None
+    if args.latency or args.error_rate or args.rate_limit:
+        from mock_network import MockProfile
+        mock = MockProfile(args.latency or 'fixed:0', error_rate=args.error_rate,
+                           rate_limit=args.rate_limit, seed=args.seed)
+
+    results = benchmark(args.round, args.agents, args.rounds, mock)
+    calls = args.agents * args.rounds * len(_droid_mission(''))
+    print(f"⚡ Benchmark round {args.round}: {args.agents} agenti, {calls} chiamate")
+    if mock:
+        print(f"🎭 Servizio simulato: {mock.describe()}")
+    for label, title in BENCHMARK_MODES.items():
+        metrics = results[f'{label}_metrics']
+        requests = sum(data['count'] for name, data in metrics['endpoints'].items() if name.startswith('/'))
+        errors = results[f'{label}_stats']['errors']
+        note = ' ⚠️ escluso dal confronto' if errors else ''
+        print(f"   • {title}: {results[f'{label}_seconds']:.3f}s, {requests} richieste HTTP, "
+              f"{errors}/{calls} chiamate fallite{note}")
+    if results['fastest']:
+        print(f"🏆 Più veloce: {BENCHMARK_MODES[results['fastest']].strip()}")
+    else:
+        print("⚠️ Nessuna modalità senza chiamate fallite: tempi non confrontabili")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+⏱️ Benchmark Evaluation - Suite di benchmark per la pipeline di valutazione
+Genera corpora sintetici di submission JSON in tutte le forme accettate da
+extract_mission_data (final_state esplicito o ricostruito, step LangChain o dict,
+api_calls_count, risposte minime o enormi), misura evaluate_all_missions,
+validate_directory e generate_leaderboard a 1k/10k/100k file e confronta i
+risultati con una baseline JSON salvata in precedenza.
+"""
+
+import contextlib
+import copy
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_TOLERANCE = 0.20
+PARTICIPANTS_PER_CORPUS = 50
+
+# Forme di submission generate, con il loro peso nel corpus
+SUBMISSION_SHAPES = [
+    ('final_state', 0.35),
+    ('reconstructed', 0.20),
+    ('langchain_steps', 0.15),
+    ('api_calls_count', 0.12),
+    ('tiny', 0.15),
+    ('huge', 0.03),
+]
+
+QUALITY_WORDS = ['missione', 'completata', 'successo', 'R2-D2', 'trasportato', 'viaggio', 'crediti',
+                 'acquisto', 'ottimizzato', 'pianeta', 'nave', 'risparmio', 'InfoSphere', 'verificato']
+
+
+def _round_task_ids(round_number: int) -> List[int]:
+    """ID dei task del round, letti dallo stesso CSV usato dal valutatore"""
+    task_file = f'ROUND {round_number} FILES/tasks.csv' if round_number == 1 \
+        else f'ROUND {round_number} FILES/tasks_round{round_number}.csv'
+    if not os.path.exists(task_file):
+        raise FileNotFoundError(f"⚠️ File tasks non trovato per il round {round_number}: {task_file}")
+    with open(task_file, 'r', encoding='utf-8') as f:
+        return [int(row['task_id']) for row in csv.DictReader(f)]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """
+    Picco di memoria residente del processo (ru_maxrss è in KB su Linux, in byte su macOS)
+
+    Returns:
+        MB di picco, oppure None dove il modulo resource non esiste (Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def _response(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(QUALITY_WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _final_state(rng: random.Random, galaxy_state: Dict) -> Dict:
+    """Stato finale plausibile: R2-D2 spostato e qualche oggetto in inventario"""
+    planets = sorted({planet for key in galaxy_state.get('travel_costs', {}) for planet in key.split('-')})
+    items = [item.get('name') for item in galaxy_state.get('marketplace', {}).values() if isinstance(item, dict)]
+    client = galaxy_state.get('client', {})
+    return {
+        'client': {
+            'balance': max(int(client.get('balance', 1000)) - rng.randrange(0, 1500, 10), 0),
+            'inventory': rng.sample(items, min(len(items), rng.randint(0, 3))) if items else []
+        },
+        'droids': {'R2-D2': {'location': rng.choice(planets) if planets else 'Coruscant'}}
+    }
+
+
+def _dict_steps(rng: random.Random, count: int, result_size: int = 1) -> List[Dict]:
+    tools = ['get_asset_location', 'get_ships', 'calculate_travel_cost', 'book_travel',
+             'search_marketplace', 'purchase_item', 'query_infosphere']
+    return [{'tool': rng.choice(tools), 'asset': 'R2-D2', 'destination': 'Coruscant',
+             'result': [f'item_{i}' for i in range(result_size)]} for _ in range(count)]
+
+
+def _langchain_steps(rng: random.Random, count: int) -> List:
+    """Step nel formato (AgentAction, observation) serializzato da LangChain"""
+    return [[{'tool': step['tool'], 'tool_input': {'asset': 'R2-D2'}, 'log': f"Invoking {step['tool']}"},
+             json.dumps(step['result'])] for step in _dict_steps(rng, count)]
+
+
+def build_submission(shape: str, task_id: int, rng: random.Random, galaxy_state: Dict,
+                     huge_kb: int = 64) -> Dict:
+    """
+    Costruisce una submission JSON nella forma richiesta
+
+    Args:
+        shape: Una delle forme di SUBMISSION_SHAPES
+        task_id: ID del task
+        rng: Generatore casuale seedato
+        galaxy_state: Stato iniziale del round (per stati finali plausibili)
+        huge_kb: Dimensione della risposta per la forma 'huge' (KB)
+
+    Returns:
+        Dict pronto per essere serializzato
+    """
+    if shape == 'tiny':
+        return {'task_id': task_id, 'response': 'ok'}
+
+    submission = {'task_id': task_id, 'agent_response': _response(rng, rng.randint(20, 60))}
+    if shape == 'final_state':
+        submission['intermediate_steps'] = _dict_steps(rng, rng.randint(1, 12))
+        submission['final_state'] = _final_state(rng, galaxy_state)
+        submission['api_calls_count'] = len(submission['intermediate_steps'])
+    elif shape == 'reconstructed':
+        state = _final_state(rng, galaxy_state)
+        submission['intermediate_steps'] = _dict_steps(rng, rng.randint(1, 12))
+        submission['balance'] = state['client']['balance']
+        submission['inventory'] = state['client']['inventory']
+        location_key = rng.choice(['droid_location', 'r2d2_location'])
+        submission[location_key] = state['droids']['R2-D2']['location']
+    elif shape == 'langchain_steps':
+        submission['intermediate_steps'] = _langchain_steps(rng, rng.randint(1, 12))
+        submission['final_state'] = _final_state(rng, galaxy_state)
+    elif shape == 'api_calls_count':
+        submission['api_calls_count'] = rng.randint(0, 20)
+        submission['final_state'] = _final_state(rng, galaxy_state)
+    elif shape == 'huge':
+        submission['agent_response'] = _response(rng, huge_kb * 1024 // 10)
+        submission['intermediate_steps'] = _dict_steps(rng, 200, result_size=20)
+        submission['final_state'] = copy.deepcopy(galaxy_state)
+        submission['final_state'].update(_final_state(rng, galaxy_state))
+    else:
+        raise ValueError(f"Forma di submission sconosciuta: {shape}")
+    return submission
+
+
+def generate_corpus(directory: str, files: int, round_number: int = 1, seed: int = 42,
+                    huge_kb: int = 64) -> Dict:
+    """
+    Genera un corpus di submission in una cartella
+
+    I file si chiamano 'teamNNNN_mission_T_XXXXXXX.json' (riconosciuti dai pattern di
+    find_mission_files) e il task_id è sempre dichiarato nel JSON.
+
+    Args:
+        directory: Cartella di destinazione (creata se non esiste)
+        files: Numero di file da generare
+        round_number: Round di cui usare task e stato iniziale
+        seed: Seed del generatore
+        huge_kb: Dimensione della risposta per la forma 'huge' (KB)
+
+    Returns:
+        Dict con manifest (file -> partecipante, task), conteggi per forma e byte scritti
+    """
+    from galaxy_engine import load_round_state
+
+    rng = random.Random(seed)
+    task_ids = _round_task_ids(round_number)
+    galaxy_state = load_round_state(round_number)
+    shapes = [shape for shape, _ in SUBMISSION_SHAPES]
+    weights = [weight for _, weight in SUBMISSION_SHAPES]
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {}
+    shape_counts = {shape: 0 for shape in shapes}
+    total_bytes = 0
+
+    for i in range(files):
+        shape = rng.choices(shapes, weights)[0]
+        task_id = rng.choice(task_ids)
+        participant = f'team{i % PARTICIPANTS_PER_CORPUS:04d}'
+        filename = os.path.join(directory, f'{participant}_mission_{task_id}_{i:07d}.json')
+        payload = json.dumps(build_submission(shape, task_id, rng, galaxy_state, huge_kb), ensure_ascii=False)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        manifest[filename] = (participant, task_id)
+        shape_counts[shape] += 1
+        total_bytes += len(payload)
+
+    return {'manifest': manifest, 'shapes': shape_counts, 'bytes': total_bytes}
+
+
+def _timed(function, *args, **kwargs) -> Tuple[object, float]:
+    """Esegue la funzione con stdout silenziato e ne misura la durata"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        value = function(*args, **kwargs)
+        return value, time.perf_counter() - start
+
+
+def run_benchmark(files: int, round_number: int = 1, seed: int = 42, huge_kb: int = 64,
+                  workdir: Optional[str] = None) -> Dict:
+    """
+    Esegue la pipeline di valutazione su un corpus sintetico di 'files' submission
+
+    Args:
+        files: Numero di file del corpus
+        round_number: Round da valutare
+        seed: Seed del corpus
+        huge_kb: Dimensione della risposta per la forma 'huge' (KB)
+        workdir: Cartella del corpus (default: cartella temporanea rimossa al termine)
+
+    Returns:
+        Dict con durate per fase, file/sec e picco di RSS
+    """
+    from evaluate_json_missions import JSONMissionEvaluator
+    from validate_json_format import validate_directory
+
+    corpus_dir = workdir or tempfile.mkdtemp(prefix=f'benchmark_{files}_')
+    try:
+        start = time.perf_counter()
+        corpus = generate_corpus(corpus_dir, files, round_number, seed, huge_kb)
+        generation_seconds = time.perf_counter() - start
+
+        evaluator = JSONMissionEvaluator(round_number)
+        timings = {}
+
+        found, timings['find_mission_files'] = _timed(evaluator.find_mission_files, corpus_dir)
+        _, timings['evaluate_all_missions'] = _timed(evaluator.evaluate_all_missions, corpus_dir)
+        _, timings['validate_directory'] = _timed(validate_directory, corpus_dir)
+
+        # Un risultato per partecipante e missione (tabella colonnare)
+        leaderboard, timings['generate_leaderboard'] = _timed(evaluator.evaluator.generate_leaderboard,
+                                                              evaluator.results_table)
+
+        return {
+            'files': files,
+            'round': round_number,
+            'corpus_mb': round(corpus['bytes'] / (1024 * 1024), 2),
+            'shapes': corpus['shapes'],
+            'files_found': len(found),
+            'generation_seconds': round(generation_seconds, 4),
+            'phases': {
+                phase: {
+                    'seconds': round(seconds, 4),
+                    'files_per_sec': round(files / seconds, 1) if seconds > 0 else None
+                } for phase, seconds in timings.items()
+            },
+            'total_seconds': round(sum(timings.values()), 4),
+            'leaderboard_rows': len(leaderboard),
+            'peak_rss_mb': _peak_rss_mb()
+        }
+    finally:
+        if workdir is None:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+
+def run_isolated(files: int, round_number: int = 1, seed: int = 42, huge_kb: int = 64) -> Dict:
+    """
+    Esegue run_benchmark in un processo separato, così che il picco di RSS
+    misurato appartenga solo a quella dimensione del corpus
+    """
+    command = [sys.executable, os.path.abspath(__file__), '--single', str(files),
+               '--round', str(round_number), '--seed', str(seed), '--huge-kb', str(huge_kb)]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(completed.stdout)
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE) -> List[Dict]:
+    """
+    Confronta due report di benchmark
+
+    Args:
+        current: Report appena misurato
+        baseline: Report di riferimento
+        tolerance: Peggioramento relativo tollerato (0.2 = +20% di tempo o memoria)
+
+    Returns:
+        Lista di confronti (dimensione, metrica, valori, variazione, regressione sì/no)
+    """
+    comparisons = []
+    for size, run in current.get('runs', {}).items():
+        reference = baseline.get('runs', {}).get(size)
+        if not reference:
+            continue
+        metrics = [(f'{phase}.seconds', data['seconds'], reference['phases'].get(phase, {}).get('seconds'))
+                   for phase, data in run['phases'].items()]
+        metrics.append(('peak_rss_mb', run['peak_rss_mb'], reference.get('peak_rss_mb')))
+        for metric, value, reference_value in metrics:
+            if not reference_value or value is None:
+                continue
+            change = (value - reference_value) / reference_value
+            comparisons.append({
+                'files': int(size),
+                'metric': metric,
+                'baseline': reference_value,
+                'current': value,
+                'change': round(change, 4),
+                'regression': change > tolerance
+            })
+    return comparisons
+
+
+def print_report(report: Dict, comparisons: Optional[List[Dict]] = None):
+    """Stampa i risultati del benchmark ed eventuali confronti con la baseline"""
+    print(f"\n⏱️ BENCHMARK PIPELINE DI VALUTAZIONE (round {report['round']})")
+    print("=" * 60)
+    for size, run in report['runs'].items():
+        print(f"\n📁 {int(size):,} file ({run['corpus_mb']} MB, generati in {run['generation_seconds']:.2f}s)")
+        for phase, data in run['phases'].items():
+            print(f"   • {phase:<22} {data['seconds']:>9.3f}s  {data['files_per_sec'] or 0:>12,.0f} file/s")
+        peak_rss = run['peak_rss_mb']
+        print(f"   💾 Picco RSS: {'n/d' if peak_rss is None else f'{peak_rss} MB'}")
+
+    if comparisons is not None:
+        print("\n📊 CONFRONTO CON LA BASELINE")
+        if not comparisons:
+            print("   ⚠️ Nessuna dimensione in comune con la baseline")
+        for item in comparisons:
+            marker = '❌' if item['regression'] else '✅'
+            print(f"   {marker} {item['files']:>7,} file {item['metric']:<32} "
+                  f"{item['baseline']:>10} -> {item['current']:>10} ({item['change']:+.1%})")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark della pipeline di valutazione su corpora sintetici')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Dimensioni dei corpora separate da virgola (default: 1000,10000,100000)')
+    parser.add_argument('--round', type=int, default=1, help='Round da valutare (default: 1)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed dei corpora (default: 42)')
+    parser.add_argument('--huge-kb', type=int, default=64, help='KB della risposta delle submission enormi (default: 64)')
+    parser.add_argument('--output', help='Salva il report JSON in questo file')
+    parser.add_argument('--baseline', help='Report JSON di riferimento da confrontare')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Peggioramento tollerato rispetto alla baseline (default: 0.2 = 20%%)')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Esce con codice 1 se una metrica peggiora oltre la tolleranza')
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    # Modalità interna: una sola dimensione, report su stdout per run_isolated
+    if args.single:
+        print(json.dumps(run_benchmark(args.single, args.round, args.seed, args.huge_kb)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'round': args.round,
+        'seed': args.seed,
+        'runs': {}
+    }
+    for size in sizes:
+        print(f"⏳ Benchmark con {size:,} file...")
+        report['runs'][str(size)] = run_isolated(size, args.round, args.seed, args.huge_kb)
+
+    comparisons = None
+    if baseline:
+        with open(baseline, 'r', encoding='utf-8') as f:
+            comparisons = compare_to_baseline(report, json.load(f), args.tolerance)
+        report['comparison'] = comparisons
+
+    print_report(report, comparisons)
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Report salvato in {output}")
+
+    if args.fail_on_regression and comparisons and any(item['regression'] for item in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
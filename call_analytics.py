@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+📈 Call Analytics - Hotspot delle API galattiche sull'intero corpus di submission
+Legge le submission una alla volta e costruisce istogrammi di chiamate per tool,
+le sequenze (n-grammi) più frequenti e le letture ridondanti (stessa lettura ripetuta
+senza scritture che ne invalidino il risultato). La memoria resta limitata: i conteggi
+degli n-grammi e delle letture ridondanti usano sketch Count-Min e Space-Saving.
+"""
+
+import glob
+import hashlib
+import heapq
+import json
+import os
+from array import array
+from collections import Counter, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from galactic_client import READ_DEPENDENCIES, WRITE_INVALIDATIONS, _freeze
+from galaxy_engine import TOOL_ALIASES, normalize_step
+
+DEFAULT_NGRAMS = (2, 3)
+DEFAULT_TOP = 20
+DEFAULT_CAPACITY = 2000
+# Oltre questa soglia le chiamate per submission finiscono nell'ultimo bucket dell'istogramma
+MAX_CALLS_BUCKET = 20
+UNKNOWN_TOOL = '<sconosciuto>'
+OPAQUE_STEP = '<opaco>'
+
+
+def _hash64(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class CountMinSketch:
+    """
+    Sketch Count-Min: stima per eccesso della frequenza di una chiave in memoria fissa
+
+    Args:
+        width: Contatori per riga (errore ~ e/width del totale)
+        depth: Righe indipendenti (probabilità di errore ~ e^-depth)
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.rows = [array('q', [0]) * width for _ in range(depth)]
+
+    def _columns(self, key: str) -> Iterable[int]:
+        # Doppio hashing (Kirsch-Mitzenmacher) da un unico digest deterministico
+        value = _hash64(key)
+        h1, h2 = value & 0xFFFFFFFF, (value >> 32) | 1
+        return ((h1 + i * h2) % self.width for i in range(self.depth))
+
+    def add(self, key: str, count: int = 1):
+        self.total += count
+        for row, column in zip(self.rows, self._columns(key)):
+            row[column] += count
+
+    def estimate(self, key: str) -> int:
+        return min(row[column] for row, column in zip(self.rows, self._columns(key)))
+
+
+class SpaceSaving:
+    """
+    Top-k approssimato (Space-Saving) con al massimo 'capacity' chiavi monitorate
+
+    Ogni chiave ha un conteggio stimato per eccesso e un errore massimo: il conteggio
+    reale è compreso tra count - error e count.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+        self.errors: Dict[Any, int] = {}
+        self._heap: List[Tuple[int, int, Any]] = []  # (conteggio, sequenza, chiave), con voci obsolete
+        self._sequence = 0
+
+    def _push(self, key: Any):
+        self._sequence += 1
+        heapq.heappush(self._heap, (self.counts[key], self._sequence, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, i, key) for i, (key, count) in enumerate(self.counts.items())]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[Any, int]:
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == count:
+                return key, count
+
+    def add(self, key: Any, count: int = 1):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            evicted, minimum = self._pop_min()
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[key] = minimum + count
+            self.errors[key] = minimum
+        self._push(key)
+
+    def top(self, n: int) -> List[Tuple[Any, int, int]]:
+        """Le n chiavi più frequenti come (chiave, conteggio, errore massimo)"""
+        return [(key, count, self.errors[key])
+                for key, count in heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])]
+
+
+class _FrequencyCounter:
+    """Frequenze con Space-Saving per il top-k e Count-Min per stime puntuali"""
+
+    def __init__(self, capacity: int, width: int, depth: int):
+        self.top_k = SpaceSaving(capacity)
+        self.sketch = CountMinSketch(width, depth)
+
+    def add(self, key: str):
+        self.top_k.add(key)
+        self.sketch.add(key)
+
+    def top(self, n: int) -> List[Dict]:
+        return [{'key': key, 'count': count, 'max_error': error, 'count_min_estimate': self.sketch.estimate(key)}
+                for key, count, error in self.top_k.top(n)]
+
+
+def step_call(step: Any) -> Optional[Tuple[str, Dict]]:
+    """(tool canonico, argomenti) di uno step in uno dei formati accettati da normalize_step"""
+    call = normalize_step(step)
+    if call is None:
+        return None
+    tool, args = call
+    return TOOL_ALIASES.get(tool, UNKNOWN_TOOL), args
+
+
+class CallAnalytics:
+    """
+    Analisi in streaming delle chiamate API contenute nelle submission
+
+    Args:
+        ngrams: Lunghezze delle sequenze di chiamate da contare
+        capacity: Chiavi monitorate da ogni top-k Space-Saving
+        sketch_width: Larghezza degli sketch Count-Min
+        sketch_depth: Profondità degli sketch Count-Min
+    """
+
+    def __init__(self, ngrams: Tuple[int, ...] = DEFAULT_NGRAMS, capacity: int = DEFAULT_CAPACITY,
+                 sketch_width: int = 4096, sketch_depth: int = 4):
+        self.ngrams = tuple(sorted(set(ngrams)))
+        self.submissions = 0
+        self.total_calls = 0
+        self.opaque_steps = 0
+        self.tool_calls = Counter()
+        self.tool_submissions = Counter()
+        self.redundant_by_tool = Counter()
+        self.calls_per_submission: Dict[str, Counter] = {}
+        self.sequences = {n: _FrequencyCounter(capacity, sketch_width, sketch_depth) for n in self.ngrams}
+        self.redundant_reads = _FrequencyCounter(capacity, sketch_width, sketch_depth)
+        self.unreadable_files = 0
+
+    def add_steps(self, steps: List):
+        """
+        Aggiunge gli intermediate_steps di una submission
+
+        Una lettura è ridondante se la stessa chiamata (tool e argomenti) è già stata fatta
+        nella submission e nessuna scrittura successiva ha modificato le parti dello stato
+        da cui dipende (vedi READ_DEPENDENCIES / WRITE_INVALIDATIONS).
+        """
+        self.submissions += 1
+        versions = Counter()
+        seen_reads = {}
+        tools_in_submission = Counter()
+        window = deque(maxlen=self.ngrams[-1] if self.ngrams else 1)
+
+        for step in steps:
+            call = step_call(step)
+            if call is None:
+                self.opaque_steps += 1
+                tool, args = OPAQUE_STEP, {}
+            else:
+                tool, args = call
+            self.total_calls += 1
+            tools_in_submission[tool] += 1
+
+            if tool in READ_DEPENDENCIES:
+                key = (tool, _freeze(args))
+                snapshot = tuple(versions[part] for part in READ_DEPENDENCIES[tool])
+                if seen_reads.get(key) == snapshot:
+                    self.redundant_by_tool[tool] += 1
+                    self.redundant_reads.add(f"{tool}({json.dumps(args, sort_keys=True, default=str)})")
+                seen_reads[key] = snapshot
+            elif tool in WRITE_INVALIDATIONS:
+                for part in WRITE_INVALIDATIONS[tool]:
+                    versions[part] += 1
+
+            # Gli step opachi (solo conteggi) interrompono le sequenze invece di formarne
+            if tool == OPAQUE_STEP:
+                window.clear()
+                continue
+            window.append(tool)
+            for n in self.ngrams:
+                if len(window) >= n:
+                    self.sequences[n].add(' → '.join(list(window)[-n:]))
+
+        self.tool_calls.update(tools_in_submission)
+        self.tool_submissions.update(tools_in_submission.keys())
+        for tool, count in tools_in_submission.items():
+            self.calls_per_submission.setdefault(tool, Counter())[min(count, MAX_CALLS_BUCKET)] += 1
+
+    def add_file(self, json_file: str):
+        """Legge una submission JSON ed estrae gli step con le stesse regole del valutatore"""
+        from evaluate_json_missions import JSONMissionEvaluator
+
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.unreadable_files += 1
+            return
+        self.add_steps(JSONMissionEvaluator._extract_intermediate_steps(data))
+
+    def report(self, top: int = DEFAULT_TOP) -> Dict:
+        """
+        Riepilogo dell'analisi
+
+        Returns:
+            Dict con istogrammi per tool, n-grammi e letture ridondanti più frequenti
+        """
+        tools = {}
+        for tool, calls in self.tool_calls.most_common():
+            histogram = self.calls_per_submission.get(tool, Counter())
+            tools[tool] = {
+                'calls': calls,
+                'submissions': self.tool_submissions[tool],
+                'calls_per_submission': round(calls / self.tool_submissions[tool], 2),
+                'redundant_calls': self.redundant_by_tool[tool],
+                'redundant_ratio': round(self.redundant_by_tool[tool] / calls, 4),
+                'histogram': {(f'{count}+' if count == MAX_CALLS_BUCKET else str(count)): submissions
+                              for count, submissions in sorted(histogram.items())}
+            }
+        total_redundant = sum(self.redundant_by_tool.values())
+        return {
+            'submissions': self.submissions,
+            'unreadable_files': self.unreadable_files,
+            'total_calls': self.total_calls,
+            'opaque_steps': self.opaque_steps,
+            'redundant_calls': total_redundant,
+            'redundant_ratio': round(total_redundant / self.total_calls, 4) if self.total_calls else 0.0,
+            'tools': tools,
+            'sequences': {str(n): self.sequences[n].top(top) for n in self.ngrams},
+            'top_redundant_reads': self.redundant_reads.top(top)
+        }
+
+
+def analyze_directory(directory: str = '.', pattern: str = '*.json', **options) -> CallAnalytics:
+    """
+    Analizza tutte le submission di una cartella, una alla volta
+
+    Args:
+        directory: Cartella delle submission
+        pattern: Pattern dei file
+        **options: Opzioni di CallAnalytics (ngrams, capacity, sketch_width, sketch_depth)
+
+    Returns:
+        CallAnalytics popolato
+    """
+    analytics = CallAnalytics(**options)
+    for json_file in sorted(glob.iglob(os.path.join(directory, pattern))):
+        analytics.add_file(json_file)
+    return analytics
+
+
+def print_report(report: Dict, top: int = 10):
+    """Stampa il riepilogo dei tool, delle sequenze e delle letture ridondanti"""
+    print(f"\n📈 ANALISI CHIAMATE API ({report['submissions']} submission, {report['total_calls']} chiamate)")
+    print(f"   ♻️ Chiamate ridondanti: {report['redundant_calls']} ({report['redundant_ratio']:.1%})")
+    if report['opaque_steps']:
+        print(f"   ❔ Step senza tool riconoscibile: {report['opaque_steps']}")
+
+    print("\n🔧 Chiamate per tool:")
+    for tool, data in report['tools'].items():
+        print(f"   • {tool:<24} {data['calls']:>8} chiamate in {data['submissions']:>6} submission "
+              f"(media {data['calls_per_submission']}, ridondanti {data['redundant_calls']})")
+
+    for n, sequences in report['sequences'].items():
+        print(f"\n🔗 Sequenze di {n} chiamate più frequenti:")
+        for item in sequences[:top]:
+            print(f"   {item['count']:>8}×  {item['key']}")
+
+    if report['top_redundant_reads']:
+        print("\n♻️ Letture ridondanti più frequenti:")
+        for item in report['top_redundant_reads'][:top]:
+            print(f"   {item['count']:>8}×  {item['key']}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Hotspot delle chiamate API nelle submission JSON')
+    parser.add_argument('--directory', default='.', help='Cartella delle submission (default: .)')
+    parser.add_argument('--pattern', default='*.json', help='Pattern dei file (default: *.json)')
+    parser.add_argument('--ngrams', default='2,3', help='Lunghezze delle sequenze (default: 2,3)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='Voci nei top-k (default: 20)')
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY,
+                        help='Chiavi monitorate da ogni sketch Space-Saving (default: 2000)')
+    parser.add_argument('--output', help='Salva il report JSON in questo file')
+
+    args = parser.parse_args()
+    ngrams = tuple(int(n) for n in args.ngrams.split(',') if n.strip())
+    analytics = analyze_directory(args.directory, args.pattern, ngrams=ngrams, capacity=args.capacity)
+    report = analytics.report(args.top)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Report salvato in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
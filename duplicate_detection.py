@@ -0,0 +1,230 @@
+"""
+🕵️ Duplicate Detection - Submission quasi-duplicate con MinHash/LSH
+Divide agent_response in shingle di parole e le tracce di tool call in shingle di
+chiamate, calcola firme MinHash e usa il banding LSH per trovare le coppie candidate
+in tempo quasi lineare, senza confronti a coppie su tutto il corpus. Si confrontano
+solo submission dello stesso task e di partecipanti diversi.
+"""
+
+import json
+import re
+import zlib
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+# Primo di Mersenne 2^31 - 1: (a * x + b) resta sotto 2^63 e le firme stanno in uint32
+_PRIME = (1 << 31) - 1
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_RESPONSE_PERMUTATIONS = 128
+DEFAULT_TRACE_PERMUTATIONS = 64
+DEFAULT_BANDS = 32
+# Sotto questo numero di parole la risposta è troppo generica per parlare di copia
+MIN_RESPONSE_WORDS = 8
+# Bucket LSH più grandi vengono suddivisi con le bande successive (evita l'esplosione quadratica);
+# se restano troppo grandi su tutte le bande vengono collegati a stella e segnalati come troncati
+MAX_BUCKET_PAIRS = 200
+
+
+def response_shingles(text: str, k: int = 3) -> Set[str]:
+    """Shingle di k parole consecutive del testo normalizzato"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= k:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def trace_shingles(steps: List, k: int = 3) -> Set[str]:
+    """Shingle di k chiamate consecutive (tool canonico e argomenti) della traccia"""
+    from call_analytics import step_call
+
+    tokens = []
+    for step in steps:
+        call = step_call(step)
+        if call is not None:
+            tokens.append(f"{call[0]}{json.dumps(call[1], sort_keys=True, default=str)}")
+    if len(tokens) <= k:
+        return {' | '.join(tokens)} if tokens else set()
+    return {' | '.join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+class MinHasher:
+    """
+    Firme MinHash vettoriali (numpy) con permutazioni lineari (a·x + b) mod p
+
+    Args:
+        permutations: Lunghezza della firma
+        seed: Seed delle permutazioni (firme confrontabili solo con lo stesso seed)
+    """
+
+    def __init__(self, permutations: int = DEFAULT_RESPONSE_PERMUTATIONS, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.permutations = permutations
+        self.a = rng.integers(1, _PRIME, permutations, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, permutations, dtype=np.uint64)
+
+    def signature(self, shingles: Set[str]) -> Optional[np.ndarray]:
+        """Firma uint32 dell'insieme di shingle (None se vuoto)"""
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), np.uint64, len(shingles))
+        values = (np.outer(hashes % _PRIME, self.a) + self.b) % _PRIME
+        return values.min(axis=0).astype(np.uint32)
+
+
+def estimated_similarity(signature_a: Optional[np.ndarray], signature_b: Optional[np.ndarray]) -> Optional[float]:
+    """Jaccard stimato come frazione di componenti uguali delle firme"""
+    if signature_a is None or signature_b is None:
+        return None
+    return float(np.mean(signature_a == signature_b))
+
+
+class DuplicateDetector:
+    """
+    Rilevatore incrementale di submission quasi-duplicate
+
+    Le coppie candidate vengono dalle bande LSH della firma della risposta; la somiglianza
+    delle tracce viene riportata ma non genera candidati da sola, perché agenti diversi
+    che seguono il piano ottimo producono legittimamente tracce identiche.
+
+    Args:
+        threshold: Somiglianza minima della risposta per segnalare una coppia
+        bands: Bande LSH (righe per banda = permutazioni / bande)
+        response_permutations: Lunghezza della firma delle risposte
+        trace_permutations: Lunghezza della firma delle tracce
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, bands: int = DEFAULT_BANDS,
+                 response_permutations: int = DEFAULT_RESPONSE_PERMUTATIONS,
+                 trace_permutations: int = DEFAULT_TRACE_PERMUTATIONS):
+        if response_permutations % bands:
+            raise ValueError(f"Le permutazioni ({response_permutations}) devono essere multiple delle bande ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = response_permutations // bands
+        self.response_hasher = MinHasher(response_permutations, seed=1)
+        self.trace_hasher = MinHasher(trace_permutations, seed=2)
+        self.documents: List[Dict] = []
+        self._buckets: Dict[tuple, List[int]] = defaultdict(list)
+        self.split_buckets = 0
+        self.truncated_buckets = 0
+
+    def add(self, key: str, participant_id: str, task_id: int, agent_response: str, steps: List) -> bool:
+        """
+        Aggiunge una submission
+
+        Returns:
+            False se la risposta è troppo corta per il confronto (submission ignorata)
+        """
+        if len(_WORD.findall(agent_response or '')) < MIN_RESPONSE_WORDS:
+            return False
+        response_signature = self.response_hasher.signature(response_shingles(agent_response))
+        index = len(self.documents)
+        self.documents.append({
+            'key': key,
+            'participant_id': participant_id,
+            'task_id': task_id,
+            'response': response_signature,
+            'trace': self.trace_hasher.signature(trace_shingles(steps or []))
+        })
+        for band in range(self.bands):
+            chunk = response_signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            self._buckets[(task_id, band, hash(chunk))].append(index)
+        return True
+
+    def _band_chunk(self, index: int, band: int) -> bytes:
+        return self.documents[index]['response'][band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _bucket_pairs(self, pairs: Set[tuple], members: List[int], band: int, depth: int = 1):
+        """Coppie di un bucket; se è troppo grande lo suddivide con la banda successiva"""
+        if len(members) < 2:
+            return
+        if len(members) <= MAX_BUCKET_PAIRS:
+            pairs.update(combinations(members, 2))
+            return
+        if depth >= self.bands:
+            # Firme uguali su tutte le bande: il collegamento a stella basta per i cluster
+            self.truncated_buckets += 1
+            pairs.update((members[0], other) for other in members[1:])
+            return
+
+        self.split_buckets += depth == 1
+        band = (band + 1) % self.bands
+        groups = defaultdict(list)
+        for index in members:
+            groups[self._band_chunk(index, band)].append(index)
+        # I gruppi restano collegati tra loro tramite il primo membro di ciascuno
+        leaders = [group[0] for group in groups.values()]
+        pairs.update((leaders[0], leader) for leader in leaders[1:])
+        for group in groups.values():
+            self._bucket_pairs(pairs, group, band, depth + 1)
+
+    def _candidate_pairs(self) -> Set[tuple]:
+        pairs = set()
+        self.split_buckets = 0
+        self.truncated_buckets = 0
+        for (_, band, _), members in self._buckets.items():
+            self._bucket_pairs(pairs, members, band)
+        return pairs
+
+    def find_duplicates(self) -> Dict:
+        """
+        Verifica le coppie candidate e raggruppa le submission collegate
+
+        Returns:
+            Dict con coppie sospette (ordinate per somiglianza), cluster e statistiche
+        """
+        documents = self.documents
+        suspicious = []
+        parent = list(range(len(documents)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        candidates = self._candidate_pairs()
+        flagged = set()
+        for first, second in candidates:
+            a, b = documents[first], documents[second]
+            if a['participant_id'] == b['participant_id'] and a['participant_id'] != 'Unknown':
+                continue
+            response_similarity = estimated_similarity(a['response'], b['response'])
+            if response_similarity < self.threshold:
+                continue
+            trace_similarity = estimated_similarity(a['trace'], b['trace'])
+            suspicious.append({
+                'file_a': a['key'],
+                'file_b': b['key'],
+                'participant_a': a['participant_id'],
+                'participant_b': b['participant_id'],
+                'task_id': a['task_id'],
+                'response_similarity': round(response_similarity, 3),
+                'trace_similarity': round(trace_similarity, 3) if trace_similarity is not None else None
+            })
+            parent[find(first)] = find(second)
+            flagged.update((first, second))
+
+        clusters = defaultdict(list)
+        for index in flagged:
+            clusters[find(index)].append(index)
+
+        suspicious.sort(key=lambda pair: (-pair['response_similarity'], -(pair['trace_similarity'] or 0)))
+        return {
+            'threshold': self.threshold,
+            'documents': len(documents),
+            'candidate_pairs': len(candidates),
+            'split_buckets': self.split_buckets,
+            'truncated_buckets': self.truncated_buckets,
+            'suspicious_pairs': suspicious,
+            'clusters': sorted(({
+                'task_id': documents[indexes[0]]['task_id'],
+                'files': sorted(documents[i]['key'] for i in indexes),
+                'participants': sorted({documents[i]['participant_id'] for i in indexes})
+            } for indexes in clusters.values()), key=lambda cluster: -len(cluster['files']))
+        }
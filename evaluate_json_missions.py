@@ -7,9 +7,17 @@ Sistema per valutare risultati salvati in file JSON individuali per ogni mission
 import json
 import os
 import glob
-from typing import Dict, List, Optional
+import re
+from contextlib import nullcontext
+from typing import Dict, List, Mapping, Optional
 from datetime import datetime
 from evaluation_system import HackathonEvaluator, display_evaluation_results
+from galaxy_engine import get_state_file_options
+from lazy_galaxy_state import open_galaxy_state
+from trajectory_replay import TrajectoryReplayer
+from pipeline_profiler import PipelineProfiler
+from result_table import ResultTable
+from duplicate_detection import DEFAULT_THRESHOLD, MAX_BUCKET_PAIRS, DuplicateDetector
 
 
 class JSONMissionEvaluator:
@@ -17,10 +25,46 @@ class JSONMissionEvaluator:
     Valuta risultati salvati in file JSON separati per ogni missione
     """
     
-    def __init__(self, round_number: int = 1):
+    def __init__(self, round_number: int = 1, verify_replay: bool = False,
+                 profiler: Optional[PipelineProfiler] = None, detect_duplicates: bool = False,
+                 duplicate_threshold: float = DEFAULT_THRESHOLD, efficiency_mode: str = 'calls',
+                 latency_weight: float = 0.5):
         self.round_number = round_number
-        self.evaluator = HackathonEvaluator(round_number)
-        self.results_cache = {}
+        self.evaluator = HackathonEvaluator(round_number, efficiency_mode, latency_weight)
+        # Un risultato per partecipante e missione, in forma colonnare compatta
+        self.results_table = ResultTable()
+        self.verify_replay = verify_replay
+        self._replayer = None
+        # 🕵️ Rilevamento opzionale di submission quasi-duplicate tra partecipanti
+        self.duplicate_detector = DuplicateDetector(duplicate_threshold) if detect_duplicates else None
+        self.duplicate_report = None
+        self.profiler = None
+        if profiler is not None:
+            self.set_profiler(profiler)
+    
+    @property
+    def results_cache(self) -> Mapping:
+        """Risultati del round per (participant_id, task_id): vista di sola lettura di results_table"""
+        return self.results_table.view(self.round_number)
+    
+    def set_profiler(self, profiler: Optional[PipelineProfiler]):
+        """
+        Attiva (o disattiva con None) la misura dei tempi per fase
+        
+        Args:
+            profiler: PipelineProfiler che riceve glob, json_decode, extract,
+                      task_csv, scoring e display di ogni file
+        """
+        self.profiler = profiler
+        self.evaluator.profiler = profiler
+    
+    def _phase(self, name: str):
+        """Contesto di misura della fase se il profiler è attivo, altrimenti nullo"""
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+    
+    def _file_scope(self, json_file: str):
+        """Contesto che attribuisce al file le fasi misurate al suo interno"""
+        return self.profiler.file(json_file) if self.profiler is not None else nullcontext()
     
     def find_mission_files(self, directory: str = ".", pattern: str = None) -> List[str]:
         """
@@ -47,13 +91,14 @@ class JSONMissionEvaluator:
         else:
             patterns = [pattern]
         
-        found_files = []
-        for pattern in patterns:
-            files = glob.glob(os.path.join(directory, pattern))
-            found_files.extend(files)
-        
-        # Rimuovi duplicati e ordina
-        found_files = sorted(list(set(found_files)))
+        with self._phase('glob'):
+            found_files = []
+            for pattern in patterns:
+                files = glob.glob(os.path.join(directory, pattern))
+                found_files.extend(files)
+            
+            # Rimuovi duplicati e ordina
+            found_files = sorted(list(set(found_files)))
         
         print(f"📁 Trovati {len(found_files)} file missione:")
         for file in found_files:
@@ -72,23 +117,15 @@ class JSONMissionEvaluator:
             Dict con i dati estratti o None se impossibile
         """
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Estrai task_id dal nome del file o dai dati
-            task_id = self._extract_task_id(json_file, data)
-            if task_id is None:
-                print(f"⚠️ Impossibile determinare task_id per {json_file}")
-                return None
+            with self._phase('json_decode'):
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
             
-            # Estrai dati richiesti con fallback intelligenti
-            extracted = {
-                'task_id': task_id,
-                'json_file': json_file,
-                'agent_response': self._extract_agent_response(data),
-                'intermediate_steps': self._extract_intermediate_steps(data),
-                'final_state': self._extract_final_state(data)
-            }
+            with self._phase('extract'):
+                extracted = self.parse_mission_data(data, json_file)
+                if extracted is None:
+                    print(f"⚠️ Impossibile determinare task_id per {json_file}")
+                    return None
             
             return extracted
             
@@ -96,6 +133,33 @@ class JSONMissionEvaluator:
             print(f"❌ Errore leggendo {json_file}: {e}")
             return None
     
+    def parse_mission_data(self, data: Dict, json_file: str = '') -> Optional[Dict]:
+        """
+        Estrae i dati per la valutazione da una submission già decodificata
+        
+        Args:
+            data: Contenuto JSON della submission
+            json_file: Nome del file (o nome logico) usato per task_id e partecipante se mancano nei dati
+            
+        Returns:
+            Dict con i dati estratti o None se il task_id non è determinabile
+        """
+        # Estrai task_id dal nome del file o dai dati
+        task_id = self._extract_task_id(json_file, data)
+        if task_id is None:
+            return None
+        
+        # Estrai dati richiesti con fallback intelligenti
+        return {
+            'task_id': task_id,
+            'participant_id': self._extract_participant_id(json_file, data),
+            'json_file': json_file,
+            'agent_response': self._extract_agent_response(data),
+            'intermediate_steps': self._extract_intermediate_steps(data),
+            'final_state': self._extract_final_state(data),
+            'has_final_state': self._find_explicit_final_state(data) is not None
+        }
+    
     def _extract_task_id(self, json_file: str, data: Dict) -> Optional[int]:
         """Estrae task_id dal nome del file o dai dati"""
         
@@ -108,7 +172,6 @@ class JSONMissionEvaluator:
             return int(data['id'])
         
         # Prova dal nome del file
-        import re
         filename = os.path.basename(json_file)
         
         # Pattern comuni: mission_1.json, task_2.json, etc.
@@ -130,6 +193,21 @@ class JSONMissionEvaluator:
         
         return None
     
+    def _extract_participant_id(self, json_file: str, data: Dict) -> str:
+        """Estrae l'identificativo del partecipante dai dati o dal prefisso del nome file"""
+        
+        for key in ('participant_id', 'participant', 'team_id', 'team', 'author'):
+            if data.get(key):
+                return str(data[key])
+        
+        # Pattern comuni: team42_mission_1.json, student_ID_task_3.json
+        filename = os.path.basename(json_file)
+        match = re.match(r'(.+?)_(?:round\d+_)?(?:mission|missione|task)_\d+', filename, re.IGNORECASE)
+        if match and not re.fullmatch(r'round\d+', match.group(1), re.IGNORECASE):
+            return match.group(1)
+        
+        return 'Unknown'
+    
     def _extract_agent_response(self, data: Dict) -> str:
         """Estrae la risposta dell'agente"""
         
@@ -153,7 +231,8 @@ class JSONMissionEvaluator:
         # Fallback finale
         return "Missione completata automaticamente tramite file JSON."
     
-    def _extract_intermediate_steps(self, data: Dict) -> List:
+    @staticmethod
+    def _extract_intermediate_steps(data: Dict) -> List:
         """Estrae i passi intermedi (tool calls)"""
         
         # Possibili chiavi per gli step intermedi
@@ -185,8 +264,8 @@ class JSONMissionEvaluator:
         # Fallback: 1 call simulata
         return [None]
     
-    def _extract_final_state(self, data: Dict) -> Dict:
-        """Estrae lo stato finale"""
+    def _find_explicit_final_state(self, data: Dict) -> Optional[Dict]:
+        """Restituisce lo stato finale dichiarato esplicitamente nella submission"""
         
         # Possibili chiavi per lo stato finale
         state_keys = [
@@ -198,6 +277,15 @@ class JSONMissionEvaluator:
             if key in data and isinstance(data[key], dict):
                 return data[key]
         
+        return None
+    
+    def _extract_final_state(self, data: Dict) -> Dict:
+        """Estrae lo stato finale"""
+        
+        explicit_state = self._find_explicit_final_state(data)
+        if explicit_state is not None:
+            return explicit_state
+        
         # Se non c'è stato esplicito, cerca di ricostruirlo
         reconstructed_state = {}
         
@@ -227,23 +315,19 @@ class JSONMissionEvaluator:
         # Fallback: carica dallo stato globale
         return self._load_current_galaxy_state()
     
-    def _load_current_galaxy_state(self) -> Dict:
-        """Carica lo stato attuale del galaxy_state.json"""
+    def _load_current_galaxy_state(self) -> Mapping:
+        """
+        Stato attuale del galaxy_state.json
         
-        # Opzioni di file di stato per il round corrente
-        state_file_options = [
-            f'ROUND {self.round_number} FILES/galaxy_state.json' if self.round_number == 1 else f'ROUND {self.round_number} FILES/galaxy_state_round{self.round_number}.json',
-            'ROUND 1 FILES/galaxy_state.json',
-            'ROUND 2 FILES/galaxy_state_round2.json',
-            'ROUND 3 FILES/galaxy_state_round3.json',
-            'galaxy_state.json'
-        ]
+        Il lettore è condiviso tra le submission e decodifica solo le sezioni lette
+        dalle regole di valutazione; viene reindicizzato se il file cambia.
+        """
         
-        for file_path in state_file_options:
+        # Opzioni di file di stato per il round corrente
+        for file_path in get_state_file_options(self.round_number):
             if os.path.exists(file_path):
                 try:
-                    with open(file_path, 'r') as f:
-                        return json.load(f)
+                    return open_galaxy_state(file_path)
                 except Exception as e:
                     print(f"⚠️ Errore caricando {file_path}: {e}")
                     continue
@@ -265,6 +349,10 @@ class JSONMissionEvaluator:
         Returns:
             Risultato della valutazione o None se errore
         """
+        with self._file_scope(json_file):
+            return self._evaluate_mission_file(json_file, display_results)
+    
+    def _evaluate_mission_file(self, json_file: str, display_results: bool) -> Optional[Dict]:
         print(f"\n🎯 Valutando missione: {json_file}")
         
         # Estrai dati dal file
@@ -272,6 +360,17 @@ class JSONMissionEvaluator:
         if not mission_data:
             return None
         
+        if self.duplicate_detector is not None:
+            with self._phase('duplicates'):
+                self.duplicate_detector.add(json_file, mission_data['participant_id'], mission_data['task_id'],
+                                            mission_data['agent_response'], mission_data['intermediate_steps'])
+        
+        # 🔁 Verifica opzionale del final_state tramite replay degli step
+        replay_verification = None
+        if self.verify_replay:
+            with self._phase('replay'):
+                replay_verification = self._verify_trajectory(mission_data)
+        
         # Esegui valutazione
         try:
             result = self.evaluator.evaluate_mission(
@@ -284,13 +383,17 @@ class JSONMissionEvaluator:
             # Aggiungi info sul file sorgente
             result['source_file'] = json_file
             result['round_number'] = self.round_number
+            result['participant_id'] = mission_data['participant_id']
+            if replay_verification is not None:
+                result['replay_verification'] = replay_verification
             
-            # Salva in cache
-            self.results_cache[mission_data['task_id']] = result
+            # Salva nella tabella (un risultato per partecipante e missione)
+            self.results_table.add(result)
             
             if display_results:
-                display_evaluation_results(result, self.round_number)
-                print(f"📁 Fonte: {json_file}")
+                with self._phase('display'):
+                    display_evaluation_results(result, self.round_number)
+                    print(f"📁 Fonte: {json_file}")
             
             return result
             
@@ -298,16 +401,48 @@ class JSONMissionEvaluator:
             print(f"❌ Errore valutando {json_file}: {e}")
             return None
     
-    def evaluate_all_missions(self, directory: str = ".", pattern: str = None) -> Dict:
+    def _verify_trajectory(self, mission_data: Dict) -> Optional[Dict]:
+        """
+        Riesegue gli intermediate_steps sullo stato iniziale del round
+        
+        Se la submission non dichiara un final_state, lo stato rieseguito
+        sostituisce la ricostruzione parziale / il file di stato del round.
+        """
+        try:
+            if self._replayer is None:
+                self._replayer = TrajectoryReplayer(self.round_number)
+            
+            steps = mission_data['intermediate_steps']
+            claimed_state = mission_data['final_state'] if mission_data['has_final_state'] else None
+            verification = self._replayer.verify(steps, claimed_state)
+            
+            if claimed_state is None and verification['replayed_steps'] > 0:
+                mission_data['final_state'] = self._replayer.replayed_state(steps)
+                verification['final_state_source'] = 'replay'
+            
+            if verification['mismatches']:
+                print(f"⚠️ final_state non riproducibile dagli step ({len(verification['mismatches'])} differenze)")
+            
+            return verification
+            
+        except Exception as e:
+            print(f"⚠️ Replay non riuscito per {mission_data['json_file']}: {e}")
+            return None
+    
+    def evaluate_all_missions(self, directory: str = ".", pattern: str = None) -> Dict[int, Dict]:
         """
         Valuta tutte le missioni trovate in una directory
         
+        Tutti i risultati, per partecipante e missione, restano in results_table e nella vista
+        results_cache indicizzata per (participant_id, task_id).
+        
         Args:
             directory: Directory di ricerca
             pattern: Pattern personalizzato per i file
             
         Returns:
-            Dict con tutti i risultati
+            Dict task_id -> risultato dei file valutati (con più partecipanti sulla stessa missione
+            resta l'ultimo valutato)
         """
         print(f"\n🔍 Cercando missioni in: {directory}")
         
@@ -318,14 +453,14 @@ class JSONMissionEvaluator:
             print("❌ Nessun file missione trovato!")
             return {}
         
-        # Valuta ogni missione
-        all_results = {}
+        # Valuta ogni missione (i risultati finiscono anche in results_table)
+        results = {}
         successful_evaluations = 0
         
         for json_file in mission_files:
             result = self.evaluate_mission_file(json_file)
             if result:
-                all_results[result['task_id']] = result
+                results[result['task_id']] = result
                 successful_evaluations += 1
         
         # Riassunto finale
@@ -334,57 +469,100 @@ class JSONMissionEvaluator:
         print(f"   ✅ Valutazioni riuscite: {successful_evaluations}")
         print(f"   ❌ Valutazioni fallite: {len(mission_files) - successful_evaluations}")
         
-        if all_results:
-            # Calcola statistiche
-            total_score = sum(r['total_score'] for r in all_results.values())
-            max_possible = sum(r['max_score'] for r in all_results.values())
-            avg_percentage = sum(r['percentage'] for r in all_results.values()) / len(all_results)
-            
+        summary = self.results_table.summary()
+        if summary['missions_completed']:
             print(f"\n🏆 STATISTICHE FINALI:")
-            print(f"   🎯 Punteggio totale: {total_score:.1f}/{max_possible}")
-            print(f"   📈 Percentuale media: {avg_percentage:.1f}%")
-            print(f"   🚀 Missioni completate: {len(all_results)}")
+            print(f"   🎯 Punteggio totale: {summary['total_score']:.1f}/{summary['max_possible_score']:g}")
+            print(f"   📈 Percentuale media: {summary['average_score']:.1f}%")
+            print(f"   🚀 Missioni completate: {summary['missions_completed']} "
+                  f"({summary['participants']} partecipanti)")
+        
+        if self.duplicate_detector is not None:
+            self.find_near_duplicates()
+        
+        return results
+    
+    def find_near_duplicates(self) -> Optional[Dict]:
+        """
+        Cerca submission quasi-duplicate tra quelle valutate finora (MinHash/LSH)
+        
+        Returns:
+            Report con coppie sospette e cluster, None se il rilevamento non è attivo
+        """
+        if self.duplicate_detector is None:
+            return None
         
-        return all_results
+        self.duplicate_report = self.duplicate_detector.find_duplicates()
+        pairs = self.duplicate_report['suspicious_pairs']
+        print(f"\n🕵️ SUBMISSION QUASI-DUPLICATE (somiglianza risposta ≥ {self.duplicate_report['threshold']:.0%}):")
+        print(f"   🔎 Coppie candidate LSH: {self.duplicate_report['candidate_pairs']}")
+        if self.duplicate_report['split_buckets']:
+            print(f"   ✂️ Bucket LSH oltre {MAX_BUCKET_PAIRS} submission suddivisi con le bande successive: "
+                  f"{self.duplicate_report['split_buckets']} "
+                  f"({self.duplicate_report['truncated_buckets']} troncati a stella)")
+        print(f"   ⚠️ Coppie sospette: {len(pairs)} in {len(self.duplicate_report['clusters'])} cluster")
+        for pair in pairs[:10]:
+            trace = f", traccia {pair['trace_similarity']:.0%}" if pair['trace_similarity'] is not None else ''
+            print(f"   • Task {pair['task_id']}: {pair['participant_a']} ↔ {pair['participant_b']} "
+                  f"(risposta {pair['response_similarity']:.0%}{trace})")
+        return self.duplicate_report
     
-    def save_aggregated_results(self, results: Dict, output_file: str = None):
+    def save_aggregated_results(self, results: Mapping = None, output_file: str = None):
         """
         Salva i risultati aggregati in formato compatibile
         
+        I risultati sono indicizzati per partecipante e missione ("participant_id/task_id"):
+        più partecipanti sulla stessa missione restano tutti nel file.
+        
         Args:
-            results: Risultati da evaluate_all_missions
+            results: Risultati da esportare (default: tutti quelli di results_table)
             output_file: File di output (default: hackathon_results_from_json.json)
         """
         if output_file is None:
             output_file = f"hackathon_results_from_json_round{self.round_number}.json"
         
+        if results is None:
+            table = self.results_table
+        else:
+            table = ResultTable()
+            table.extend(results.values(), self.round_number)
+        summary = table.summary()
+        
+        individual_scores = {}
+        detailed_results = {}
+        for result in table.records():
+            key = f"{result['participant_id']}/{result['task_id']}"
+            individual_scores[f"{result['participant_id']}/mission_{result['task_id']}"] = float(result['total_score'])
+            detailed_results[key] = {
+                **result,
+                "total_score": float(result['total_score']),
+                "correctness": float(result['correctness']),
+                "efficiency": float(result['efficiency']),
+                "quality": float(result['quality']),
+                "percentage": float(result['percentage']),
+                "max_score": float(result['max_score'])
+            }
+        
         # Formato compatibile con il sistema esistente
         aggregated = {
             "timestamp": datetime.now().isoformat(),
             "round_number": self.round_number,
-            "missions_completed": len(results),
-            "individual_scores": {
-                f"mission_{task_id}": float(result['total_score'])
-                for task_id, result in results.items()
-            },
-            "detailed_results": {
-                str(k): {
-                    **v,
-                    "total_score": float(v['total_score']),
-                    "correctness": float(v['correctness']),
-                    "efficiency": float(v['efficiency']),
-                    "quality": float(v['quality']),
-                    "percentage": float(v['percentage']),
-                    "max_score": float(v['max_score'])
-                }
-                for k, v in results.items()
-            },
-            "average_score": float(sum(r['percentage'] for r in results.values()) / len(results) if results else 0),
-            "total_api_calls": int(sum(r['api_calls_used'] for r in results.values())),
-            "total_score": float(sum(r['total_score'] for r in results.values())),
-            "max_possible_score": float(sum(r['max_score'] for r in results.values()))
+            "missions_completed": summary['missions_completed'],
+            "participants": summary['participants'],
+            "individual_scores": individual_scores,
+            "detailed_results": detailed_results,
+            "average_score": summary['average_score'],
+            "total_api_calls": summary['total_api_calls'],
+            "total_score": summary['total_score'],
+            "max_possible_score": summary['max_possible_score']
         }
         
+        if self.profiler is not None:
+            aggregated["profile"] = self.profiler.summary()
+        
+        if self.duplicate_report is not None:
+            aggregated["near_duplicates"] = self.duplicate_report
+        
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(aggregated, f, indent=2, ensure_ascii=False)
         
@@ -403,18 +581,54 @@ def main():
     parser.add_argument('--directory', type=str, default='.', help='Directory di ricerca')
     parser.add_argument('--pattern', type=str, help='Pattern personalizzato per i file')
     parser.add_argument('--output', type=str, help='File di output per i risultati')
+    parser.add_argument('--verify-replay', action='store_true',
+                        help='Riesegue gli intermediate_steps e verifica il final_state dichiarato')
+    parser.add_argument('--efficiency-mode', choices=HackathonEvaluator.EFFICIENCY_MODES, default='calls',
+                        help="'blended' combina numero di API calls e tempo reale degli step (default: calls)")
+    parser.add_argument('--latency-weight', type=float, default=0.5,
+                        help='Peso del tempo reale nella modalità blended (default: 0.5)')
+    parser.add_argument('--detect-duplicates', action='store_true',
+                        help='Segnala submission quasi-duplicate tra partecipanti diversi (MinHash/LSH)')
+    parser.add_argument('--duplicate-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Somiglianza minima delle risposte per segnalare una coppia (default: 0.7)')
+    parser.add_argument('--store', type=str,
+                        help='Salva ogni risultato (per partecipante e missione) in questo database SQLite')
+    parser.add_argument('--profile', action='store_true',
+                        help='Misura i tempi per fase di ogni file e li aggiunge ai risultati')
+    parser.add_argument('--profile-dump', type=str,
+                        help='Salva un dump pstats (cProfile) dei file più lenti (implica --profile)')
+    parser.add_argument('--profile-top', type=int, default=10,
+                        help='Numero di file lenti da profilare con --profile-dump (default: 10)')
     
     args = parser.parse_args()
     
     # Crea valutatore
-    evaluator = JSONMissionEvaluator(args.round)
+    profiler = None
+    if args.profile or args.profile_dump:
+        profiler = PipelineProfiler(cprofile_top=args.profile_top if args.profile_dump else 0)
+    evaluator = JSONMissionEvaluator(args.round, verify_replay=args.verify_replay, profiler=profiler,
+                                     detect_duplicates=args.detect_duplicates,
+                                     duplicate_threshold=args.duplicate_threshold,
+                                     efficiency_mode=args.efficiency_mode, latency_weight=args.latency_weight)
     
     # Valuta tutte le missioni
     results = evaluator.evaluate_all_missions(args.directory, args.pattern)
     
+    if profiler is not None:
+        profiler.print_summary()
+        if args.profile_dump:
+            dumped = profiler.dump_slowest(args.profile_dump)
+            print(f"💾 Profilo cProfile di {len(dumped)} file salvato in {args.profile_dump} "
+                  f"(python -m pstats {args.profile_dump})")
+    
     # Salva risultati
     if results:
-        evaluator.save_aggregated_results(results, args.output)
+        evaluator.save_aggregated_results(output_file=args.output)
+        if args.store:
+            from results_store import ResultsStore
+            with ResultsStore(args.store) as store:
+                written = store.upsert_results(evaluator.results_table, args.round)
+            print(f"🗄️ {written} risultati salvati in {args.store}")
     else:
         print("❌ Nessun risultato da salvare")
 
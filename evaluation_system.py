@@ -2,20 +2,52 @@
 📊 Sistema di Valutazione Automatico - Hackathon Agenti Cosmici
 """
 
+import copy
 import json
+import math
 import pandas as pd
 import os
-from typing import Dict, List, Tuple
+import re
+from contextlib import nullcontext
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
 from datetime import datetime
 
+from galaxy_engine import (TOOL_ALIASES, find_galaxy_state_file, get_initial_state_file, load_initial_state,
+                           normalize_step)
+from lazy_galaxy_state import LazyGalaxyState
+from result_table import ResultTable
+from purchase_optimizer import (match_purchases, max_items_within_budget,
+                                most_expensive_then_fill, purchased_items)
+from route_optimizer import parse_travel_costs, route_optimality
+from step_timing import analyze_timing
+from synthetic_galaxy import SYNTHETIC_TASK_KINDS
+from task_oracle import load_task_oracle
+
+# Marcatori di una rotta pianificata nella risposta: frecce tra i pianeti o elenco numerato
+_ROUTE_ARROW = re.compile(r'\s*(?:->|=>|→|⟶|➡️?)\s*')
+_NUMBERED_ITEM = re.compile(r'^\s*\d+[.)]\s+(.*)$', re.MULTILINE)
+
 
 class HackathonEvaluator:
     """Sistema di valutazione per le missioni dell'hackathon"""
     
-    def __init__(self, round_number: int = 1):
+    EFFICIENCY_MODES = ('calls', 'blended')
+    
+    def __init__(self, round_number: int = 1, efficiency_mode: str = 'calls', latency_weight: float = 0.5):
+        if efficiency_mode not in self.EFFICIENCY_MODES:
+            raise ValueError(f"Modalità di efficienza sconosciuta: {efficiency_mode} (attese: {', '.join(self.EFFICIENCY_MODES)})")
         self.round_number = round_number
+        # 'calls': solo numero di API calls; 'blended': anche il tempo reale misurato negli step
+        self.efficiency_mode = efficiency_mode
+        self.latency_weight = latency_weight
+        # PipelineProfiler opzionale: se impostato misura caricamento CSV e scoring
+        self.profiler = None
         self.load_configurations()
     
+    def _phase(self, name: str):
+        """Contesto di misura della fase se il profiler è attivo, altrimenti nullo"""
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+    
     def load_configurations(self):
         """Carica le configurazioni per il round attuale"""
         self.scoring_weights = {
@@ -29,6 +61,130 @@ class HackathonEvaluator:
             2: {"excellent": 5, "good": 8, "acceptable": 12},
             3: {"excellent": 8, "good": 12, "acceptable": 15}
         }
+        
+        # Round senza configurazione propria (galassie sintetiche) usano quella del round 3
+        # e lo schema dei task di synthetic_galaxy.py
+        self.synthetic_round = self.round_number not in self.scoring_weights
+        self.config_round = 3 if self.synthetic_round else self.round_number
+        
+        # Soglie relative al piano minimo dell'oracolo: moltiplicatori + chiamate di lettura concesse
+        self.oracle_threshold_factors = {"excellent": 1.5, "good": 2.5, "acceptable": 4.0}
+        self.oracle_read_allowance = 2
+        
+        # Modalità 'blended': latenza attesa per chiamata (baseline = chiamate minime × latenza)
+        # e frazione del punteggio per rapporto tempo reale / baseline
+        self.default_call_latency_s = 0.5
+        self.latency_bands = [(1.0, 1.0), (2.0, 0.8), (4.0, 0.6)]
+        self.latency_floor = 0.3
+        
+        # Missioni di logistica valutate contro la rotta ottima: (round, task_id)
+        self.logistics_tasks = {(2, 3), (3, 3)}
+        
+        # Missioni di acquisto valutate contro la selezione ottima: (round, task_id) -> obiettivo
+        self.purchase_tasks = {
+            (2, 4): "most_expensive_then_fill",
+            (2, 6): "max_items"
+        }
+        
+        if self.synthetic_round:
+            for task_id, kind in SYNTHETIC_TASK_KINDS.items():
+                if kind == "visit_all":
+                    self.logistics_tasks.add((self.round_number, task_id))
+                elif kind in ("most_expensive_then_fill", "max_items"):
+                    self.purchase_tasks[(self.round_number, task_id)] = kind
+        
+        self._initial_state = None
+        self._initial_state_loaded = False
+        self._task_oracle = None
+        self._tasks = None
+        self._tasks_version = None
+    
+    def get_task_oracle(self) -> Dict[int, Dict]:
+        """Tabella oracolo del round (vuota se non disponibile), caricata una sola volta"""
+        if self._task_oracle is None:
+            self._task_oracle = load_task_oracle(self.round_number)
+        return self._task_oracle
+    
+    def get_efficiency_thresholds(self, task_id: int = None) -> Dict[str, int]:
+        """
+        Soglie di API calls per una missione
+        
+        Se l'oracolo conosce il numero minimo di chiamate per il task, le soglie
+        sono calcolate rispetto a quel minimo; altrimenti si usano quelle fisse del round.
+        """
+        oracle_entry = self.get_task_oracle().get(task_id) if task_id is not None else None
+        if oracle_entry is None:
+            return self.max_api_calls[self.config_round]
+        
+        baseline = max(oracle_entry['min_api_calls'], 1)
+        return {
+            level: math.ceil(baseline * factor) + self.oracle_read_allowance
+            for level, factor in self.oracle_threshold_factors.items()
+        }
+    
+    def find_task_file(self) -> str:
+        """Path del file tasks del round, con auto-detection e fallback"""
+        task_file_options = [
+            f'ROUND {self.round_number} FILES/tasks.csv' if self.round_number == 1 else f'ROUND {self.round_number} FILES/tasks_round{self.round_number}.csv',
+            'ROUND 1 FILES/tasks.csv',  # Fallback
+            'ROUND 2 FILES/tasks_round2.csv',
+            'ROUND 3 FILES/tasks_round3.csv',
+            'tasks.csv'  # Fallback legacy
+        ]
+        
+        for file_path in task_file_options:
+            if os.path.exists(file_path):
+                return file_path
+        
+        raise FileNotFoundError(f"⚠️ Nessun file tasks trovato per il round {self.round_number}")
+    
+    def get_tasks(self) -> Dict[int, Dict]:
+        """
+        Tabella dei task del round indicizzata per task_id
+        
+        Il CSV viene letto una sola volta e riletto solo se cambia il suo mtime.
+        """
+        task_file = self.find_task_file()
+        version = (task_file, os.stat(task_file).st_mtime_ns)
+        if self._tasks is None or self._tasks_version != version:
+            tasks_df = pd.read_csv(task_file)
+            self._tasks = {int(row['task_id']): row for row in tasks_df.to_dict('records')}
+            self._tasks_version = version
+        return self._tasks
+    
+    def get_latency_baseline(self, task_id: int) -> float:
+        """
+        Tempo di riferimento (secondi) di una missione per la modalità 'blended'
+        
+        Usa la colonna 'latency_baseline_s' del CSV dei task se presente, altrimenti
+        le chiamate minime dell'oracolo (o la soglia 'excellent') per la latenza attesa.
+        """
+        task = self.get_tasks().get(task_id, {})
+        baseline = task.get('latency_baseline_s')
+        if baseline is not None and baseline == baseline and baseline > 0:  # esclude NaN
+            return float(baseline)
+        
+        oracle_entry = self.get_task_oracle().get(task_id)
+        calls = oracle_entry['min_api_calls'] if oracle_entry else self.get_efficiency_thresholds(task_id)['excellent']
+        return max(calls, 1) * self.default_call_latency_s
+    
+    def get_initial_state(self) -> Optional[Dict]:
+        """
+        Stato galattico iniziale del round (copia privata caricata una sola volta)
+        
+        Il file di stato del round viene riscritto dagli agenti durante la missione: lo
+        stato iniziale si legge solo dalla copia intatta '*_initial.json' accanto ad esso.
+        
+        Returns:
+            Stato iniziale, None se la copia intatta non esiste
+        """
+        if not self._initial_state_loaded:
+            self._initial_state = load_initial_state(self.round_number)
+            self._initial_state_loaded = True
+            if self._initial_state is None:
+                print(f"⚠️ Nessuno stato iniziale intatto per il round {self.round_number} "
+                      f"({get_initial_state_file(self.round_number)}): valutazione di ottimalità saltata")
+        return self._initial_state
     
     def get_max_scores_for_round(self, max_score: int) -> Dict[str, float]:
         """
@@ -41,7 +197,7 @@ class HackathonEvaluator:
         Returns:
             Dict con i punteggi massimi per correctness, efficiency, quality
         """
-        weights = self.scoring_weights[self.round_number]
+        weights = self.scoring_weights[self.config_round]
         
         return {
             "correctness_max": max_score * (weights["correctness"] / 100),
@@ -86,31 +242,24 @@ class HackathonEvaluator:
             Dict con punteggi dettagliati
         """
         
-        # Carica task details con auto-detection
-        task_file_options = [
-            f'ROUND {self.round_number} FILES/tasks.csv' if self.round_number == 1 else f'ROUND {self.round_number} FILES/tasks_round{self.round_number}.csv',
-            'ROUND 1 FILES/tasks.csv',  # Fallback
-            'ROUND 2 FILES/tasks_round2.csv',
-            'ROUND 3 FILES/tasks_round3.csv',
-            'tasks.csv'  # Fallback legacy
-        ]
-        
-        task_file = None
-        for file_path in task_file_options:
-            if os.path.exists(file_path):
-                task_file = file_path
-                break
-        
-        if not task_file:
-            raise FileNotFoundError(f"⚠️ Nessun file tasks trovato per il round {self.round_number}")
-        
-        tasks_df = pd.read_csv(task_file)
-        task_row = tasks_df[tasks_df['task_id'] == task_id].iloc[0]
-        max_score = task_row['max_score']
+        # Carica task details (CSV riletto solo se il file è cambiato)
+        with self._phase('task_csv'):
+            tasks = self.get_tasks()
+            if task_id not in tasks:
+                raise KeyError(f"⚠️ Task {task_id} non presente nel file tasks del round {self.round_number}")
+            max_score = tasks[task_id]['max_score']
         
+        with self._phase('scoring'):
+            return self._score_mission(task_id, agent_response, intermediate_steps, final_state, max_score)
+    
+    def _score_mission(self, task_id: int, agent_response: str, intermediate_steps: List,
+                       final_state: Dict, max_score) -> Dict:
+        """Calcola correttezza, efficienza e qualità e compone il risultato della missione"""
         # Calcola i 3 componenti del punteggio
-        correctness_score = self._evaluate_correctness(task_id, final_state, max_score)
-        efficiency_score = self._evaluate_efficiency(intermediate_steps, max_score)
+        correctness_score = self._evaluate_correctness(task_id, final_state, max_score,
+                                                       intermediate_steps, agent_response)
+        timing = analyze_timing(intermediate_steps)
+        efficiency_score = self._evaluate_efficiency(intermediate_steps, max_score, task_id, timing)
         quality_score = self._evaluate_quality(agent_response, max_score)
         
         # Calcola i valori massimi per questo round
@@ -127,7 +276,7 @@ class HackathonEvaluator:
         # 🛡️ SICUREZZA FINALE: Il punteggio totale non deve mai superare il massimo
         total_score = min(total_score, max_score)
         
-        return {
+        result = {
             "task_id": task_id,
             "max_score": max_score,
             "correctness": correctness_score,
@@ -140,15 +289,39 @@ class HackathonEvaluator:
             # 🌟 NUOVO: Includi i valori massimi calcolati automaticamente
             "max_scores": max_scores
         }
+        
+        # ⏲️ Tempi reali, se gli step riportano timestamp o durate
+        if timing is not None:
+            timing['baseline_s'] = round(self.get_latency_baseline(task_id), 4)
+            result["evaluation_details"]["timing"] = timing
+        
+        return result
     
-    def _evaluate_correctness(self, task_id: int, final_state: Dict, max_score: int) -> float:
+    def _evaluate_correctness(self, task_id: int, final_state: Dict, max_score: int,
+                              intermediate_steps: List = None, agent_response: str = None) -> float:
         """Valuta se la missione è stata completata correttamente"""
         
         # Calcola il punteggio massimo per correttezza
-        max_correctness_score = max_score * (self.scoring_weights[self.round_number]["correctness"] / 100)
+        max_correctness_score = max_score * (self.scoring_weights[self.config_round]["correctness"] / 100)
+        
+        # Senza stato iniziale intatto rotta e acquisti non sono confrontabili con l'ottimo:
+        # la missione non viene penalizzata
+        optimality_task = ((self.round_number, task_id) in self.logistics_tasks
+                           or (self.round_number, task_id) in self.purchase_tasks)
+        if optimality_task and self.get_initial_state() is None:
+            return max_correctness_score if intermediate_steps or self._has_attempted_task(final_state) else 0
+        
+        # 🗺️ Missioni di logistica: confronto con la rotta ottima
+        if (self.round_number, task_id) in self.logistics_tasks:
+            return self._evaluate_route_optimality(intermediate_steps or [], agent_response or "",
+                                                   final_state, max_correctness_score)
+        
+        # 🛒 Missioni di acquisto: confronto con la selezione ottima
+        if (self.round_number, task_id) in self.purchase_tasks:
+            return self._evaluate_purchase_optimality(task_id, final_state, max_correctness_score)
         
         # Regole di valutazione per task specifici
-        correctness_rules = {
+        correctness_rules = self._synthetic_correctness_rules() if self.synthetic_round else {
             # Round 1
             1: lambda state: self._check_droid_location(state, "Coruscant"),
             2: lambda state: self._check_inventory_contains(state, "Walkman degli Antichi"),
@@ -183,11 +356,140 @@ class HackathonEvaluator:
             else:
                 return 0
     
-    def _evaluate_efficiency(self, intermediate_steps: List, max_score: int) -> float:
-        """Valuta l'efficienza basata sul numero di API calls"""
+    def _synthetic_correctness_rules(self) -> Dict[int, Callable[[Dict], bool]]:
+        """Regole di correttezza di un round sintetico, dai bersagli del CSV dei task"""
+        targets = {task_id: task.get('target') for task_id, task in self.get_tasks().items()}
+        rules = {}
+        for task_id, kind in SYNTHETIC_TASK_KINDS.items():
+            target = targets.get(task_id)
+            has_target = isinstance(target, str) and target != ""  # le celle vuote arrivano come NaN
+            if kind == "travel" and has_target:
+                rules[task_id] = lambda state, planet=target: self._check_droid_location(state, planet)
+            elif kind == "purchase" and has_target:
+                rules[task_id] = lambda state, item=target: self._check_inventory_contains(state, item)
+            elif kind in ("query", "query_all"):
+                rules[task_id] = lambda state: True  # Info task - sempre corretto se chiamato
+        return rules
+    
+    def _evaluate_route_optimality(self, intermediate_steps: List, agent_response: str,
+                                   final_state: Dict, max_correctness_score: float) -> float:
+        """
+        Valuta una missione di logistica confrontando la rotta con l'ottimo
+        
+        La rotta viene ricostruita dai book_travel degli step; solo se l'agente non ha
+        prenotato viaggi, dalla rotta esplicita nella risposta (frecce o elenco numerato).
+        """
+        initial_state = self.get_initial_state()
+        
+        travel_costs = initial_state.get('travel_costs', {})
+        route = self._extract_route(intermediate_steps, agent_response, initial_state)
+        optimality = route_optimality(route, travel_costs)
+        
+        if optimality is None or not optimality['visits_all_planets']:
+            # Partial credit se almeno ha provato
+            if route or self._has_attempted_task(final_state):
+                return min(max_correctness_score * 0.3, max_correctness_score)
+            return 0
+        
+        return min(max_correctness_score * optimality['optimality_ratio'], max_correctness_score)
+    
+    def _evaluate_purchase_optimality(self, task_id: int, final_state: Dict,
+                                      max_correctness_score: float) -> float:
+        """Valuta gli acquisti confrontandoli con la selezione ottima per il budget iniziale"""
+        initial_state = self.get_initial_state()
+        
+        marketplace = initial_state.get('marketplace', {})
+        budget = initial_state.get('client', {}).get('balance', 0)
+        
+        item_ids, _ = match_purchases(marketplace, purchased_items(initial_state, final_state))
+        spent = sum(marketplace[item_id].get('price', 0) for item_id in item_ids)
+        
+        if not item_ids or spent > budget:
+            # Partial credit se almeno ha provato
+            if item_ids or self._has_attempted_task(final_state):
+                return min(max_correctness_score * 0.3, max_correctness_score)
+            return 0
+        
+        objective = self.purchase_tasks[(self.round_number, task_id)]
+        if objective == "max_items":
+            optimum = max_items_within_budget(marketplace, budget)
+            ratio = len(item_ids) / optimum['count'] if optimum['count'] else 1.0
+        else:
+            optimum = most_expensive_then_fill(marketplace, budget)
+            anchor_price = marketplace[optimum['anchor_item']].get('price', 0) if optimum['anchor_item'] else 0
+            bought_anchor = any(marketplace[item_id].get('price', 0) == anchor_price for item_id in item_ids)
+            if not bought_anchor:
+                return min(max_correctness_score * 0.3, max_correctness_score)
+            ratio = spent / optimum['spent'] if optimum['spent'] else 1.0
+        
+        return min(max_correctness_score * min(ratio, 1.0), max_correctness_score)
+    
+    def _extract_route(self, intermediate_steps: List, agent_response: str,
+                       initial_state: Dict) -> List[str]:
+        """Ricostruisce la sequenza di pianeti visitati da un droide"""
+        droids = initial_state.get('droids', {})
+        
+        legs = {}
+        booked = False
+        for step in intermediate_steps:
+            normalized = normalize_step(step)
+            if normalized is None or TOOL_ALIASES.get(normalized[0]) != 'book_travel':
+                continue
+            booked = True
+            args = normalized[1]
+            droid = args.get('asset') or args.get('droid') or 'R2-D2'
+            destination = args.get('destination') or args.get('to')
+            if destination:
+                legs.setdefault(droid, []).append(destination)
+        
+        if booked:
+            if not legs:
+                return []
+            # Il droide con più spostamenti è quello che ha eseguito la rotta
+            droid, destinations = max(legs.items(), key=lambda item: len(item[1]))
+            start = droids.get(droid, {}).get('location')
+            return ([start] if start else []) + destinations
+        
+        # Rotta solo pianificata: serve un marcatore esplicito (frecce o elenco numerato),
+        # le semplici menzioni dei pianeti nella risposta non bastano
+        planets, _ = parse_travel_costs(initial_state.get('travel_costs', {}))
+        arrow_routes = [[self._first_planet(segment, planets) for segment in _ROUTE_ARROW.split(line)]
+                        for line in agent_response.splitlines() if _ROUTE_ARROW.search(line)]
+        if arrow_routes:
+            return max(([p for p in route if p] for route in arrow_routes), key=len)
+        listed = [self._first_planet(item, planets) for item in _NUMBERED_ITEM.findall(agent_response)]
+        return [planet for planet in listed if planet]
+    
+    @staticmethod
+    def _first_planet(text: str, planets) -> str:
+        """Primo pianeta citato nel testo (a parità di posizione il nome più lungo), '' se nessuno"""
+        text_lower = text.lower()
+        mentions = [(text_lower.find(p.lower()), -len(p), p) for p in planets if p.lower() in text_lower]
+        return min(mentions)[2] if mentions else ''
+    
+    def _evaluate_efficiency(self, intermediate_steps: List, max_score: int, task_id: int = None,
+                             timing: Dict = None) -> float:
+        """
+        Valuta l'efficienza basata sul numero di API calls
+        
+        In modalità 'blended', se gli step riportano i tempi, il punteggio combina
+        numero di chiamate e tempo reale rispetto alla baseline del task (peso latency_weight).
+        """
+        calls_score = self._evaluate_call_efficiency(intermediate_steps, max_score, task_id)
+        if self.efficiency_mode != 'blended' or not timing:
+            return calls_score
+        
+        max_efficiency_score = max_score * (self.scoring_weights[self.config_round]["efficiency"] / 100)
+        ratio = timing['wall_time_s'] / self.get_latency_baseline(task_id)
+        fraction = next((value for limit, value in self.latency_bands if ratio <= limit), self.latency_floor)
+        blended = (1 - self.latency_weight) * calls_score + self.latency_weight * max_efficiency_score * fraction
+        return min(blended, max_efficiency_score)
+    
+    def _evaluate_call_efficiency(self, intermediate_steps: List, max_score: int, task_id: int = None) -> float:
+        """Efficienza dal solo numero di API calls, rispetto alle soglie del task"""
         api_calls = len(intermediate_steps)
-        thresholds = self.max_api_calls[self.round_number]
-        max_efficiency_score = max_score * (self.scoring_weights[self.round_number]["efficiency"] / 100)
+        thresholds = self.get_efficiency_thresholds(task_id)
+        max_efficiency_score = max_score * (self.scoring_weights[self.config_round]["efficiency"] / 100)
         
         # 🌟 BONUS: Se ha fatto 0 API calls (missione già completata), dai punteggio pieno
         if api_calls == 0:
@@ -209,7 +511,7 @@ class HackathonEvaluator:
     
     def _evaluate_quality(self, agent_response: str, max_score: int) -> float:
         """Valuta la qualità della risposta"""
-        max_quality_score = max_score * (self.scoring_weights[self.round_number]["quality"] / 100)
+        max_quality_score = max_score * (self.scoring_weights[self.config_round]["quality"] / 100)
         
         if not agent_response:
             return min(max_quality_score * 0.1, max_quality_score)  # Minimo se nessuna risposta
@@ -410,11 +712,16 @@ class HackathonEvaluator:
             "tools_used": tools_used
         }
     
-    def generate_leaderboard(self, all_results: List[Dict]) -> pd.DataFrame:
-        """Genera la classifica finale"""
+    def generate_leaderboard(self, all_results: Union[List[Dict], ResultTable]) -> pd.DataFrame:
+        """Genera la classifica finale (da lista di risultati o da ResultTable)"""
         # Raggruppa per partecipante
         participant_scores = {}
         
+        # 🧮 Tabella colonnare: aggregazione direttamente sulle colonne, round di ogni riga
+        if isinstance(all_results, ResultTable):
+            participant_scores = all_results.participant_totals()
+            all_results = []
+        
         for result in all_results:
             participant = result.get('participant_id', 'Unknown')
             if participant not in participant_scores:
@@ -426,7 +733,8 @@ class HackathonEvaluator:
             
             participant_scores[participant]['total_score'] += result['total_score']
             participant_scores[participant]['missions_completed'] += 1
-            participant_scores[participant]['round_scores'][self.round_number] += result['total_score']
+            round_scores = participant_scores[participant]['round_scores']
+            round_scores[self.round_number] = round_scores.get(self.round_number, 0) + result['total_score']
         
         # Crea DataFrame per classifica
         leaderboard_data = []
@@ -453,55 +761,149 @@ class HackathonEvaluator:
                   'Round 1', 'Round 2', 'Round 3', 'Average Score']]
 
 
+class EvaluationSession:
+    """
+    Sessione di valutazione "calda" per i loop nei notebook
+    
+    Mantiene un HackathonEvaluator, la tabella dei task e lo stato del round in memoria;
+    il file di stato viene riletto solo quando cambiano mtime o dimensione, e i punteggi
+    calcolati sullo stato del file vengono riusati finché il file non cambia.
+    
+    Args:
+        round_number: Numero del round
+        state_file: File di stato da osservare (default: auto-detection del round)
+    """
+    
+    def __init__(self, round_number: int = 1, state_file: str = None):
+        self.round_number = round_number
+        self.evaluator = HackathonEvaluator(round_number)
+        self.state_file = state_file or find_galaxy_state_file(round_number)
+        if not self.state_file:
+            raise FileNotFoundError(f"⚠️ Nessun file di stato trovato per il round {round_number}. Controllare che le cartelle ROUND siano presenti.")
+        
+        self._state = None
+        self._state_version = None
+        self._scores = {}
+        self.stats = {'state_loads': 0, 'evaluations': 0, 'cache_hits': 0}
+    
+    def _current_version(self) -> Tuple[int, int]:
+        stat = os.stat(self.state_file)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def current_state(self) -> Mapping:
+        """
+        Stato attuale del file di stato, reindicizzato solo se il file è cambiato
+        
+        Le sezioni vengono decodificate al primo accesso: i controlli di correttezza
+        leggono droids e client senza decodificare infosphere e travel_costs.
+        """
+        version = self._current_version()
+        if self._state is None or version != self._state_version:
+            self._state = LazyGalaxyState(self.state_file)
+            self._state_version = self._state.version
+            self._scores.clear()
+            self.stats['state_loads'] += 1
+        return self._state
+    
+    def invalidate(self):
+        """Dimentica stato e punteggi in cache (il prossimo score rilegge i file)"""
+        self._state = None
+        self._state_version = None
+        self._scores.clear()
+    
+    def task_ids(self) -> List[int]:
+        """ID dei task del round"""
+        return sorted(self.evaluator.get_tasks())
+    
+    def score(self, task_id: int, agent_response: str = None, intermediate_steps: List = None,
+              final_state: Dict = None) -> Dict:
+        """
+        Valuta una missione senza I/O se nulla è cambiato
+        
+        Args:
+            task_id: ID della missione
+            agent_response: Risposta dell'agente (default: risposta generica)
+            intermediate_steps: Passi intermedi (default: 1 API call simulata)
+            final_state: Stato finale (default: contenuto attuale del file di stato)
+            
+        Returns:
+            Dict con punteggi dettagliati, come HackathonEvaluator.evaluate_mission
+        """
+        state = final_state if final_state is not None else self.current_state()
+        
+        # Solo le valutazioni con tutti i default dipendono esclusivamente dal file di stato
+        cacheable = final_state is None and agent_response is None and intermediate_steps is None
+        if cacheable and task_id in self._scores:
+            self.stats['cache_hits'] += 1
+            return copy.deepcopy(self._scores[task_id])
+        
+        if agent_response is None:
+            agent_response = "Missione completata. Ho eseguito le azioni richieste."
+        if intermediate_steps is None:
+            intermediate_steps = [None]
+        
+        result = self.evaluator.evaluate_mission(task_id, agent_response, intermediate_steps, state)
+        self.stats['evaluations'] += 1
+        if cacheable:
+            self._scores[task_id] = copy.deepcopy(result)
+        return result
+    
+    def score_all(self, agent_responses: Dict[int, str] = None,
+                  intermediate_steps: Dict[int, List] = None) -> Dict[int, Dict]:
+        """
+        Valuta tutti i task del round sullo stato attuale
+        
+        Args:
+            agent_responses: Risposte per task_id (opzionale)
+            intermediate_steps: Passi intermedi per task_id (opzionale)
+            
+        Returns:
+            Dict task_id -> risultato
+        """
+        agent_responses = agent_responses or {}
+        intermediate_steps = intermediate_steps or {}
+        return {
+            task_id: self.score(task_id, agent_responses.get(task_id), intermediate_steps.get(task_id))
+            for task_id in self.task_ids()
+        }
+
+
+# Sessioni riusate da quick_evaluate_current_state, una per round
+_SESSIONS: Dict[int, EvaluationSession] = {}
+
+
+def get_session(round_number: int = 1) -> EvaluationSession:
+    """Sessione di valutazione condivisa per il round (creata alla prima richiesta)"""
+    if round_number not in _SESSIONS:
+        _SESSIONS[round_number] = EvaluationSession(round_number)
+    return _SESSIONS[round_number]
+
+
 def quick_evaluate_current_state(task_id: int, round_number: int = 1, 
                                  agent_response: str = None, 
                                  intermediate_steps: List = None) -> Dict:
     """
     Funzione helper per valutare velocemente lo stato attuale
     
+    Usa la sessione condivisa del round: valutatore, tasks e stato restano in
+    memoria e il file di stato viene riletto solo se è cambiato.
+    
     Args:
         task_id: ID della missione
         round_number: Numero del round
         agent_response: Risposta reale dell'agente (opzionale)
         intermediate_steps: Passi intermedi reali dell'agente (opzionale)
     """
-    evaluator = HackathonEvaluator(round_number)
-    
-    # 🔍 Auto-detect del file di stato per il round corrente
-    state_file_options = [
-        f'ROUND {round_number} FILES/galaxy_state.json' if round_number == 1 else f'ROUND {round_number} FILES/galaxy_state_round{round_number}.json',
-        'ROUND 1 FILES/galaxy_state.json',  # Fallback
-        'ROUND 2 FILES/galaxy_state_round2.json',
-        'ROUND 3 FILES/galaxy_state_round3.json',
-        'galaxy_state.json'  # Fallback legacy
-    ]
-    
-    state_file = None
-    for file_path in state_file_options:
-        if os.path.exists(file_path):
-            state_file = file_path
-            break
-    
-    if not state_file:
-        raise FileNotFoundError(f"⚠️ Nessun file di stato trovato per il round {round_number}. Controllare che le cartelle ROUND siano presenti.")
-    
-    # Carica stato attuale
-    print(f"📁 Caricando stato da: {state_file}")
-    with open(state_file, 'r') as f:
-        final_state = json.load(f)
-    
-    # Usa dati reali se forniti, altrimenti usa fallback
-    if agent_response is None:
-        agent_response = "Missione completata. Ho eseguito le azioni richieste."
+    session = get_session(round_number)
+    print(f"📁 Stato da: {session.state_file}")
     
     if intermediate_steps is None:
         # 🔧 FIX: Invece di simulare sempre 3, usa 1 per default (più realistico)
-        intermediate_steps = [None]  # 1 API call simulata invece di 3
         print("⚠️ Usando 1 API call simulata (dati reali non forniti)")
     else:
         print(f"✅ Usando {len(intermediate_steps)} API calls reali")
     
-    result = evaluator.evaluate_mission(task_id, agent_response, intermediate_steps, final_state)
+    result = session.score(task_id, agent_response, intermediate_steps)
     
     print(f"🎯 Valutazione Missione {task_id}")
     print(f"📊 Punteggio Totale: {result['total_score']}/{result['max_score']} ({result['percentage']}%)")
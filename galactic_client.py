@@ -0,0 +1,220 @@
+"""
+🛰️ Galactic Client - Client delle API galattiche con cache read-through
+Memorizza i risultati delle API di lettura (posizioni, navi, marketplace, InfoSphere,
+saldo, inventario) in una cache LRU e li invalida in modo mirato solo quando una
+mutazione li rende obsoleti. Le statistiche hit/miss mostrano quante API calls sono state risparmiate.
+"""
+
+import copy
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from galaxy_engine import TOOL_ALIASES, GalaxyEngine
+
+# Parti dello stato da cui dipende ogni API di lettura
+READ_DEPENDENCIES = {
+    'get_asset_location': ('locations',),
+    'get_ships': ('ships',),
+    'calculate_travel_cost': (),
+    'search_marketplace': ('marketplace',),
+    'query_infosphere': (),
+    'bulk_query_infosphere': (),
+    'get_balance': ('balance',),
+    'get_inventory': ('inventory',),
+}
+
+# Parti dello stato modificate da ogni API di scrittura
+WRITE_INVALIDATIONS = {
+    'book_travel': ('locations', 'ships', 'balance'),
+    'purchase_item': ('balance', 'inventory', 'marketplace'),
+}
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+def _freeze(value: Any) -> Any:
+    """Rende hashabili gli argomenti di una chiamata per usarli come chiave di cache"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class GalacticAPIClient:
+    """
+    Client delle API galattiche con cache LRU read-through.
+
+    Args:
+        backend: Funzione (tool, args) -> risultato che esegue la chiamata reale
+        max_size: Numero massimo di risultati in cache (LRU)
+        enabled: Se False ogni lettura va al backend (utile per confronti)
+    """
+
+    def __init__(self, backend: Callable[[str, Dict], Any], max_size: int = DEFAULT_CACHE_SIZE,
+                 enabled: bool = True):
+        self.backend = backend
+        self.max_size = max_size
+        self.enabled = enabled
+        # Motore locale, presente solo per i client creati con from_round()
+        self.engine: Optional[GalaxyEngine] = None
+
+        self._cache: 'OrderedDict[Tuple, Any]' = OrderedDict()
+        self._keys_by_dependency: Dict[str, set] = {}
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'backend_calls': 0,
+            'by_action': {}
+        }
+
+    @classmethod
+    def from_round(cls, round_number: int, **kwargs) -> 'GalacticAPIClient':
+        """Client su un motore locale inizializzato con lo stato del round"""
+        engine = GalaxyEngine.from_round(round_number)
+        client = cls(engine.execute, **kwargs)
+        client.engine = engine
+        return client
+
+    # ------------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------------
+
+    def _action_stats(self, action: str) -> Dict:
+        return self.stats['by_action'].setdefault(action, {'hits': 0, 'misses': 0, 'calls': 0})
+
+    def _store(self, key: Tuple, action: str, value: Any):
+        self._cache[key] = copy.deepcopy(value)
+        self._cache.move_to_end(key)
+        for dependency in READ_DEPENDENCIES[action]:
+            self._keys_by_dependency.setdefault(dependency, set()).add(key)
+
+        while len(self._cache) > self.max_size:
+            old_key, _ = self._cache.popitem(last=False)
+            self._forget(old_key)
+            self.stats['evictions'] += 1
+
+    def _forget(self, key: Tuple):
+        for dependency in READ_DEPENDENCIES[key[0]]:
+            self._keys_by_dependency.get(dependency, set()).discard(key)
+
+    def invalidate(self, *dependencies: str):
+        """Rimuove dalla cache i risultati che dipendono dalle parti di stato indicate"""
+        for dependency in dependencies:
+            for key in self._keys_by_dependency.pop(dependency, set()):
+                if key in self._cache:
+                    del self._cache[key]
+                    self._forget(key)
+                    self.stats['invalidations'] += 1
+
+    def clear(self):
+        """Svuota la cache (le statistiche restano)"""
+        self._cache.clear()
+        self._keys_by_dependency.clear()
+
+    # ------------------------------------------------------------------
+    # Chiamate
+    # ------------------------------------------------------------------
+
+    def call(self, tool: str, args: Dict = None) -> Any:
+        """
+        Esegue una chiamata alle API galattiche passando dalla cache
+
+        Args:
+            tool: Nome del tool (sono accettati anche gli alias in TOOL_ALIASES)
+            args: Argomenti della chiamata
+
+        Returns:
+            Risultato della chiamata (una copia, quindi modificabile senza toccare la cache)
+        """
+        args = args or {}
+        action = TOOL_ALIASES.get(tool, tool)
+        action_stats = self._action_stats(action)
+        action_stats['calls'] += 1
+
+        if action in READ_DEPENDENCIES and self.enabled:
+            key = (action, _freeze(args))
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats['hits'] += 1
+                action_stats['hits'] += 1
+                return copy.deepcopy(self._cache[key])
+
+            self.stats['misses'] += 1
+            action_stats['misses'] += 1
+            result = self._call_backend(action, args)
+            self._store(key, action, result)
+            return result
+
+        result = self._call_backend(action, args)
+        # Una scrittura fallita non modifica lo stato: la cache resta valida
+        if action in WRITE_INVALIDATIONS and not (isinstance(result, dict) and result.get('success') is False):
+            self.invalidate(*WRITE_INVALIDATIONS[action])
+        return result
+
+    def _call_backend(self, action: str, args: Dict) -> Any:
+        self.stats['backend_calls'] += 1
+        return self.backend(action, args)
+
+    # API con la stessa interfaccia delle classi galattiche
+
+    def get_asset_location(self, asset: str) -> Optional[str]:
+        return self.call('get_asset_location', {'asset': asset})
+
+    def get_ships(self, location: Optional[str] = None) -> Any:
+        return self.call('get_ships', {'location': location} if location else {})
+
+    def calculate_travel_cost(self, origin: str, destination: str, ship: Optional[str] = None) -> Any:
+        args = {'origin': origin, 'destination': destination}
+        if ship:
+            args['ship'] = ship
+        return self.call('calculate_travel_cost', args)
+
+    def book_travel(self, asset: str, destination: str, ship: str) -> Any:
+        return self.call('book_travel', {'asset': asset, 'destination': destination, 'ship': ship})
+
+    def search_marketplace(self, item: Optional[str] = None, planet: Optional[str] = None) -> Any:
+        args = {key: value for key, value in (('item', item), ('planet', planet)) if value is not None}
+        return self.call('search_marketplace', args)
+
+    def purchase_item(self, item_id: str) -> Any:
+        return self.call('purchase_item', {'item_id': item_id})
+
+    def query_infosphere(self, entity: str) -> Any:
+        return self.call('query_infosphere', {'entity': entity})
+
+    def bulk_query_infosphere(self, **filters: Any) -> Any:
+        return self.call('bulk_query_infosphere', filters)
+
+    def get_balance(self) -> Any:
+        return self.call('get_balance')
+
+    def get_inventory(self) -> Any:
+        return self.call('get_inventory')
+
+    # ------------------------------------------------------------------
+    # Statistiche
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        """Statistiche della cache, incluse le API calls risparmiate"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **copy.deepcopy(self.stats),
+            'cached_entries': len(self._cache),
+            'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+            'api_calls_saved': self.stats['hits']
+        }
+
+    def export_stats(self, output_file: Optional[str] = None) -> Dict:
+        """Esporta le statistiche della cache (anche su file JSON se indicato)"""
+        stats = self.get_stats()
+        if output_file:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, indent=2, ensure_ascii=False)
+            print(f"💾 Statistiche cache salvate in: {output_file}")
+        return stats
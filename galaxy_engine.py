@@ -0,0 +1,505 @@
+"""
+🛰️ Galaxy Engine - Motore di simulazione dello stato galattico
+Applica le chiamate alle API galattiche (tool calls) a uno stato galattico in modo incrementale.
+"""
+
+import copy
+import json
+import os
+import shutil
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional, Tuple
+
+from infosphere_index import InfoSphereIndex
+from lazy_galaxy_state import LazyGalaxyState, open_galaxy_state
+from marketplace_index import MarketplaceIndex
+from route_index import RouteIndex
+
+
+def get_state_file_options(round_number: int) -> List[str]:
+    """Restituisce i path candidati del file di stato per un round, in ordine di priorità"""
+    return [
+        f'ROUND {round_number} FILES/galaxy_state.json' if round_number == 1 else f'ROUND {round_number} FILES/galaxy_state_round{round_number}.json',
+        'ROUND 1 FILES/galaxy_state.json',  # Fallback
+        'ROUND 2 FILES/galaxy_state_round2.json',
+        'ROUND 3 FILES/galaxy_state_round3.json',
+        'galaxy_state.json'  # Fallback legacy
+    ]
+
+
+def find_galaxy_state_file(round_number: int) -> Optional[str]:
+    """Trova il primo file di stato esistente per il round"""
+    for file_path in get_state_file_options(round_number):
+        if os.path.exists(file_path):
+            return file_path
+    return None
+
+
+def get_initial_state_file(round_number: int) -> str:
+    """
+    Path della copia intatta dello stato iniziale del round
+
+    Gli agenti riscrivono il file di stato del round durante la missione: lo stato di
+    partenza va quindi letto da una copia separata, accanto al file di stato.
+    """
+    state_file = get_state_file_options(round_number)[0]
+    return state_file[:-len('.json')] + '_initial.json'
+
+
+def find_initial_state_file(round_number: int) -> Optional[str]:
+    """Copia intatta dello stato iniziale del round, se esiste"""
+    initial_file = get_initial_state_file(round_number)
+    return initial_file if os.path.exists(initial_file) else None
+
+
+def snapshot_initial_state(round_number: int) -> Optional[str]:
+    """
+    Salva la copia intatta dello stato iniziale prima che la missione modifichi il file di stato
+
+    Una copia già esistente non viene mai sovrascritta.
+
+    Returns:
+        Path della copia, None se il file di stato del round non esiste
+    """
+    initial_file = get_initial_state_file(round_number)
+    if os.path.exists(initial_file):
+        return initial_file
+    state_file = get_state_file_options(round_number)[0]
+    if not os.path.exists(state_file):
+        return None
+    shutil.copyfile(state_file, initial_file)
+    return initial_file
+
+
+def load_initial_state(round_number: int) -> Optional[Dict]:
+    """Stato iniziale intatto del round, None se la copia non esiste"""
+    initial_file = find_initial_state_file(round_number)
+    if not initial_file:
+        return None
+    with open(initial_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_round_state(round_number: int, lazy: bool = False) -> Mapping:
+    """
+    Carica lo stato galattico iniziale di un round
+
+    Usa la copia intatta dello stato iniziale se esiste, altrimenti il file di stato del round.
+
+    Args:
+        round_number: Numero del round
+        lazy: Se True restituisce un LazyGalaxyState condiviso in sola lettura,
+              che decodifica le sezioni solo al primo accesso
+
+    Returns:
+        Stato galattico come dict (o LazyGalaxyState se lazy)
+    """
+    state_file = find_initial_state_file(round_number) or find_galaxy_state_file(round_number)
+    if not state_file:
+        raise FileNotFoundError(f"⚠️ Nessun file di stato trovato per il round {round_number}. Controllare che le cartelle ROUND siano presenti.")
+
+    if lazy:
+        return open_galaxy_state(state_file)
+    with open(state_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Nomi alternativi usati dagli agenti per le stesse API
+TOOL_ALIASES = {
+    'get_asset_location': 'get_asset_location',
+    'get_droid_location': 'get_asset_location',
+    'locate': 'get_asset_location',
+    'locate_asset': 'get_asset_location',
+    'get_ships': 'get_ships',
+    'get_available_ships': 'get_ships',
+    'list_ships': 'get_ships',
+    'calculate_travel_cost': 'calculate_travel_cost',
+    'get_travel_cost': 'calculate_travel_cost',
+    'book_travel': 'book_travel',
+    'travel': 'book_travel',
+    'rent_ship': 'book_travel',
+    'search_marketplace': 'search_marketplace',
+    'find_item': 'search_marketplace',
+    'search_item': 'search_marketplace',
+    'get_marketplace': 'search_marketplace',
+    'purchase_item': 'purchase_item',
+    'purchase': 'purchase_item',
+    'buy_item': 'purchase_item',
+    'query_infosphere': 'query_infosphere',
+    'search_infosphere': 'query_infosphere',
+    'get_info': 'query_infosphere',
+    'infosphere_query': 'query_infosphere',
+    'bulk_query_infosphere': 'bulk_query_infosphere',
+    'query_infosphere_bulk': 'bulk_query_infosphere',
+    'dump_infosphere': 'bulk_query_infosphere',
+    'get_balance': 'get_balance',
+    'get_inventory': 'get_inventory',
+}
+
+# Chiavi di uno step JSON che non sono argomenti della chiamata
+_STEP_META_KEYS = {'tool', 'action', 'result', 'observation', 'output', 'log'}
+
+# Chiavi che possono contenere gli argomenti espliciti della chiamata
+_STEP_ARGS_KEYS = ('args', 'arguments', 'tool_input', 'input', 'parameters', 'params')
+
+
+def normalize_step(step: Any) -> Optional[Tuple[str, Dict]]:
+    """
+    Estrae (nome_tool, argomenti) da uno step in uno dei formati supportati
+
+    Args:
+        step: Step LangChain (AgentAction, observation), la stessa coppia serializzata
+              [{'tool': ..., 'tool_input': ...}, osservazione] oppure dict JSON con 'tool'/'action'
+
+    Returns:
+        Tupla (tool, args) oppure None se lo step non è interpretabile
+    """
+    if step is None:
+        return None
+
+    # Formato LangChain: step[0].tool / step[0].tool_input
+    if isinstance(step, (list, tuple)) and len(step) > 0 and hasattr(step[0], 'tool'):
+        tool_input = getattr(step[0], 'tool_input', {})
+        if not isinstance(tool_input, dict):
+            tool_input = {'input': tool_input}
+        return step[0].tool, tool_input
+
+    # Coppia LangChain serializzata in JSON: l'azione è il primo elemento
+    if isinstance(step, (list, tuple)) and len(step) > 0 and isinstance(step[0], dict):
+        step = step[0]
+
+    if not isinstance(step, dict):
+        return None
+
+    tool = step.get('tool') or step.get('action')
+    if not isinstance(tool, str):
+        return None
+
+    for key in _STEP_ARGS_KEYS:
+        if isinstance(step.get(key), dict):
+            return tool, step[key]
+
+    return tool, {k: v for k, v in step.items() if k not in _STEP_META_KEYS}
+
+
+class GalaxyEngine:
+    """
+    Motore che applica le azioni galattiche a uno stato in memoria.
+
+    Lo stato viene copiato una sola volta alla creazione; ogni azione lo modifica
+    sul posto e registra un record di undo nel journal, così è possibile tornare
+    a un checkpoint senza copiare lo stato ad ogni passo.
+    """
+
+    READ_ACTIONS = {'get_asset_location', 'get_ships', 'calculate_travel_cost',
+                    'search_marketplace', 'query_infosphere', 'bulk_query_infosphere',
+                    'get_balance', 'get_inventory'}
+    WRITE_ACTIONS = {'book_travel', 'purchase_item'}
+
+    def __init__(self, galaxy_state: Mapping, copy_state: bool = True,
+                 enforce_ship_location: bool = True):
+        if isinstance(galaxy_state, LazyGalaxyState):
+            # Stato condiviso in sola lettura: il motore lo modifica, quindi ne decodifica una copia propria
+            galaxy_state, copy_state = galaxy_state.to_dict(), False
+        self.state = copy.deepcopy(galaxy_state) if copy_state else galaxy_state
+        self.enforce_ship_location = enforce_ship_location
+        self.api_calls = 0
+        self._journal: List[Tuple] = []
+
+        for section in ('droids', 'ships', 'travel_costs', 'marketplace', 'infosphere'):
+            self.state.setdefault(section, {})
+        self.state.setdefault('client', {})
+        self.state['client'].setdefault('balance', 0)
+        self.state['client'].setdefault('inventory', [])
+
+        # Traccia della traiettoria (anch'essa annullabile tramite journal)
+        self.visited = {name: {info.get('location')} for name, info in self.state['droids'].items()}
+        self.purchases: List[str] = []
+        self.queried = set()
+        self._route_index = None
+        self._marketplace_index = None
+        self._infosphere_index = None
+
+    @classmethod
+    def from_round(cls, round_number: int, **kwargs) -> 'GalaxyEngine':
+        """Crea un motore a partire dal file di stato del round"""
+        return cls(load_round_state(round_number), copy_state=False, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Journal / checkpoint
+    # ------------------------------------------------------------------
+
+    def checkpoint(self) -> int:
+        """Restituisce un checkpoint a cui è possibile tornare con rollback()"""
+        return len(self._journal)
+
+    def rollback(self, checkpoint: int = 0):
+        """Annulla tutte le modifiche successive al checkpoint"""
+        while len(self._journal) > checkpoint:
+            self._undo_record(self._journal.pop())
+
+    def undo(self):
+        """Annulla l'ultima modifica registrata"""
+        if self._journal:
+            self._undo_record(self._journal.pop())
+
+    def _set(self, container: Dict, key: str, value: Any):
+        had = key in container
+        self._journal.append(('set', container, key, container.get(key), had))
+        container[key] = value
+
+    def _delete(self, container: Dict, key: str):
+        self._journal.append(('set', container, key, container[key], True))
+        del container[key]
+
+    def _append(self, container: List, value: Any):
+        self._journal.append(('append', container))
+        container.append(value)
+
+    def _add(self, container: set, value: Any):
+        if value not in container:
+            self._journal.append(('add', container, value))
+            container.add(value)
+
+    def _undo_record(self, record: Tuple):
+        if record[0] == 'append':
+            record[1].pop()
+            return
+        if record[0] == 'add':
+            record[1].discard(record[2])
+            return
+        _, container, key, old_value, had = record
+        if had:
+            container[key] = old_value
+        else:
+            container.pop(key, None)
+
+        if self._route_index is not None and key in ('location', 'available'):
+            self._sync_route_index(container, key)
+
+        # L'indice del marketplace segue le modifiche annullate
+        if self._marketplace_index is not None and container is self.state['marketplace']:
+            if had:
+                self._marketplace_index.add(key, old_value)
+            else:
+                self._marketplace_index.remove(key)
+
+    def _sync_route_index(self, container: Dict, key: str):
+        """Riporta nell'indice delle rotte la posizione/disponibilità ripristinata di una nave o di un droide"""
+        for name, info in self.state['ships'].items():
+            if info is container:
+                if key == 'location':
+                    self._route_index.move_ship(name, info.get('location'))
+                else:
+                    self._route_index.set_ship_available(name, info.get('available', True))
+                return
+        if key == 'location':
+            for name, info in self.state['droids'].items():
+                if info is container:
+                    self._route_index.move_droid(name, info.get('location'))
+                    return
+
+    # ------------------------------------------------------------------
+    # Esecuzione azioni
+    # ------------------------------------------------------------------
+
+    def apply_step(self, step: Any) -> Any:
+        """
+        Applica uno step di intermediate_steps allo stato
+
+        Returns:
+            Risultato dell'azione, oppure None se lo step non è riproducibile
+        """
+        normalized = normalize_step(step)
+        if normalized is None:
+            return None
+        tool, args = normalized
+        return self.execute(tool, args)
+
+    def execute(self, tool: str, args: Dict = None) -> Any:
+        """
+        Esegue un'azione galattica
+
+        Args:
+            tool: Nome del tool (sono accettati anche gli alias in TOOL_ALIASES)
+            args: Argomenti della chiamata
+
+        Returns:
+            Risultato dell'azione nello stesso formato delle API galattiche
+        """
+        action = TOOL_ALIASES.get(tool)
+        if action is None:
+            raise KeyError(f"Azione sconosciuta: {tool}")
+
+        self.api_calls += 1
+        return getattr(self, f'_action_{action}')(args or {})
+
+    def is_known_tool(self, tool: str) -> bool:
+        """Controlla se il tool è riproducibile dal motore"""
+        return tool in TOOL_ALIASES
+
+    @staticmethod
+    def _arg(args: Dict, *names: str, default: Any = None) -> Any:
+        for name in names:
+            if args.get(name) is not None:
+                return args[name]
+        return default
+
+    def _action_get_asset_location(self, args: Dict) -> Optional[str]:
+        asset = self._arg(args, 'asset', 'droid', 'asset_name', 'name', 'input')
+        if asset in self.state['droids']:
+            return self.state['droids'][asset].get('location')
+        if asset in self.state['ships']:
+            return self.state['ships'][asset].get('location')
+        return None
+
+    def _action_get_ships(self, args: Dict) -> List[Dict]:
+        location = self._arg(args, 'location', 'planet')
+        return [
+            {'name': name, **info}
+            for name, info in self.state['ships'].items()
+            if info.get('available', True) and (location is None or info.get('location') == location)
+        ]
+
+    def route_cost(self, origin: str, destination: str) -> Optional[int]:
+        """Costo di viaggio diretto tra due pianeti (None se la rotta non esiste)"""
+        if origin == destination:
+            return 0
+        return self.state['travel_costs'].get(f'{origin}-{destination}')
+
+    @property
+    def route_index(self):
+        """
+        Indice delle rotte, costruito al primo uso
+
+        I cammini minimi non cambiano (i travel_costs sono fissi); le posizioni di navi
+        e droidi vengono aggiornate ad ogni book_travel e ad ogni undo/rollback.
+        """
+        if self._route_index is None:
+            self._route_index = RouteIndex(self.state)
+        return self._route_index
+
+    @property
+    def marketplace_index(self) -> MarketplaceIndex:
+        """Indice del marketplace, costruito al primo uso e aggiornato ad ogni acquisto"""
+        if self._marketplace_index is None:
+            self._marketplace_index = MarketplaceIndex(self.state['marketplace'])
+        return self._marketplace_index
+
+    @property
+    def infosphere_index(self) -> InfoSphereIndex:
+        """Indice della InfoSphere (le entità non cambiano durante la missione)"""
+        if self._infosphere_index is None:
+            self._infosphere_index = InfoSphereIndex(self.state['infosphere'])
+        return self._infosphere_index
+
+    def cheapest_route_cost(self, origin: str, destination: str) -> Optional[float]:
+        """Costo minimo tra due pianeti anche con scali (None se non raggiungibili)"""
+        if origin == destination:
+            return 0
+        return self.route_index.travel_cost(origin, destination)
+
+    def _action_calculate_travel_cost(self, args: Dict) -> Optional[int]:
+        origin = self._arg(args, 'origin', 'from', 'source')
+        destination = self._arg(args, 'destination', 'to', 'target')
+        route_cost = self.route_cost(origin, destination)
+        if route_cost is None:
+            return None
+
+        ship = self.state['ships'].get(self._arg(args, 'ship', 'ship_name'))
+        return route_cost + (ship.get('rental_cost', 0) if ship else 0)
+
+    def _action_book_travel(self, args: Dict) -> Dict:
+        asset = self._arg(args, 'asset', 'droid', 'asset_name')
+        destination = self._arg(args, 'destination', 'to', 'target', 'planet')
+        ship_name = self._arg(args, 'ship', 'ship_name')
+
+        droid = self.state['droids'].get(asset)
+        if droid is None:
+            return {'success': False, 'error': f"Asset sconosciuto: {asset}"}
+        ship = self.state['ships'].get(ship_name)
+        if ship is None or not ship.get('available', True):
+            return {'success': False, 'error': f"Nave non disponibile: {ship_name}"}
+
+        origin = droid.get('location')
+        if self.enforce_ship_location and ship.get('location') != origin:
+            return {'success': False, 'error': f"La nave {ship_name} non si trova su {origin}"}
+
+        route_cost = self.route_cost(origin, destination)
+        if route_cost is None:
+            return {'success': False, 'error': f"Rotta non disponibile: {origin}-{destination}"}
+
+        cost = route_cost + ship.get('rental_cost', 0)
+        client = self.state['client']
+        if client['balance'] < cost:
+            return {'success': False, 'error': "Crediti insufficienti", 'cost': cost}
+
+        self._set(client, 'balance', client['balance'] - cost)
+        self._set(droid, 'location', destination)
+        self._set(ship, 'location', destination)
+        if self._route_index is not None:
+            self._route_index.move_droid(asset, destination)
+            self._route_index.move_ship(ship_name, destination)
+        self._add(self.visited.setdefault(asset, set()), destination)
+        return {'success': True, 'cost': cost, 'new_location': destination}
+
+    def _action_search_marketplace(self, args: Dict) -> List[Dict]:
+        query = self._arg(args, 'item', 'item_name', 'name', 'query', 'input')
+        planet = self._arg(args, 'planet', 'location')
+        query = query if isinstance(query, str) else None
+
+        marketplace = self.state['marketplace']
+        return [{'id': item_id, **marketplace[item_id]}
+                for item_id in self.marketplace_index.search(query, planet)]
+
+    def _action_purchase_item(self, args: Dict) -> Dict:
+        item_id = self._arg(args, 'item_id', 'id', 'item')
+        marketplace = self.state['marketplace']
+
+        # Accetta anche il nome dell'oggetto (con pianeta opzionale) al posto dell'id
+        if item_id not in marketplace and isinstance(item_id, str):
+            planet = self._arg(args, 'planet', 'location')
+            item_id = next((iid for iid in self.marketplace_index.by_name(item_id, planet)
+                            if marketplace[iid].get('name') == item_id),
+                           item_id)
+
+        item = marketplace.get(item_id)
+        if item is None:
+            return {'success': False, 'error': f"Oggetto non disponibile: {item_id}"}
+
+        client = self.state['client']
+        price = item.get('price', 0)
+        if client['balance'] < price:
+            return {'success': False, 'error': "Crediti insufficienti", 'cost': price}
+
+        self._set(client, 'balance', client['balance'] - price)
+        self._append(client['inventory'], item.get('name'))
+        self._append(self.purchases, item_id)
+        self._delete(marketplace, item_id)
+        if self._marketplace_index is not None:
+            self._marketplace_index.remove(item_id)
+        return {'success': True, 'cost': price, 'item_name': item.get('name')}
+
+    def _action_query_infosphere(self, args: Dict) -> Optional[Dict]:
+        entity = self._arg(args, 'entity', 'query', 'name', 'topic', 'input')
+        info = self.state['infosphere'].get(entity)
+        if info is not None:
+            self._add(self.queried, entity)
+        return info
+
+    def _action_bulk_query_infosphere(self, args: Dict) -> Dict[str, Dict]:
+        entities = self._arg(args, 'entities', 'names')
+        text = self._arg(args, 'text', 'query', 'search')
+        filters = {field: args[field] for field in ('type', 'affiliation', 'planet', 'threat_level', 'status')
+                   if args.get(field) is not None}
+
+        result = self.infosphere_index.bulk_query(entities, text, **filters)
+        for entity in result:
+            self._add(self.queried, entity)
+        return result
+
+    def _action_get_balance(self, args: Dict) -> int:
+        return self.state['client']['balance']
+
+    def _action_get_inventory(self, args: Dict) -> List[str]:
+        return list(self.state['client']['inventory'])
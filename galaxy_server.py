@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+🌐 Galaxy Server - Server HTTP locale delle API galattiche
+Espone il GalaxyEngine su HTTP/1.1 con connessioni keep-alive, per agenti che
+lavorano in parallelo (es. missioni multi-agente del round 3).
+
+Con un MockProfile il server si comporta come un servizio remoto: latenze
+iniettate, rate limit per client (header X-Client-Id, altrimenti per indirizzo IP)
+con un token per chiamata (batch oltre il burst rifiutati con 413) ed errori casuali
+(modalità mock per load test).
+
+Endpoint:
+    POST /call   {"tool": ..., "args": {...}}            -> {"result": ...}
+    POST /batch  {"calls": [{"tool": ..., "args": ...}]}  -> {"results": [...]}
+    POST /reset                                           -> stato iniziale del round
+    GET  /state                                           -> stato galattico corrente
+    GET  /metrics                                         -> istogrammi di latenza per endpoint
+    GET  /health
+"""
+
+import copy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from galaxy_engine import TOOL_ALIASES, GalaxyEngine
+from mock_network import EndpointMetrics, MockProfile
+
+
+class GalaxyRequestHandler(BaseHTTPRequestHandler):
+    """Handler HTTP/1.1: la connessione resta aperta tra una richiesta e l'altra"""
+
+    protocol_version = 'HTTP/1.1'
+    # Header e body sono scritti separatamente: senza TCP_NODELAY il delayed ACK aggiunge ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any):
+        if self.server.api.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', str(max(1, round(payload.get('retry_after', 1)))))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode('utf-8'))
+
+    def _client_id(self) -> str:
+        # Ogni agente si identifica con X-Client-Id; senza header vale l'IP: la porta cambia a ogni
+        # connessione e i client senza keep-alive avrebbero un bucket nuovo a ogni richiesta
+        return self.headers.get('X-Client-Id') or self.client_address[0]
+
+    def do_GET(self):
+        status, payload = self.server.api.handle('GET', self.path, None, self._client_id())
+        self._send_json(status, payload)
+
+    def do_POST(self):
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            self._send_json(400, {'error': f"JSON non valido: {e}"})
+            return
+        status, payload = self.server.api.handle('POST', self.path, body, self._client_id())
+        self._send_json(status, payload)
+
+
+class GalaxyAPIServer:
+    """
+    Server HTTP locale che serve lo stato galattico di un round.
+
+    Le chiamate sono serializzate da un lock sul motore; un batch viene eseguito
+    interamente sotto lo stesso lock, nell'ordine ricevuto.
+
+    Args:
+        round_number: Round di cui servire lo stato
+        host: Indirizzo di ascolto
+        port: Porta (0 = porta libera scelta dal sistema)
+        engine: Motore già inizializzato (alternativo a round_number)
+        verbose: Se True stampa il log delle richieste
+        mock: Profilo di rete simulato (latenze, rate limit, errori); None = nessuna simulazione
+    """
+
+    def __init__(self, round_number: int = 1, host: str = '127.0.0.1', port: int = 0,
+                 engine: Optional[GalaxyEngine] = None, verbose: bool = False,
+                 mock: Optional[MockProfile] = None):
+        self.round_number = round_number
+        self.engine = engine or GalaxyEngine.from_round(round_number)
+        self._initial_checkpoint = self.engine.checkpoint()
+        self._lock = threading.Lock()
+        self.verbose = verbose
+        self.mock = mock
+        self.metrics = EndpointMetrics()
+
+        self.httpd = ThreadingHTTPServer((host, port), GalaxyRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.api = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def execute(self, tool: str, args: Dict, delay: float = 0.0) -> Tuple[int, Any]:
+        """
+        Esegue una singola chiamata sul motore (da invocare con il lock acquisito)
+
+        Args:
+            delay: Latenza simulata già applicata alla chiamata (secondi), registrata nelle metriche
+        """
+        start = time.perf_counter()
+        if not self.engine.is_known_tool(tool):
+            status, payload = 404, {'error': f"Azione sconosciuta: {tool}"}
+        elif self.mock is not None and self.mock.should_fail():
+            status, payload = 503, {'error': "Servizio temporaneamente non disponibile (errore simulato)"}
+        else:
+            try:
+                status, payload = 200, {'result': self.engine.execute(tool, args or {})}
+            except Exception as e:
+                status, payload = 500, {'error': str(e)}
+
+        latency_ms = (time.perf_counter() - start + delay) * 1000
+        self.metrics.record(f'tool:{TOOL_ALIASES.get(tool, tool)}', latency_ms, status)
+        return status, payload
+
+    def _call_delays(self, count: int) -> List[float]:
+        if self.mock is None:
+            return [0.0] * count
+        return [self.mock.call_delay() for _ in range(count)]
+
+    def handle(self, method: str, path: str, body: Optional[Dict], client: str = 'local') -> Tuple[int, Any]:
+        """Gestisce una richiesta HTTP e restituisce (status, payload), registrando la latenza"""
+        start = time.perf_counter()
+        if self.mock is not None and path in ('/call', '/batch'):
+            time.sleep(self.mock.request_delay())
+
+        status, payload = self._dispatch(method, path, body, client)
+        self.metrics.record(path, (time.perf_counter() - start) * 1000, status)
+        return status, payload
+
+    def _dispatch(self, method: str, path: str, body: Optional[Dict], client: str) -> Tuple[int, Any]:
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'round_number': self.round_number}
+
+        if method == 'GET' and path == '/metrics':
+            return 200, {**self.metrics.snapshot(), 'mock': self.mock.describe() if self.mock else None}
+
+        if method == 'GET' and path == '/state':
+            with self._lock:
+                return 200, copy.deepcopy(self.engine.state)
+
+        if method == 'POST' and path in ('/call', '/batch'):
+            if not isinstance(body, dict):
+                return 400, {'error': "Il body deve essere un oggetto JSON"}
+            calls: List[Dict] = [body] if path == '/call' else body.get('calls', [])
+            if not isinstance(calls, list) or not all(isinstance(call, dict) for call in calls):
+                return 400, {'error': "'calls' deve essere una lista di oggetti {tool, args}"}
+            if self.mock is not None:
+                max_batch = self.mock.max_batch()
+                if max_batch is not None and len(calls) > max_batch:
+                    return 413, {'error': f"Batch troppo grande: {len(calls)} chiamate, massimo {max_batch} "
+                                          f"con il rate limit attuale"}
+                retry_after = self.mock.check_rate_limit(client, len(calls))
+                if retry_after is not None:
+                    return 429, {'error': "Rate limit superato", 'retry_after': round(retry_after, 3)}
+
+            # La latenza di elaborazione è simulata prima del lock: non blocca gli altri client
+            delays = self._call_delays(len(calls))
+            if any(delays):
+                time.sleep(sum(delays))
+
+            with self._lock:
+                results = [self.execute(call.get('tool'), call.get('args'), delay)
+                           for call, delay in zip(calls, delays)]
+            if path == '/call':
+                return results[0]
+            return 200, {'results': [{'status': status, **payload} for status, payload in results]}
+
+        if method == 'POST' and path == '/reset':
+            with self._lock:
+                self.engine.rollback(self._initial_checkpoint)
+                self.engine.api_calls = 0
+            return 200, {'status': 'reset'}
+
+        return 404, {'error': f"Endpoint sconosciuto: {method} {path}"}
+
+    # ------------------------------------------------------------------
+    # Ciclo di vita
+    # ------------------------------------------------------------------
+
+    def start(self) -> 'GalaxyAPIServer':
+        """Avvia il server in un thread in background"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Ferma il server e chiude il socket"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'GalaxyAPIServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Server HTTP locale delle API galattiche')
+    parser.add_argument('--round', type=int, default=1, help='Numero del round (default: 1)')
+    parser.add_argument('--host', default='127.0.0.1', help='Indirizzo di ascolto (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Porta (default: 8765)')
+    parser.add_argument('--verbose', action='store_true', help='Stampa il log delle richieste')
+    parser.add_argument('--mock', action='store_true', help='Modalità mock: simula un servizio remoto')
+    parser.add_argument('--latency', default='lognormal:30,0.5',
+                        help='Latenza per richiesta in modalità mock (default: lognormal:30,0.5)')
+    parser.add_argument('--call-latency', default='fixed:0', help='Latenza aggiuntiva per chiamata (default: fixed:0)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probabilità di errore 503 per chiamata')
+    parser.add_argument('--rate-limit', type=float, help='Chiamate al secondo consentite per client')
+    parser.add_argument('--burst', type=float, help='Chiamate consecutive consentite oltre il rate')
+    parser.add_argument('--seed', type=int, default=42, help='Seed per latenze ed errori riproducibili')
+    parser.add_argument('--metrics-file', help='File JSON in cui salvare le metriche alla chiusura')
+
+    args = parser.parse_args()
+
+    mock = None
+    if args.mock:
+        mock = MockProfile(args.latency, args.call_latency, args.error_rate,
+                           args.rate_limit, args.burst, args.seed)
+
+    server = GalaxyAPIServer(args.round, args.host, args.port, verbose=args.verbose, mock=mock)
+    print(f"🌐 Galaxy API server (round {args.round}) in ascolto su {server.url}")
+    if mock:
+        print(f"🎭 Modalità mock: {mock.describe()}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Server arrestato")
+    finally:
+        server.httpd.server_close()
+        print("📊 Metriche per endpoint:")
+        for line in server.metrics.summary_lines():
+            print(line)
+        if args.metrics_file:
+            with open(args.metrics_file, 'w', encoding='utf-8') as f:
+                json.dump(server.metrics.snapshot(), f, indent=2, ensure_ascii=False)
+            print(f"💾 Metriche salvate in: {args.metrics_file}")
+
+
+if __name__ == "__main__":
+    main()
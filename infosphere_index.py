@@ -0,0 +1,146 @@
+"""
+🔎 InfoSphere Index - Query in blocco e ricerca full-text sulla InfoSphere
+Indice invertito sugli attributi delle entità (type, affiliation, planet, threat_level, ...)
+e indice full-text tokenizzato sui record, per restituire molte entità con una sola chiamata.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: Any) -> List[str]:
+    """Token in minuscolo di un testo (o di un valore qualsiasi convertito in stringa)"""
+    return _TOKEN_PATTERN.findall(str(text).lower())
+
+
+def _values(value: Any) -> Iterable[Any]:
+    """Valori indicizzabili di un attributo: le liste vengono espanse elemento per elemento"""
+    if isinstance(value, (list, tuple, set)):
+        return value
+    return (value,)
+
+
+def _normalize(value: Any) -> Any:
+    return value.lower() if isinstance(value, str) else value
+
+
+class InfoSphereIndex:
+    """
+    Indice della InfoSphere.
+
+    attribute_index: (attributo, valore normalizzato) -> entità
+    text_index: token -> entità (token presi dal nome dell'entità e da tutti i valori)
+    """
+
+    def __init__(self, infosphere: Dict[str, Dict]):
+        self.records: Dict[str, Dict] = {}
+        self.attribute_index: Dict[tuple, set] = {}
+        self.text_index: Dict[str, set] = {}
+
+        for entity, record in infosphere.items():
+            self.add(entity, record)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _entries(self, entity: str, record: Dict):
+        attributes = [(field, _normalize(value))
+                      for field, raw in record.items() for value in _values(raw)
+                      if isinstance(value, (str, int, float, bool))]
+        tokens = set(tokenize(entity))
+        for field, value in attributes:
+            tokens.update(tokenize(value))
+        return attributes, tokens
+
+    def add(self, entity: str, record: Dict):
+        """Aggiunge (o sostituisce) un'entità nell'indice"""
+        if entity in self.records:
+            self.remove(entity)
+        self.records[entity] = record
+
+        attributes, tokens = self._entries(entity, record)
+        for key in attributes:
+            self.attribute_index.setdefault(key, set()).add(entity)
+        for token in tokens:
+            self.text_index.setdefault(token, set()).add(entity)
+
+    def remove(self, entity: str) -> Optional[Dict]:
+        """Rimuove un'entità dall'indice"""
+        record = self.records.pop(entity, None)
+        if record is None:
+            return None
+
+        attributes, tokens = self._entries(entity, record)
+        for index, keys in ((self.attribute_index, attributes), (self.text_index, tokens)):
+            for key in keys:
+                entities = index.get(key)
+                if entities is not None:
+                    entities.discard(entity)
+                    if not entities:
+                        del index[key]
+        return record
+
+    def attributes(self) -> Dict[str, List[Any]]:
+        """Attributi filtrabili con i rispettivi valori"""
+        fields: Dict[str, set] = {}
+        for field, value in self.attribute_index:
+            fields.setdefault(field, set()).add(value)
+        return {field: sorted(values, key=str) for field, values in sorted(fields.items())}
+
+    def filter(self, **filters: Any) -> List[str]:
+        """
+        Entità che soddisfano tutti i filtri sugli attributi
+
+        Ogni filtro accetta un valore singolo o una lista di valori alternativi
+        (es. affiliation=['hostile', 'suspicious']). Il confronto ignora maiuscole/minuscole.
+        """
+        result: Optional[set] = None
+        # Si parte dal filtro più selettivo per ridurre le intersezioni
+        candidates = []
+        for field, wanted in filters.items():
+            matches = set()
+            for value in _values(wanted):
+                matches |= self.attribute_index.get((field, _normalize(value)), set())
+            candidates.append(matches)
+
+        for matches in sorted(candidates, key=len):
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+
+        entities = self.records.keys() if result is None else result
+        return sorted(entities)
+
+    def search(self, text: str) -> List[str]:
+        """Entità il cui record contiene tutti i token del testo"""
+        result: Optional[set] = None
+        for token in sorted(set(tokenize(text)), key=lambda t: len(self.text_index.get(t, ()))):
+            matches = self.text_index.get(token, set())
+            result = set(matches) if result is None else result & matches
+            if not result:
+                return []
+        return sorted(result) if result is not None else sorted(self.records)
+
+    def bulk_query(self, entities: Optional[Iterable[str]] = None, text: Optional[str] = None,
+                   **filters: Any) -> Dict[str, Dict]:
+        """
+        Query in blocco: restituisce i record di tutte le entità selezionate
+
+        Args:
+            entities: Entità richieste esplicitamente (None = nessuna restrizione)
+            text: Ricerca full-text opzionale
+            **filters: Filtri sugli attributi (type, affiliation, planet, threat_level, ...)
+
+        Returns:
+            Dict entità -> record, in ordine alfabetico
+        """
+        selected = self.filter(**filters)
+        if text:
+            matches = set(self.search(text))
+            selected = [entity for entity in selected if entity in matches]
+        if entities is not None:
+            wanted = {entities} if isinstance(entities, str) else set(entities)
+            selected = [entity for entity in selected if entity in wanted]
+        return {entity: self.records[entity] for entity in selected}
@@ -0,0 +1,188 @@
+"""
+🗺️ Lazy Galaxy State - Lettura per sezioni dei file di stato galattico
+Il file viene letto una volta in un buffer di byte (una fotografia: gli agenti riscrivono
+il file di stato durante la missione) e scansionato per costruire l'indice degli offset
+delle sezioni di primo livello (droids, client, marketplace, travel_costs, infosphere, ...).
+Ogni sezione viene decodificata solo al primo accesso: un controllo di correttezza che
+legge droids e client non paga la decodifica di infosphere e travel_costs delle galassie
+sintetiche.
+"""
+
+import json
+import os
+import re
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Tuple
+
+# Tentativi di lettura se il file cambia mentre viene letto
+_READ_ATTEMPTS = 3
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+# Stringhe JSON in forma "srotolata" (testo normale, poi escape + testo): le alternative non si
+# sovrappongono, quindi il backtracking resta lineare anche senza quantificatori possessivi
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_KEY = re.compile(rb'(' + _STRING + rb')[ \t\n\r]*:[ \t\n\r]*', re.DOTALL)
+# Prossima parentesi fuori dalle stringhe: stringhe e testo vengono consumati dal motore regex
+_BRACKET = re.compile(rb'[^"\[\]{}]*(?:' + _STRING + rb'[^"\[\]{}]*)*([\[\]{}])', re.DOTALL)
+_SCALAR = re.compile(_STRING + rb'|[^,}\]\s]+', re.DOTALL)
+
+
+def _skip_whitespace(buffer, position: int) -> int:
+    return _WHITESPACE.match(buffer, position).end()
+
+
+def _value_end(buffer, start: int) -> int:
+    """Posizione subito dopo il valore JSON che inizia in start"""
+    if buffer[start:start + 1] not in (b'{', b'['):
+        match = _SCALAR.match(buffer, start)
+        if match is None:
+            raise ValueError(f"Valore JSON non valido alla posizione {start}")
+        return match.end()
+
+    depth = 0
+    for match in _BRACKET.finditer(buffer, start):
+        depth += 1 if match.group(1) in (b'{', b'[') else -1
+        if depth == 0:
+            return match.end()
+    raise ValueError(f"Sezione JSON non chiusa (inizio alla posizione {start})")
+
+
+def build_section_index(buffer) -> Dict[str, Tuple[int, int]]:
+    """
+    Offset (inizio, fine) dei valori di primo livello di un oggetto JSON
+
+    Args:
+        buffer: Contenuto del file (bytes o mmap)
+
+    Returns:
+        Dict nome sezione -> (inizio, fine) nel buffer
+    """
+    position = _skip_whitespace(buffer, 0)
+    if buffer[position:position + 1] != b'{':
+        raise ValueError("Lo stato galattico deve essere un oggetto JSON")
+    position = _skip_whitespace(buffer, position + 1)
+
+    offsets = {}
+    if buffer[position:position + 1] == b'}':
+        return offsets
+    while True:
+        match = _KEY.match(buffer, position)
+        if match is None:
+            raise ValueError(f"Chiave JSON attesa alla posizione {position}")
+        key = json.loads(match.group(1))
+        start = match.end()
+        end = _value_end(buffer, start)
+        offsets[key] = (start, end)
+
+        position = _skip_whitespace(buffer, end)
+        separator = buffer[position:position + 1]
+        if separator == b'}':
+            return offsets
+        if separator != b',':
+            raise ValueError(f"',' o '}}' attesi alla posizione {position}")
+        position = _skip_whitespace(buffer, position + 1)
+
+
+def _file_version(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_snapshot(state_file: str) -> Tuple[Tuple[int, int], bytes]:
+    """Contenuto del file con la sua versione (mtime, dimensione), riletto se cambia durante la lettura"""
+    for _ in range(_READ_ATTEMPTS):
+        version = _file_version(state_file)
+        with open(state_file, 'rb') as f:
+            buffer = f.read()
+        if _file_version(state_file) == version:
+            return version, buffer
+    raise ValueError(f"Il file di stato continua a cambiare durante la lettura: {state_file}")
+
+
+class LazyGalaxyState(Mapping):
+    """
+    Stato galattico in sola lettura con decodifica delle sezioni al primo accesso
+
+    Si comporta come un dict di sola lettura (state['droids'], state.get('client', {}),
+    'marketplace' in state, ...). Il contenuto è quello del file al momento dell'apertura,
+    anche se il file viene poi riscritto. Le sezioni decodificate restano in cache e vanno
+    trattate in sola lettura: chi deve modificare lo stato (GalaxyEngine) ne fa una copia.
+
+    Args:
+        state_file: Path del file di stato
+    """
+
+    def __init__(self, state_file: str):
+        self.state_file = state_file
+        self.version, self._buffer = _read_snapshot(state_file)
+        if not self._buffer:
+            raise ValueError(f"File di stato vuoto: {state_file}")
+        self._offsets = build_section_index(self._buffer)
+        self._sections: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._sections[key]
+        except KeyError:
+            start, end = self._offsets[key]
+            value = self._sections[key] = json.loads(self._buffer[start:end])
+            return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._offsets
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __repr__(self) -> str:
+        return f"LazyGalaxyState({self.state_file!r}, sections={list(self._offsets)}, loaded={self.loaded_sections})"
+
+    @property
+    def loaded_sections(self) -> list:
+        """Sezioni già decodificate"""
+        return list(self._sections)
+
+    def section_sizes(self) -> Dict[str, int]:
+        """Dimensione in byte di ogni sezione nel file"""
+        return {key: end - start for key, (start, end) in self._offsets.items()}
+
+    def to_dict(self) -> Dict:
+        """Stato completo come dict indipendente (decodifica tutte le sezioni)"""
+        return {key: json.loads(self._buffer[start:end]) for key, (start, end) in self._offsets.items()}
+
+    def close(self):
+        self._sections.clear()
+        self._offsets = {}
+        self._buffer = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Lettori condivisi, uno per file, validi finché mtime e dimensione non cambiano
+_READERS: Dict[str, LazyGalaxyState] = {}
+
+
+def open_galaxy_state(state_file: str) -> LazyGalaxyState:
+    """
+    Lettore condiviso del file di stato (indice costruito una sola volta per versione del file)
+
+    Args:
+        state_file: Path del file di stato
+
+    Returns:
+        LazyGalaxyState in sola lettura
+    """
+    path = os.path.abspath(state_file)
+    cached = _READERS.get(path)
+    if cached is not None and cached.version == _file_version(path):
+        return cached
+    reader = LazyGalaxyState(state_file)
+    _READERS[path] = reader
+    return reader
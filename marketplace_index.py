@@ -0,0 +1,258 @@
+"""
+🏪 Marketplace Index - Indice ordinato per prezzo e pianeta del marketplace
+Array ordinati per prezzo (globale e per pianeta) con range query tramite bisect,
+più un indice invertito sui nomi con ricerca per prefisso e fuzzy. Gli acquisti
+aggiornano l'indice in modo incrementale, senza riscansionare il marketplace.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from difflib import SequenceMatcher
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class _PriceBucket:
+    """Oggetti ordinati per (prezzo, item_id) con i prezzi in un array parallelo per bisect"""
+
+    def __init__(self):
+        self.keys: List[Tuple[float, str]] = []
+        self.prices: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def build(self, keys: List[Tuple[float, str]]):
+        self.keys = sorted(keys)
+        self.prices = [price for price, _ in self.keys]
+
+    def insert(self, price: float, item_id: str):
+        position = bisect_left(self.keys, (price, item_id))
+        self.keys.insert(position, (price, item_id))
+        self.prices.insert(position, price)
+
+    def remove(self, price: float, item_id: str):
+        position = bisect_left(self.keys, (price, item_id))
+        if position < len(self.keys) and self.keys[position] == (price, item_id):
+            del self.keys[position]
+            del self.prices[position]
+
+    def range(self, min_price: float, max_price: float) -> List[str]:
+        start = bisect_left(self.prices, min_price)
+        end = bisect_right(self.prices, max_price)
+        return [item_id for _, item_id in self.keys[start:end]]
+
+    def last_within(self, max_price: float) -> Optional[str]:
+        end = bisect_right(self.prices, max_price)
+        return self.keys[end - 1][1] if end else None
+
+
+def _trigrams(text: str) -> set:
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MarketplaceIndex:
+    """
+    Indice del marketplace per prezzo, pianeta e nome.
+
+    Tutte le query che restituiscono più oggetti li ordinano per prezzo crescente
+    (a parità di prezzo per item_id).
+    """
+
+    def __init__(self, marketplace: Dict[str, Dict]):
+        self.items: Dict[str, Dict] = {}
+        self._all = _PriceBucket()
+        self._by_planet: Dict[str, _PriceBucket] = {}
+
+        # Indice invertito sui nomi (in minuscolo) e trigrammi per la ricerca fuzzy
+        self._names: Dict[str, set] = {}
+        self._display_names: Dict[str, str] = {}
+        self._sorted_names: List[str] = []
+        # Costruito solo alla prima ricerca fuzzy
+        self._trigrams: Optional[Dict[str, set]] = None
+
+        # Costruzione in blocco: un ordinamento per bucket invece di n inserimenti
+        planet_keys: Dict[str, List[Tuple[float, str]]] = {}
+        for item_id, info in marketplace.items():
+            self.items[item_id] = info
+            planet_keys.setdefault(info.get('planet'), []).append((info.get('price', 0), item_id))
+            name = info.get('name', '')
+            key = name.lower()
+            if key not in self._names:
+                self._names[key] = set()
+                self._display_names[key] = name
+            self._names[key].add(item_id)
+
+        self._all.build([key for keys in planet_keys.values() for key in keys])
+        for planet, keys in planet_keys.items():
+            self._by_planet[planet] = _PriceBucket()
+            self._by_planet[planet].build(keys)
+
+        self._sorted_names = sorted(self._names)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.items
+
+    # ------------------------------------------------------------------
+    # Aggiornamenti incrementali
+    # ------------------------------------------------------------------
+
+    def add(self, item_id: str, info: Dict):
+        """Aggiunge (o sostituisce) un oggetto nell'indice"""
+        if item_id in self.items:
+            self.remove(item_id)
+        self.items[item_id] = info
+        price = info.get('price', 0)
+        self._all.insert(price, item_id)
+        self._by_planet.setdefault(info.get('planet'), _PriceBucket()).insert(price, item_id)
+
+        name = info.get('name', '')
+        key = name.lower()
+        ids = self._names.get(key)
+        if ids is None:
+            ids = self._names[key] = set()
+            self._display_names[key] = name
+            insort(self._sorted_names, key)
+            if self._trigrams is not None:
+                for trigram in _trigrams(key):
+                    self._trigrams.setdefault(trigram, set()).add(key)
+        ids.add(item_id)
+
+    def remove(self, item_id: str) -> Optional[Dict]:
+        """Rimuove un oggetto dall'indice (es. dopo un acquisto)"""
+        info = self.items.pop(item_id, None)
+        if info is None:
+            return None
+        price = info.get('price', 0)
+        self._all.remove(price, item_id)
+        planet = info.get('planet')
+        bucket = self._by_planet[planet]
+        bucket.remove(price, item_id)
+        if not bucket:
+            del self._by_planet[planet]
+
+        key = info.get('name', '').lower()
+        ids = self._names[key]
+        ids.discard(item_id)
+        if not ids:
+            del self._names[key]
+            del self._display_names[key]
+            del self._sorted_names[bisect_left(self._sorted_names, key)]
+            if self._trigrams is not None:
+                for trigram in _trigrams(key):
+                    names = self._trigrams[trigram]
+                    names.discard(key)
+                    if not names:
+                        del self._trigrams[trigram]
+        return info
+
+    # ------------------------------------------------------------------
+    # Query per prezzo e pianeta
+    # ------------------------------------------------------------------
+
+    def _bucket(self, planet: Optional[str]) -> _PriceBucket:
+        if planet is None:
+            return self._all
+        return self._by_planet.get(planet, _PriceBucket())
+
+    def planets(self) -> List[str]:
+        """Pianeti con almeno un oggetto in vendita"""
+        return sorted(self._by_planet)
+
+    def within_budget(self, max_price: float, min_price: float = 0,
+                      planet: Optional[str] = None) -> List[str]:
+        """Oggetti con prezzo nell'intervallo [min_price, max_price]"""
+        return self._bucket(planet).range(min_price, max_price)
+
+    def most_expensive_within(self, budget: float, planet: Optional[str] = None) -> Optional[str]:
+        """Oggetto più costoso acquistabile con il budget (None se nessuno)"""
+        return self._bucket(planet).last_within(budget)
+
+    def cheapest(self, planet: Optional[str] = None) -> Optional[str]:
+        """Oggetto più economico, globale o su un pianeta"""
+        bucket = self._bucket(planet)
+        return bucket.keys[0][1] if bucket else None
+
+    def cheapest_items(self, count: int, planet: Optional[str] = None) -> List[str]:
+        """I count oggetti più economici"""
+        return [item_id for _, item_id in self._bucket(planet).keys[:count]]
+
+    def cheapest_per_planet(self) -> Dict[str, str]:
+        """Oggetto più economico di ogni pianeta"""
+        return {planet: bucket.keys[0][1] for planet, bucket in self._by_planet.items()}
+
+    def price(self, item_id: str) -> Optional[float]:
+        """Prezzo di un oggetto presente nell'indice"""
+        info = self.items.get(item_id)
+        return info.get('price', 0) if info is not None else None
+
+    # ------------------------------------------------------------------
+    # Query per nome
+    # ------------------------------------------------------------------
+
+    def _sorted_ids(self, ids: Iterator[str], planet: Optional[str] = None) -> List[str]:
+        return sorted(
+            (item_id for item_id in ids if planet is None or self.items[item_id].get('planet') == planet),
+            key=lambda item_id: (self.items[item_id].get('price', 0), item_id)
+        )
+
+    def by_name(self, name: str, planet: Optional[str] = None) -> List[str]:
+        """Oggetti con un nome esatto (senza distinzione maiuscole/minuscole)"""
+        return self._sorted_ids(self._names.get(name.lower(), ()), planet)
+
+    def search(self, query: Optional[str] = None, planet: Optional[str] = None) -> List[str]:
+        """Oggetti il cui nome contiene la query, con filtro opzionale sul pianeta"""
+        if not query:
+            return [item_id for _, item_id in self._bucket(planet).keys]
+
+        query = query.lower()
+        if planet is not None:
+            return [item_id for _, item_id in self._bucket(planet).keys
+                    if query in self.items[item_id].get('name', '').lower()]
+
+        # I nomi distinti sono molti meno degli oggetti: si scansionano quelli
+        ids = [item_id for key, item_ids in self._names.items() if query in key for item_id in item_ids]
+        return self._sorted_ids(ids)
+
+    def names_with_prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Nomi distinti che iniziano con il prefisso, in ordine alfabetico"""
+        prefix = prefix.lower()
+        start = bisect_left(self._sorted_names, prefix)
+        names = []
+        for key in self._sorted_names[start:]:
+            if not key.startswith(prefix) or (limit is not None and len(names) >= limit):
+                break
+            names.append(self._display_names[key])
+        return names
+
+    def fuzzy_names(self, query: str, limit: int = 5, cutoff: float = 0.6) -> List[str]:
+        """
+        Nomi più simili alla query (tolleranti a errori di battitura)
+
+        I candidati sono filtrati tramite i trigrammi in comune, poi ordinati per
+        similarità con SequenceMatcher.
+        """
+        if self._trigrams is None:
+            self._trigrams = {}
+            for key in self._sorted_names:
+                for trigram in _trigrams(key):
+                    self._trigrams.setdefault(trigram, set()).add(key)
+
+        query = query.lower()
+        shared: Dict[str, int] = {}
+        for trigram in _trigrams(query):
+            for key in self._trigrams.get(trigram, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        candidates = sorted(shared, key=lambda key: -shared[key])[:max(limit * 20, 50)]
+        matcher = SequenceMatcher()
+        matcher.set_seq2(query)
+        scored = []
+        for key in candidates:
+            matcher.set_seq1(key)
+            ratio = matcher.ratio()
+            if ratio >= cutoff:
+                scored.append((-ratio, key))
+        return [self._display_names[key] for _, key in sorted(scored)[:limit]]
@@ -0,0 +1,248 @@
+"""
+🎭 Mock Network - Simulazione di un servizio remoto per il Galaxy API server
+Latenze da distribuzioni configurabili, rate limit token bucket per client,
+errori iniettati e istogrammi di latenza per endpoint, con generatore casuale
+seedato per confronti riproducibili tra strategie di agenti.
+"""
+
+import math
+import random
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# Limiti superiori dei bucket degli istogrammi di latenza (millisecondi)
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+
+
+class LatencyModel:
+    """
+    Distribuzione di latenza in millisecondi, descritta da una stringa
+
+    Formati:
+        fixed:MS | uniform:MIN,MAX | normal:MEDIA,DEV | lognormal:MEDIANA,SIGMA | exponential:MEDIA
+
+    Esempio: 'lognormal:40,0.5' -> mediana 40ms con coda lunga
+    """
+
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+    def __init__(self, spec: str = 'fixed:0'):
+        kind, _, params = spec.partition(':')
+        if kind not in self.KINDS:
+            raise ValueError(f"Distribuzione di latenza sconosciuta: {kind} (attese: {', '.join(self.KINDS)})")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(value) for value in params.split(',') if value.strip()] or [0.0]
+
+    def sample(self, rng: random.Random) -> float:
+        """Estrae una latenza (ms, mai negativa)"""
+        p = self.params
+        if self.kind == 'fixed':
+            value = p[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(p[0], p[1] if len(p) > 1 else p[0])
+        elif self.kind == 'normal':
+            value = rng.gauss(p[0], p[1] if len(p) > 1 else 0)
+        elif self.kind == 'lognormal':
+            value = rng.lognormvariate(math.log(max(p[0], 1e-9)), p[1] if len(p) > 1 else 0)
+        else:
+            value = rng.expovariate(1 / p[0]) if p[0] > 0 else 0
+        return max(value, 0.0)
+
+
+class TokenBucket:
+    """Rate limit token bucket: rate token al secondo, al massimo burst accumulati"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def consume(self, tokens: float = 1) -> Optional[float]:
+        """
+        Consuma i token richiesti
+
+        Returns:
+            None se consentito, altrimenti i secondi da attendere (Retry-After)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if tokens <= self.tokens:
+            self.tokens -= tokens
+            return None
+        return (tokens - self.tokens) / self.rate
+
+
+class LatencyHistogram:
+    """Istogramma a bucket fissi con conteggi, errori e percentili stimati"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, latency_ms: float, status: int = 200):
+        self.buckets[bisect_left(HISTOGRAM_BOUNDS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        if status == 429:
+            self.rate_limited += 1
+        elif status >= 400:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        """Percentile stimato come limite superiore del bucket che lo contiene"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(HISTOGRAM_BOUNDS_MS + [self.max_ms], self.buckets):
+            seen += count
+            if seen >= target:
+                return float(min(bound, self.max_ms))
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        labels = [f'<={bound}ms' for bound in HISTOGRAM_BOUNDS_MS] + [f'>{HISTOGRAM_BOUNDS_MS[-1]}ms']
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'rate_limited': self.rate_limited,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'p99_ms': round(self.percentile(0.99), 3),
+            'max_ms': round(self.max_ms, 3),
+            'histogram': {label: count for label, count in zip(labels, self.buckets) if count}
+        }
+
+
+class MockProfile:
+    """
+    Profilo di rete simulato per il Galaxy API server
+
+    Args:
+        latency: Distribuzione della latenza di ogni richiesta HTTP (vedi LatencyModel)
+        call_latency: Latenza aggiuntiva per ogni chiamata API (anche dentro un batch)
+        error_rate: Probabilità che una chiamata fallisca con 503
+        rate_limit: Chiamate al secondo consentite per client (None = nessun limite)
+        burst: Chiamate consecutive consentite oltre il rate (default: pari al rate)
+        seed: Seed del generatore casuale (per esecuzioni riproducibili)
+    """
+
+    def __init__(self, latency: str = 'fixed:0', call_latency: str = 'fixed:0', error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None, burst: Optional[float] = None, seed: int = 42):
+        self.latency = LatencyModel(latency)
+        self.call_latency = LatencyModel(call_latency)
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else (rate_limit or 0)
+        self.seed = seed
+
+        self._rng = random.Random(seed)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._last_eviction = time.monotonic()
+        self._lock = threading.Lock()
+
+    def request_delay(self) -> float:
+        """Ritardo (secondi) da applicare a una richiesta HTTP"""
+        with self._lock:
+            return self.latency.sample(self._rng) / 1000
+
+    def call_delay(self) -> float:
+        """Ritardo (secondi) da applicare a una singola chiamata API"""
+        with self._lock:
+            return self.call_latency.sample(self._rng) / 1000
+
+    def should_fail(self) -> bool:
+        """Decide se iniettare un errore sulla chiamata corrente"""
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def max_batch(self) -> Optional[int]:
+        """Chiamate massime in una richiesta: un batch oltre il burst non rientrerebbe mai nel bucket"""
+        if not self.rate_limit:
+            return None
+        return int(max(self.burst, 1))
+
+    def check_rate_limit(self, client: str, calls: int = 1) -> Optional[float]:
+        """
+        Secondi da attendere se il client ha superato il rate limit, altrimenti None
+
+        Ogni chiamata di un batch consuma un token; i batch oltre max_batch() vanno
+        rifiutati prima di chiamare questo metodo.
+
+        Args:
+            client: Identificativo del client (X-Client-Id dell'agente o indirizzo IP)
+            calls: Chiamate contenute nella richiesta
+        """
+        if not self.rate_limit:
+            return None
+        with self._lock:
+            self._evict_idle_buckets()
+            bucket = self._buckets.setdefault(client, TokenBucket(self.rate_limit, max(self.burst, 1)))
+            return bucket.consume(calls)
+
+    def _evict_idle_buckets(self):
+        """Rimuove i bucket fermi da burst / rate secondi: sono di nuovo pieni, come uno nuovo"""
+        now = time.monotonic()
+        idle_seconds = max(self.burst, 1) / self.rate_limit
+        if now - self._last_eviction < idle_seconds:
+            return
+        self._last_eviction = now
+        for client in [client for client, bucket in self._buckets.items() if now - bucket.updated >= idle_seconds]:
+            del self._buckets[client]
+
+    def describe(self) -> Dict:
+        return {
+            'latency': self.latency.spec,
+            'call_latency': self.call_latency.spec,
+            'error_rate': self.error_rate,
+            'rate_limit': self.rate_limit,
+            'burst': self.burst,
+            'seed': self.seed
+        }
+
+
+class EndpointMetrics:
+    """Istogrammi di latenza e conteggi per endpoint, thread-safe"""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def record(self, endpoint: str, latency_ms: float, status: int = 200):
+        with self._lock:
+            self._histograms.setdefault(endpoint, LatencyHistogram()).record(latency_ms, status)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            endpoints = {name: histogram.to_dict() for name, histogram in sorted(self._histograms.items())}
+        return {
+            'uptime_seconds': round(time.time() - self.started, 3),
+            'total_requests': sum(data['count'] for name, data in endpoints.items() if name.startswith('/')),
+            'endpoints': endpoints
+        }
+
+    def summary_lines(self) -> List[str]:
+        lines = []
+        for name, data in self.snapshot()['endpoints'].items():
+            lines.append(f"   • {name}: {data['count']} chiamate, p50 {data['p50_ms']}ms, "
+                         f"p99 {data['p99_ms']}ms, errori {data['errors']}, rate limited {data['rate_limited']}")
+        return lines
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+🤝 Multi-Agent Runner - Esecuzione parallela dei piani multi-droide (round 3)
+Scompone un piano (lista di tool calls) in flussi di azioni per droide, rileva le
+dipendenze tra i flussi (navi condivise, saldo condiviso, letture dopo scritture) ed
+esegue i flussi indipendenti in parallelo su un pool di thread contro lo stato
+galattico. Registra intermediate_steps (con tempi, agente e dipendenze, leggibili da
+step_timing) e final_state nel formato del valutatore, con il makespan confrontato
+all'esecuzione seriale.
+"""
+
+import copy
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from galaxy_engine import TOOL_ALIASES, GalaxyEngine, normalize_step
+from mock_network import LatencyModel
+from step_timing import analyze_timing
+
+# Agente delle azioni non legate a un droide (InfoSphere, saldo, inventario, ricerche globali)
+COORDINATOR = 'coordinator'
+# Chiavi di pianificazione ammesse negli step del piano, da non passare come argomenti
+_PLAN_KEYS = ('agent', 'id', 'depends_on')
+# Scritture commutative: due acquisti di oggetti diversi (o due viaggi con navi diverse)
+# possono avvenire in qualsiasi ordine; il conflitto vero è sulla singola nave/oggetto.
+# L'inventario no: è una lista ordinata, quindi gli acquisti restano nell'ordine del piano
+_COMMUTATIVE = {'marketplace', 'ships'}
+
+
+def _arg(args: Dict, *names: str) -> Any:
+    for name in names:
+        if args.get(name) is not None:
+            return args[name]
+    return None
+
+
+def _item_id(marketplace: Dict, args: Dict) -> Optional[str]:
+    """Id dell'oggetto di un acquisto (accetta anche il nome, come GalaxyEngine)"""
+    item = _arg(args, 'item_id', 'id', 'item')
+    if item in marketplace or not isinstance(item, str):
+        return item
+    planet = _arg(args, 'planet', 'location')
+    return next((item_id for item_id, info in marketplace.items()
+                 if info.get('name') == item and (planet is None or info.get('planet') == planet)), item)
+
+
+def action_resources(tool: str, args: Dict, marketplace: Dict) -> Tuple[Set[str], Set[str]]:
+    """
+    Risorse dello stato lette e scritte da un'azione
+
+    Args:
+        tool: Nome del tool (anche alias)
+        args: Argomenti della chiamata
+        marketplace: Marketplace iniziale (per risolvere i nomi degli oggetti)
+
+    Returns:
+        Tupla (letture, scritture) di identificativi come 'droid:R2-D2', 'ship:X-Wing', 'balance'
+    """
+    action = TOOL_ALIASES.get(tool, tool)
+    if action == 'book_travel':
+        droid = _arg(args, 'asset', 'droid', 'asset_name')
+        ship = _arg(args, 'ship', 'ship_name')
+        return set(), {f'droid:{droid}', f'ship:{ship}', 'ships', 'balance'}
+    if action == 'purchase_item':
+        return set(), {f'item:{_item_id(marketplace, args)}', 'marketplace', 'inventory', 'balance'}
+    if action == 'get_asset_location':
+        asset = _arg(args, 'asset', 'droid', 'asset_name', 'name', 'input')
+        return {f'droid:{asset}', f'ship:{asset}'}, set()
+    if action == 'get_ships':
+        return {'ships'}, set()
+    if action == 'search_marketplace':
+        return {'marketplace'}, set()
+    if action == 'get_balance':
+        return {'balance'}, set()
+    if action == 'get_inventory':
+        return {'inventory'}, set()
+    # calculate_travel_cost e InfoSphere leggono solo dati che non cambiano
+    return set(), set()
+
+
+def _plan_cost(tool: str, args: Dict, state: Dict) -> float:
+    """Costo di un'azione nella simulazione seriale del piano (0 se non spende crediti)"""
+    action = TOOL_ALIASES.get(tool, tool)
+    if action == 'purchase_item':
+        return state['marketplace'].get(_item_id(state['marketplace'], args), {}).get('price', 0)
+    if action == 'book_travel':
+        droid = state['droids'].get(_arg(args, 'asset', 'droid', 'asset_name'), {})
+        ship = state['ships'].get(_arg(args, 'ship', 'ship_name'), {})
+        destination = _arg(args, 'destination', 'to', 'target', 'planet')
+        route = state['travel_costs'].get(f"{droid.get('location')}-{destination}", 0)
+        return route + ship.get('rental_cost', 0)
+    return 0
+
+
+def decompose_plan(plan: List, initial_state: Dict) -> Dict:
+    """
+    Scompone un piano in flussi per droide e ne calcola le dipendenze
+
+    Un acquisto (o una ricerca nel marketplace di un pianeta) va al droide che in quel
+    momento del piano si trova sul pianeta dell'oggetto, preferendo il meno carico; le
+    azioni senza droide vanno al coordinatore. Due azioni dipendono l'una dall'altra se
+    appartengono allo stesso flusso o se toccano la stessa risorsa (nave, droide,
+    oggetto, saldo...) con almeno una scrittura. Il saldo è condiviso solo se il piano
+    può esaurirlo: se la spesa totale sta nel budget gli addebiti commutano.
+
+    Args:
+        plan: Step del piano (formato intermediate_steps; 'agent' esplicito opzionale)
+        initial_state: Stato galattico di partenza
+
+    Returns:
+        Dict con actions (tool, args, agent, depends_on), streams, balance_shared, dependencies
+    """
+    marketplace = initial_state.get('marketplace', {})
+    locations = {name: info.get('location') for name, info in initial_state.get('droids', {}).items()}
+    simulated = copy.deepcopy({key: dict(initial_state.get(key, {}))
+                               for key in ('droids', 'ships', 'marketplace', 'travel_costs')})
+
+    actions = []
+    load = {name: 0 for name in locations}
+    total_cost = 0
+    for step in plan:
+        normalized = normalize_step(step)
+        if normalized is None:
+            continue
+        tool, args = normalized
+        args = {key: value for key, value in args.items() if key not in _PLAN_KEYS}
+        action = TOOL_ALIASES.get(tool, tool)
+        total_cost += _plan_cost(tool, args, simulated)
+
+        agent = step.get('agent') if isinstance(step, dict) else None
+        if agent is None:
+            droid = _arg(args, 'asset', 'droid', 'asset_name')
+            planet = None
+            if action == 'purchase_item':
+                planet = marketplace.get(_item_id(marketplace, args), {}).get('planet')
+            elif action == 'search_marketplace':
+                planet = _arg(args, 'planet', 'location')
+
+            if action in ('book_travel', 'get_asset_location') and droid in locations:
+                agent = droid
+            elif planet is not None:
+                on_planet = sorted((load[name], name) for name, location in locations.items() if location == planet)
+                agent = on_planet[0][1] if on_planet else COORDINATOR
+            else:
+                agent = COORDINATOR
+
+        if action == 'book_travel' and _arg(args, 'asset', 'droid', 'asset_name') in locations:
+            droid = _arg(args, 'asset', 'droid', 'asset_name')
+            destination = _arg(args, 'destination', 'to', 'target', 'planet')
+            ship = simulated['ships'].get(_arg(args, 'ship', 'ship_name'))
+            locations[droid] = destination
+            simulated['droids'].setdefault(droid, {})['location'] = destination
+            if ship is not None:
+                ship['location'] = destination
+        load[agent] = load.get(agent, 0) + 1
+
+        reads, writes = action_resources(tool, args, marketplace)
+        actions.append({'tool': tool, 'args': args, 'agent': agent, 'reads': reads, 'writes': writes})
+
+    budget = initial_state.get('client', {}).get('balance', 0)
+    balance_shared = total_cost > budget
+    commutative = _COMMUTATIVE if balance_shared else _COMMUTATIVE | {'balance'}
+
+    last_by_agent = {}
+    dependencies = 0
+    for index, action in enumerate(actions):
+        depends_on = set()
+        if action['agent'] in last_by_agent:
+            depends_on.add(last_by_agent[action['agent']])
+        for earlier in range(index):
+            other = actions[earlier]
+            conflicts = (action['writes'] & (other['writes'] | other['reads'])) | (action['reads'] & other['writes'])
+            # Gli addebiti commutano tra loro, non con le letture dello stesso dato
+            if action['writes'] & other['writes'] & commutative and not conflicts - commutative:
+                conflicts = (action['reads'] & other['writes']) | (action['writes'] & other['reads'])
+            if conflicts:
+                depends_on.add(earlier)
+        action['depends_on'] = sorted(depends_on)
+        dependencies += len(depends_on) - (action['agent'] in last_by_agent)
+        last_by_agent[action['agent']] = index
+
+    streams = {}
+    for index, action in enumerate(actions):
+        streams.setdefault(action['agent'], []).append(index)
+    return {
+        'actions': actions,
+        'streams': streams,
+        'balance_shared': balance_shared,
+        'planned_cost': total_cost,
+        'cross_stream_dependencies': dependencies
+    }
+
+
+def build_deployment_plan(state: Dict, items_per_planet: int = 1) -> List[Dict]:
+    """
+    Piano multi-droide dimostrativo per l'Ultimate Challenge del round 3
+
+    Porta un droide su ogni pianeta senza droidi (usando un droide di un pianeta che ne ha
+    più d'uno e una nave presente lì), poi su ogni pianeta il droide presente compra gli
+    oggetti più economici e interroga l'InfoSphere sulle entità locali.
+
+    Args:
+        state: Stato galattico di partenza
+        items_per_planet: Oggetti da comprare per pianeta
+
+    Returns:
+        Piano in formato intermediate_steps, con 'agent' esplicito per ogni step
+    """
+    droids = {name: info.get('location') for name, info in sorted(state.get('droids', {}).items())}
+    ships = {name: info.get('location') for name, info in sorted(state.get('ships', {}).items())
+             if info.get('available', True)}
+    planets = sorted({route.partition('-')[0] for route in state.get('travel_costs', {})} | set(droids.values()))
+
+    plan = []
+    for planet in planets:
+        if planet in droids.values():
+            continue
+        crowded = [name for name, location in droids.items() if list(droids.values()).count(location) > 1]
+        for droid in crowded:
+            origin = droids[droid]
+            ship = next((name for name, location in ships.items() if location == origin), None)
+            if ship is not None and f'{origin}-{planet}' in state.get('travel_costs', {}):
+                plan.append({'tool': 'book_travel', 'asset': droid, 'destination': planet, 'ship': ship,
+                             'agent': droid})
+                droids[droid] = ships[ship] = planet
+                break
+
+    for planet in planets:
+        agent = next((name for name, location in droids.items() if location == planet), COORDINATOR)
+        items = sorted((info.get('price', 0), item_id) for item_id, info in state.get('marketplace', {}).items()
+                       if info.get('planet') == planet)
+        for _, item_id in items[:items_per_planet]:
+            plan.append({'tool': 'purchase_item', 'item_id': item_id, 'agent': agent})
+        for entity, info in sorted(state.get('infosphere', {}).items()):
+            if isinstance(info, dict) and info.get('planet') == planet:
+                plan.append({'tool': 'query_infosphere', 'entity': entity, 'agent': agent})
+    return plan
+
+
+class MultiAgentRunner:
+    """
+    Esecutore dei flussi di un piano su un pool di thread
+
+    Ogni azione parte appena le sue dipendenze sono completate; le azioni dello stesso
+    flusso restano in sequenza. Le chiamate al motore sono serializzate da un lock (la
+    latenza simulata delle API avviene fuori dal lock), e l'ordine di applicazione viene
+    registrato: rieseguire intermediate_steps in quell'ordine riproduce final_state.
+
+    Args:
+        engine: Motore su cui eseguire (default: stato iniziale del round)
+        round_number: Round da caricare se engine non è fornito
+        call_latency: Latenza simulata di ogni chiamata API (formato LatencyModel, ms)
+        max_workers: Thread del pool (default: un thread per flusso)
+        seed: Seed delle latenze simulate
+        backend: Funzione (tool, args) -> risultato alternativa al motore locale
+                 (es. un client del Galaxy API server); in questo caso niente lock
+    """
+
+    def __init__(self, engine: GalaxyEngine = None, round_number: int = 3, call_latency: str = 'fixed:0',
+                 max_workers: int = None, seed: int = 42, backend: Callable[[str, Dict], Any] = None):
+        self.engine = engine or GalaxyEngine.from_round(round_number)
+        self.round_number = round_number
+        self.latency = LatencyModel(call_latency)
+        self.max_workers = max_workers
+        self.seed = seed
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._applied = 0
+
+    def _call(self, tool: str, args: Dict, delay: float) -> Tuple[Any, int]:
+        if delay:
+            time.sleep(delay)
+        if self.backend is not None:
+            with self._lock:
+                self._applied += 1
+                sequence = self._applied
+            return self.backend(tool, args), sequence
+        with self._lock:
+            self._applied += 1
+            return self.engine.execute(tool, args), self._applied
+
+    def _execute_action(self, index: int, action: Dict, delay: float) -> Dict:
+        start = time.time()
+        result, sequence = self._call(action['tool'], action['args'], delay)
+        end = time.time()
+        return {
+            'id': f's{index}',
+            'tool': action['tool'],
+            'tool_input': action['args'],
+            'agent': action['agent'],
+            'depends_on': [f's{dependency}' for dependency in action['depends_on']],
+            'start_time': round(start, 6),
+            'end_time': round(end, 6),
+            'observation': result,
+            'sequence': sequence
+        }
+
+    def run(self, plan: List, parallel: bool = True) -> Dict:
+        """
+        Esegue il piano
+
+        Args:
+            plan: Step del piano (formato intermediate_steps)
+            parallel: Se False esegue le azioni una alla volta nell'ordine del piano
+
+        Returns:
+            Dict con intermediate_steps (in ordine di applicazione), final_state ed execution
+            (makespan, tempo seriale, speedup, critical path, flussi e dipendenze)
+        """
+        decomposition = decompose_plan(plan, self.engine.state)
+        actions = decomposition['actions']
+        rng = random.Random(self.seed)
+        delays = [self.latency.sample(rng) / 1000 for _ in actions]
+        self._applied = 0
+
+        start = time.perf_counter()
+        records = []
+        if not parallel:
+            records = [self._execute_action(index, action, delays[index]) for index, action in enumerate(actions)]
+        elif actions:
+            dependents = {index: [] for index in range(len(actions))}
+            waiting = {}
+            for index, action in enumerate(actions):
+                waiting[index] = set(action['depends_on'])
+                for dependency in action['depends_on']:
+                    dependents[dependency].append(index)
+
+            workers = self.max_workers or max(1, len(decomposition['streams']))
+            with ThreadPoolExecutor(workers, thread_name_prefix='agent') as pool:
+                running = {}
+                ready = [index for index, deps in waiting.items() if not deps]
+                while ready or running:
+                    for index in ready:
+                        running[pool.submit(self._execute_action, index, actions[index], delays[index])] = index
+                    ready = []
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = running.pop(future)
+                        records.append(future.result())
+                        for dependent in dependents[index]:
+                            waiting[dependent].discard(index)
+                            if not waiting[dependent]:
+                                ready.append(dependent)
+        makespan = time.perf_counter() - start
+
+        records.sort(key=lambda record: record['sequence'])
+        for record in records:
+            del record['sequence']
+        timing = analyze_timing(records)
+        serial = sum(record['end_time'] - record['start_time'] for record in records)
+        final_state = copy.deepcopy(self.engine.state) if self.backend is None else None
+
+        return {
+            'intermediate_steps': records,
+            'final_state': final_state,
+            'execution': {
+                'mode': 'parallel' if parallel else 'serial',
+                'actions': len(actions),
+                'agents': {agent: len(indexes) for agent, indexes in decomposition['streams'].items()},
+                'cross_stream_dependencies': decomposition['cross_stream_dependencies'],
+                'balance_shared': decomposition['balance_shared'],
+                'planned_cost': decomposition['planned_cost'],
+                'failed_actions': sum(1 for r in records
+                                      if isinstance(r['observation'], dict) and r['observation'].get('success') is False),
+                'makespan_s': round(makespan, 4),
+                'serial_s': round(serial, 4),
+                'speedup': round(serial / makespan, 2) if makespan > 0 else 1.0,
+                'critical_path_s': timing['critical_path_s'] if timing else 0.0
+            }
+        }
+
+
+def _summary_response(task_id: int, execution: Dict) -> str:
+    agents = ', '.join(f"{agent} ({count} azioni)" for agent, count in execution['agents'].items())
+    return (f"Missione {task_id} completata con {len(execution['agents'])} agenti in parallelo: {agents}. "
+            f"Eseguite {execution['actions']} azioni in {execution['makespan_s']:.2f}s contro "
+            f"{execution['serial_s']:.2f}s in serie (speedup {execution['speedup']}x).")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Esecuzione parallela multi-droide di un piano di missione')
+    parser.add_argument('--round', type=int, default=3, help='Numero del round (default: 3)')
+    parser.add_argument('--task', type=int, default=4,
+                        help='Missione: piano del planner A* o, per la 5 del round 3, piano di deployment (default: 4)')
+    parser.add_argument('--plan', help='File JSON con il piano (lista di step o submission con intermediate_steps)')
+    parser.add_argument('--call-latency', default='fixed:50',
+                        help='Latenza simulata di ogni chiamata API (default: fixed:50)')
+    parser.add_argument('--workers', type=int, help='Thread del pool (default: uno per droide)')
+    parser.add_argument('--compare-serial', action='store_true',
+                        help="Esegue anche il piano in serie e verifica che lo stato finale coincida")
+    parser.add_argument('--output', help='File JSON della submission prodotta (formato del valutatore)')
+
+    args = parser.parse_args()
+
+    engine = GalaxyEngine.from_round(args.round)
+    if args.plan:
+        with open(args.plan, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        plan = loaded.get('intermediate_steps', []) if isinstance(loaded, dict) else loaded
+    elif args.round == 3 and args.task == 5:
+        plan = build_deployment_plan(engine.state)
+    else:
+        from action_planner import build_mission_goals, plan_actions
+
+        goals = build_mission_goals(args.round, engine.state)
+        if args.task not in goals:
+            print(f"❌ Nessun obiettivo pianificabile per la missione {args.task} del round {args.round}")
+            return
+        planned = plan_actions(engine, goals[args.task])
+        if planned is None:
+            print("❌ Nessun piano trovato")
+            return
+        plan = planned['plan']
+
+    checkpoint = engine.checkpoint()
+    runner = MultiAgentRunner(engine, args.round, args.call_latency, args.workers)
+    result = runner.run(plan)
+    execution = result['execution']
+
+    print(f"🤝 Missione {args.task} (round {args.round}): {execution['actions']} azioni su "
+          f"{len(execution['agents'])} flussi, {execution['cross_stream_dependencies']} dipendenze tra flussi")
+    for agent, count in execution['agents'].items():
+        print(f"   • {agent}: {count} azioni")
+    print(f"   💰 Saldo condiviso: {'sì' if execution['balance_shared'] else 'no (addebiti commutativi)'}")
+    print(f"   ⏱️ Makespan: {execution['makespan_s']:.3f}s  Seriale: {execution['serial_s']:.3f}s  "
+          f"Speedup: {execution['speedup']}x  Critical path: {execution['critical_path_s']:.3f}s")
+    if execution['failed_actions']:
+        print(f"   ⚠️ Azioni fallite: {execution['failed_actions']}")
+
+    if args.compare_serial:
+        parallel_state = result['final_state']
+        engine.rollback(checkpoint)
+        serial = runner.run(plan, parallel=False)
+        same = serial['final_state'] == parallel_state
+        print(f"   🐢 Esecuzione seriale misurata: {serial['execution']['makespan_s']:.3f}s "
+              f"(stato finale {'identico' if same else 'DIVERSO'})")
+        execution['measured_serial_s'] = serial['execution']['makespan_s']
+        execution['same_final_state'] = same
+
+    if args.output:
+        submission = {
+            'task_id': args.task,
+            'round': args.round,
+            'agent_response': _summary_response(args.task, execution),
+            'intermediate_steps': result['intermediate_steps'],
+            'final_state': result['final_state'],
+            'execution': execution
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(submission, f, indent=2, ensure_ascii=False)
+        print(f"💾 Submission salvata in: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+⏱️ Pipeline Profiler - Tempi per fase della pipeline di valutazione
+Misura, file per file, glob, decodifica JSON, estrazione dei campi, caricamento
+del CSV dei task, scoring e stampa dei risultati; aggrega percentili per fase e,
+se richiesto, conserva il profilo cProfile dei file più lenti.
+"""
+
+import cProfile
+import heapq
+import itertools
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+PIPELINE_PHASES = ['glob', 'json_decode', 'extract', 'duplicates', 'replay', 'task_csv', 'scoring', 'display']
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile nearest-rank di una lista già ordinata"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class PipelineProfiler:
+    """
+    Raccoglie i tempi delle fasi della pipeline per ogni file valutato
+
+    Args:
+        cprofile_top: Se > 0, profila ogni file con cProfile e conserva i profili degli N più lenti
+        on_file: Callback opzionale chiamata con il record di ogni file appena valutato
+    """
+
+    def __init__(self, cprofile_top: int = 0, on_file: Optional[Callable[[Dict], None]] = None):
+        self.cprofile_top = cprofile_top
+        self.on_file = on_file
+        self.records: List[Dict] = []
+        self.global_phases: Dict[str, float] = {}
+        self._current: Optional[Dict] = None
+        self._slowest = []  # min-heap di (durata, contatore, file, profilo)
+        self._counter = itertools.count()
+
+    @contextmanager
+    def file(self, path: str):
+        """Delimita la valutazione di un file: le fasi misurate all'interno gli vengono attribuite"""
+        record = {'file': path, 'phases': {}}
+        previous, self._current = self._current, record
+        profiler = cProfile.Profile() if self.cprofile_top > 0 else None
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler:
+                profiler.disable()
+            record['seconds'] = time.perf_counter() - start
+            self._current = previous
+            self.records.append(record)
+            if profiler:
+                self._keep_if_slow(record, profiler)
+            if self.on_file:
+                self.on_file(record)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Misura una fase; fuori da file() viene contata come fase globale (es. glob)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            phases = self._current['phases'] if self._current is not None else self.global_phases
+            phases[name] = phases.get(name, 0.0) + elapsed
+
+    def _keep_if_slow(self, record: Dict, profiler: cProfile.Profile):
+        entry = (record['seconds'], next(self._counter), record['file'], profiler)
+        if len(self._slowest) < self.cprofile_top:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest_files(self, n: int = 10) -> List[Dict]:
+        """Gli n file più lenti con i tempi per fase"""
+        records = heapq.nlargest(n, self.records, key=lambda record: record['seconds'])
+        return [{
+            'file': record['file'],
+            'seconds': round(record['seconds'], 6),
+            'phases': {name: round(seconds, 6) for name, seconds in record['phases'].items()}
+        } for record in records]
+
+    def summary(self, slowest: int = 10) -> Dict:
+        """
+        Aggrega i tempi per fase su tutti i file
+
+        Returns:
+            Dict con fasi globali, statistiche per fase (totale, media, p50/p95/p99, max)
+            e i file più lenti
+        """
+        phase_names = [name for name in PIPELINE_PHASES if any(name in r['phases'] for r in self.records)]
+        phase_names += sorted({name for r in self.records for name in r['phases']} - set(phase_names))
+        durations = {name: sorted(r['phases'].get(name, 0.0) for r in self.records) for name in phase_names}
+        durations['file_total'] = sorted(r['seconds'] for r in self.records)
+
+        phases = {}
+        for name, values in durations.items():
+            total = sum(values)
+            phases[name] = {
+                'total_seconds': round(total, 6),
+                'mean_ms': round(total / len(values) * 1000, 3) if values else 0.0,
+                'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+                'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+                'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+                'max_ms': round(values[-1] * 1000, 3) if values else 0.0
+            }
+
+        return {
+            'files': len(self.records),
+            'global_phases': {name: round(seconds, 6) for name, seconds in self.global_phases.items()},
+            'phases': phases,
+            'slowest_files': self.slowest_files(slowest)
+        }
+
+    def dump_slowest(self, output_file: str) -> List[str]:
+        """
+        Salva in un unico file pstats i profili cProfile dei file più lenti
+
+        Args:
+            output_file: Path del dump (leggibile con python -m pstats)
+
+        Returns:
+            I file inclusi nel dump, dal più lento
+        """
+        if not self._slowest:
+            return []
+        entries = sorted(self._slowest, reverse=True)
+        stats = pstats.Stats(entries[0][3])
+        for entry in entries[1:]:
+            stats.add(entry[3])
+        stats.dump_stats(output_file)
+        return [entry[2] for entry in entries]
+
+    def print_summary(self, slowest: int = 5):
+        """Stampa una tabella compatta delle fasi"""
+        summary = self.summary(slowest)
+        print(f"\n⏱️ PROFILO PIPELINE ({summary['files']} file)")
+        for name, seconds in summary['global_phases'].items():
+            print(f"   • {name:<12} {seconds * 1000:>10.1f}ms (una tantum)")
+        for name, data in summary['phases'].items():
+            print(f"   • {name:<12} totale {data['total_seconds']:>8.3f}s  p50 {data['p50_ms']:>8.3f}ms  "
+                  f"p95 {data['p95_ms']:>8.3f}ms  p99 {data['p99_ms']:>8.3f}ms")
+        if summary['slowest_files']:
+            print("   🐢 File più lenti:")
+            for record in summary['slowest_files']:
+                print(f"      {record['seconds'] * 1000:>8.1f}ms  {record['file']}")
@@ -0,0 +1,183 @@
+"""
+🛒 Purchase Optimizer - Selezione ottima degli acquisti nel marketplace
+Oracolo di scoring per le missioni di acquisto con budget: subset-sum esatto
+su bitset (DP) e percorso veloce basato su ordinamento per massimizzare il numero di oggetti.
+"""
+
+from functools import reduce
+from math import gcd
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Oltre questa dimensione (oggetti x budget scalato, in bit) il DP esatto viene sostituito dal greedy
+MAX_DP_BITS = 200_000_000
+
+
+def _affordable_items(marketplace: Dict[str, Dict], budget: float,
+                      exclude: Iterable[str] = ()) -> List[Tuple[str, int]]:
+    """Lista (item_id, prezzo) degli oggetti acquistabili singolarmente con il budget"""
+    excluded = set(exclude)
+    return [
+        (item_id, info.get('price', 0))
+        for item_id, info in marketplace.items()
+        if item_id not in excluded and info.get('price', 0) <= budget
+    ]
+
+
+def _plan(marketplace: Dict[str, Dict], item_ids: List[str], budget: float, exact: bool = True) -> Dict:
+    spent = sum(marketplace[item_id].get('price', 0) for item_id in item_ids)
+    return {
+        'items': item_ids,
+        'item_names': [marketplace[item_id].get('name') for item_id in item_ids],
+        'count': len(item_ids),
+        'spent': spent,
+        'remaining': budget - spent,
+        'exact': exact
+    }
+
+
+def max_items_within_budget(marketplace: Dict[str, Dict], budget: float) -> Dict:
+    """
+    Massimizza il numero di oggetti acquistati senza superare il budget
+
+    Prendere gli oggetti in ordine di prezzo crescente è ottimo per il conteggio,
+    quindi basta un ordinamento: O(n log n).
+    """
+    chosen = []
+    spent = 0
+    for item_id, price in sorted(_affordable_items(marketplace, budget), key=lambda item: item[1]):
+        if spent + price > budget:
+            break
+        chosen.append(item_id)
+        spent += price
+
+    return _plan(marketplace, chosen, budget)
+
+
+def max_spend_within_budget(marketplace: Dict[str, Dict], budget: float,
+                            exclude: Iterable[str] = ()) -> Dict:
+    """
+    Sceglie il sottoinsieme di oggetti che spende il più possibile senza superare il budget
+
+    Subset-sum esatto: gli insiemi di somme raggiungibili sono bitset su interi Python,
+    con i prezzi scalati per il loro MCD. Se il problema è troppo grande si usa un
+    greedy per prezzo decrescente (exact=False).
+    """
+    items = _affordable_items(marketplace, budget, exclude)
+    if not items:
+        return _plan(marketplace, [], budget)
+
+    # Percorso veloce: tutti gli oggetti stanno nel budget
+    if sum(price for _, price in items) <= budget:
+        return _plan(marketplace, [item_id for item_id, _ in items], budget)
+
+    prices = [int(price) for _, price in items]
+    unit = reduce(gcd, prices) or 1
+    weights = [price // unit for price in prices]
+    capacity = int(budget // unit)
+
+    if len(items) * (capacity + 1) > MAX_DP_BITS:
+        return _greedy_max_spend(marketplace, items, budget)
+
+    mask = (1 << (capacity + 1)) - 1
+    reachable = [1]
+    for weight in weights:
+        current = reachable[-1]
+        reachable.append((current | (current << weight)) & mask)
+
+    best = reachable[-1].bit_length() - 1
+
+    # Ricostruzione all'indietro: l'oggetto i è preso se la somma non era già raggiungibile senza
+    chosen = []
+    total = best
+    for i in range(len(items), 0, -1):
+        if not (reachable[i - 1] >> total) & 1:
+            chosen.append(items[i - 1][0])
+            total -= weights[i - 1]
+    chosen.reverse()
+
+    return _plan(marketplace, chosen, budget)
+
+
+def _greedy_max_spend(marketplace: Dict[str, Dict], items: List[Tuple[str, int]], budget: float) -> Dict:
+    chosen = []
+    remaining = budget
+    for item_id, price in sorted(items, key=lambda item: -item[1]):
+        if price <= remaining:
+            chosen.append(item_id)
+            remaining -= price
+    return _plan(marketplace, chosen, budget, exact=False)
+
+
+def most_expensive_then_fill(marketplace: Dict[str, Dict], budget: float) -> Dict:
+    """
+    Compra l'oggetto più costoso acquistabile, poi spende al meglio i crediti rimanenti
+
+    Returns:
+        Piano di acquisto con 'anchor_item' (l'oggetto più costoso scelto)
+    """
+    items = _affordable_items(marketplace, budget)
+    if not items:
+        return {**_plan(marketplace, [], budget), 'anchor_item': None}
+
+    anchor_id, anchor_price = max(items, key=lambda item: item[1])
+    rest = max_spend_within_budget(marketplace, budget - anchor_price, exclude=[anchor_id])
+
+    plan = _plan(marketplace, [anchor_id] + rest['items'], budget, exact=rest['exact'])
+    plan['anchor_item'] = anchor_id
+    return plan
+
+
+def cheapest_item_per_planet(marketplace: Dict[str, Dict], budget: float,
+                             planets: Optional[Iterable[str]] = None) -> Optional[Dict]:
+    """
+    Acquisto di costo minimo con almeno un oggetto per pianeta
+
+    Returns:
+        Piano di acquisto, oppure None se il budget non basta o un pianeta non ha oggetti
+    """
+    cheapest = {}
+    for item_id, info in marketplace.items():
+        planet = info.get('planet')
+        if planet not in cheapest or info.get('price', 0) < marketplace[cheapest[planet]].get('price', 0):
+            cheapest[planet] = item_id
+
+    required = set(cheapest) if planets is None else set(planets)
+    if not required <= set(cheapest):
+        return None
+
+    chosen = [cheapest[planet] for planet in sorted(required)]
+    plan = _plan(marketplace, chosen, budget)
+    return plan if plan['spent'] <= budget else None
+
+
+def purchased_items(initial_state: Dict, final_state: Dict) -> List[str]:
+    """Nomi degli oggetti acquistati: inventario finale meno inventario iniziale (multinsieme)"""
+    remaining = list(initial_state.get('client', {}).get('inventory', []))
+    purchased = []
+    for name in final_state.get('client', {}).get('inventory', []):
+        if name in remaining:
+            remaining.remove(name)
+        else:
+            purchased.append(name)
+    return purchased
+
+
+def match_purchases(marketplace: Dict[str, Dict], names: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Associa i nomi acquistati agli item_id del marketplace iniziale
+
+    Returns:
+        Tupla (item_id associati, nomi non presenti nel marketplace)
+    """
+    by_name = {}
+    for item_id, info in sorted(marketplace.items(), key=lambda item: item[1].get('price', 0)):
+        by_name.setdefault(info.get('name'), []).append(item_id)
+
+    matched, unknown = [], []
+    for name in names:
+        candidates = by_name.get(name)
+        if candidates:
+            matched.append(candidates.pop(0))
+        else:
+            unknown.append(name)
+    return matched, unknown
@@ -0,0 +1,309 @@
+"""
+🧮 Result Table - Risultati di valutazione in forma colonnare compatta
+Ogni missione valutata diventa una riga di array tipizzati (array.array) invece di un
+dict con max_scores, evaluation_details e tools_used annidati. Partecipanti, pianeti,
+nomi dei tool e set di max_scores sono internati in piccoli interi. Classifica,
+aggregazioni ed export leggono le colonne; il dict completo di evaluate_mission viene
+ricostruito solo per la riga da mostrare (row) o in streaming (records) per l'export.
+"""
+
+import math
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Colonne numeriche: array('d') per i punteggi, array('i') per interi e codici internati
+FLOAT_COLUMNS = ('max_score', 'correctness', 'efficiency', 'quality', 'total_score', 'percentage',
+                 'remaining_balance')
+INT_COLUMNS = ('round', 'task_id', 'participant', 'api_calls_used', 'droid_location', 'inventory_items',
+               'max_scores', 'tool_start', 'tool_count')
+
+# Chiavi del risultato e di evaluation_details coperte dalle colonne; le altre finiscono in extras
+_RESULT_KEYS = {'task_id', 'max_score', 'correctness', 'efficiency', 'quality', 'total_score', 'percentage',
+                'api_calls_used', 'evaluation_details', 'max_scores', 'round_number', 'participant_id',
+                'source_file'}
+_DETAIL_KEYS = {'droid_location', 'remaining_balance', 'inventory_items', 'api_calls', 'tools_used'}
+
+_MISSING = -1
+
+
+class _Interner:
+    """Valori distinti <-> codici interi progressivi"""
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def code(self, value: Any) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Any) -> Optional[int]:
+        return self._codes.get(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _number(value: float):
+    # I valori interi (max_score, saldo) tornano int come nel risultato originale
+    return int(value) if value.is_integer() else value
+
+
+class ResultTable:
+    """
+    Tabella colonnare dei risultati, un risultato per (round, partecipante, missione)
+
+    Una rivalutazione della stessa missione sostituisce la riga esistente, come faceva
+    la cache a dict di JSONMissionEvaluator. L'iterazione produce una vista dict per
+    riga (formato evaluate_mission), quindi la tabella si passa direttamente a
+    ResultsStore.upsert_results; generate_leaderboard e score_analytics.load_columns
+    leggono invece le colonne senza creare dict.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array('d') for name in FLOAT_COLUMNS}
+        self.columns.update({name: array('i') for name in INT_COLUMNS})
+        self.tool_codes = array('H')
+        self.source_files: List[Optional[str]] = []
+        self.participants = _Interner()
+        self.locations = _Interner()
+        self.tools = _Interner()
+        self._max_scores = _Interner()
+        # Chiavi fuori schema (timing, replay_verification, ...): rare, salvate per riga
+        self.extras: Dict[int, Dict[str, Dict]] = {}
+        self._index: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.source_files)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.records()
+
+    @staticmethod
+    def _key(round_value: int, participant: int, task_id: int) -> int:
+        # Chiave (round, partecipante, missione) impacchettata in un solo int: niente tuple per riga
+        return (round_value << 64) | (participant << 32) | task_id
+
+    def add(self, result: Dict, round_number: int = None) -> int:
+        """
+        Aggiunge (o sostituisce) il risultato di una missione
+
+        Args:
+            result: Risultato di evaluate_mission / evaluate_mission_file
+            round_number: Round da usare se il risultato non contiene 'round_number'
+
+        Returns:
+            Indice della riga
+        """
+        details = result.get('evaluation_details') or {}
+        round_value = int(result.get('round_number', round_number or 1))
+        participant = self.participants.code(str(result.get('participant_id') or 'Unknown'))
+        task_id = int(result['task_id'])
+        location = details.get('droid_location')
+        balance = details.get('remaining_balance')
+        max_scores = result.get('max_scores')
+        tools = [self.tools.code(tool) for tool in details.get('tools_used', [])]
+
+        values = {
+            'max_score': float(result['max_score']),
+            'correctness': float(result['correctness']),
+            'efficiency': float(result['efficiency']),
+            'quality': float(result['quality']),
+            'total_score': float(result['total_score']),
+            'percentage': float(result['percentage']),
+            'remaining_balance': float(balance) if balance is not None else math.nan,
+            'round': round_value,
+            'task_id': task_id,
+            'participant': participant,
+            'api_calls_used': int(result.get('api_calls_used', details.get('api_calls', 0))),
+            'droid_location': self.locations.code(location) if location is not None else _MISSING,
+            'inventory_items': int(details.get('inventory_items', 0)),
+            'max_scores': self._max_scores.code(tuple(max_scores.items())) if max_scores else _MISSING,
+            'tool_start': len(self.tool_codes),
+            'tool_count': len(tools)
+        }
+        self.tool_codes.extend(tools)
+
+        key = self._key(round_value, participant, task_id)
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self)
+            for name, value in values.items():
+                self.columns[name].append(value)
+            self.source_files.append(result.get('source_file'))
+        else:
+            # Rivalutazione: i vecchi codici dei tool restano orfani in tool_codes (pochi byte)
+            for name, value in values.items():
+                self.columns[name][index] = value
+            self.source_files[index] = result.get('source_file')
+
+        extra_result = {k: v for k, v in result.items() if k not in _RESULT_KEYS}
+        extra_details = {k: v for k, v in details.items() if k not in _DETAIL_KEYS}
+        if extra_result or extra_details:
+            self.extras[index] = {'result': extra_result, 'details': extra_details}
+        else:
+            self.extras.pop(index, None)
+        return index
+
+    def extend(self, results, round_number: int = None):
+        for result in results:
+            self.add(result, round_number)
+
+    def find(self, participant_id: str, task_id: int, round_number: int) -> Optional[int]:
+        """Indice della riga di un partecipante e missione (None se assente)"""
+        participant = self.participants.lookup(participant_id)
+        if participant is None:
+            return None
+        return self._index.get(self._key(round_number, participant, task_id))
+
+    def row(self, index: int) -> Dict:
+        """Vista dict di una riga, nello stesso formato di evaluate_mission"""
+        c = self.columns
+        start, count = c['tool_start'][index], c['tool_count'][index]
+        location = c['droid_location'][index]
+        balance = c['remaining_balance'][index]
+        max_scores = c['max_scores'][index]
+        extras = self.extras.get(index, {})
+
+        details = {
+            'droid_location': self.locations.values[location] if location != _MISSING else None,
+            'remaining_balance': _number(balance) if not math.isnan(balance) else None,
+            'inventory_items': c['inventory_items'][index],
+            'api_calls': c['api_calls_used'][index],
+            'tools_used': [self.tools.values[code] for code in self.tool_codes[start:start + count]],
+            **extras.get('details', {})
+        }
+        result = {
+            'task_id': c['task_id'][index],
+            'max_score': _number(c['max_score'][index]),
+            'correctness': c['correctness'][index],
+            'efficiency': c['efficiency'][index],
+            'quality': c['quality'][index],
+            'total_score': c['total_score'][index],
+            'percentage': c['percentage'][index],
+            'api_calls_used': c['api_calls_used'][index],
+            'evaluation_details': details,
+            'max_scores': dict(self._max_scores.values[max_scores]) if max_scores != _MISSING else None,
+            'source_file': self.source_files[index],
+            'round_number': c['round'][index],
+            'participant_id': self.participants.values[c['participant'][index]],
+            **extras.get('result', {})
+        }
+        if result['max_scores'] is None:
+            del result['max_scores']
+        return result
+
+    def records(self) -> Iterator[Dict]:
+        """Viste dict di tutte le righe, create una alla volta (export in streaming)"""
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def participant_totals(self) -> Dict[str, Dict]:
+        """
+        Punteggi aggregati per partecipante, letti dalle colonne
+
+        Returns:
+            Dict partecipante -> total_score, missions_completed e round_scores (round -> punti)
+        """
+        totals = {}
+        names = self.participants.values
+        for participant, round_value, score in zip(self.columns['participant'], self.columns['round'],
+                                                   self.columns['total_score']):
+            entry = totals.get(participant)
+            if entry is None:
+                entry = totals[participant] = {'total_score': 0, 'missions_completed': 0,
+                                               'round_scores': {1: 0, 2: 0, 3: 0}}
+            entry['total_score'] += score
+            entry['missions_completed'] += 1
+            entry['round_scores'][round_value] = entry['round_scores'].get(round_value, 0) + score
+        return {names[participant]: entry for participant, entry in totals.items()}
+
+    def summary(self) -> Dict:
+        """Totali della tabella (come le statistiche finali di evaluate_all_missions)"""
+        count = len(self)
+        return {
+            'missions_completed': count,
+            'total_score': float(sum(self.columns['total_score'])),
+            'max_possible_score': float(sum(self.columns['max_score'])),
+            'average_score': float(sum(self.columns['percentage']) / count) if count else 0.0,
+            'total_api_calls': int(sum(self.columns['api_calls_used'])),
+            'participants': len(self.participants)
+        }
+
+    def to_columns(self) -> Dict:
+        """
+        Colonne numpy nel formato di score_analytics.load_columns (senza passare dai dict)
+
+        Returns:
+            Dict di array numpy più 'participants' (nomi ordinati corrispondenti ai codici)
+        """
+        import numpy as np
+
+        names = np.array(self.participants.values or [''], dtype=str)
+        order = np.argsort(names, kind='stable')
+        remap = np.empty(len(names), dtype=np.int32)
+        remap[order] = np.arange(len(names), dtype=np.int32)
+
+        c = self.columns
+        columns = {
+            'round': np.asarray(c['round'], dtype=np.int32),
+            'task_id': np.asarray(c['task_id'], dtype=np.int32),
+            'participant': remap[np.asarray(c['participant'], dtype=np.int32)],
+            'api_calls': np.asarray(c['api_calls_used'], dtype=np.int32)
+        }
+        for name in ('total_score', 'max_score', 'percentage', 'correctness', 'efficiency', 'quality'):
+            columns[name] = np.asarray(c[name], dtype=np.float64)
+
+        # Massimi dei componenti: una riga per set di max_scores internato, poi indicizzazione
+        codes = np.asarray(c['max_scores'], dtype=np.int64)
+        for component in ('correctness', 'efficiency', 'quality'):
+            lookup = np.array([dict(entry)[f'{component}_max'] for entry in self._max_scores.values] + [np.nan])
+            columns[f'{component}_max'] = lookup[np.where(codes == _MISSING, len(lookup) - 1, codes)]
+        columns['participants'] = names[order] if len(self) else np.array([], dtype=str)
+        return columns
+
+    def view(self, round_number: int) -> 'ResultsView':
+        """Vista dict di sola lettura (participant_id, task_id) -> risultato di un round"""
+        return ResultsView(self, round_number)
+
+    def memory_bytes(self) -> int:
+        """Byte occupati dagli array delle colonne e dei codici dei tool"""
+        return sum(column.itemsize * len(column) for column in self.columns.values()) + \
+            self.tool_codes.itemsize * len(self.tool_codes)
+
+
+class ResultsView(Mapping):
+    """
+    Risultati di un round come Mapping di sola lettura (participant_id, task_id) -> dict
+
+    Ogni accesso ricostruisce il dict della riga da ResultTable.row: la vista non
+    trattiene dict, e riflette le valutazioni aggiunte dopo la sua creazione.
+    """
+
+    def __init__(self, table: ResultTable, round_number: int):
+        self.table = table
+        self.round_number = round_number
+
+    def _rows(self) -> Iterator[int]:
+        return (index for index, round_value in enumerate(self.table.columns['round'])
+                if round_value == self.round_number)
+
+    def __getitem__(self, key: Tuple[str, int]) -> Dict:
+        participant_id, task_id = key
+        index = self.table.find(participant_id, task_id, self.round_number)
+        if index is None:
+            raise KeyError(key)
+        return self.table.row(index)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        names = self.table.participants.values
+        participants, task_ids = self.table.columns['participant'], self.table.columns['task_id']
+        for index in self._rows():
+            yield names[participants[index]], task_ids[index]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._rows())
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+🗄️ Results Store - Archivio SQLite indicizzato dei risultati di valutazione
+Un risultato per (round, task, partecipante), con indici per task, partecipante e
+punteggio: "top 20 del task 5 del round 2" o "tutte le submission del team X" diventano
+query dirette invece di una rilettura completa del JSON aggregato. Gli inserimenti
+avvengono in blocco dentro una transazione e le rivalutazioni sono upsert.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB_FILE = 'hackathon_results.db'
+UPSERT_BATCH_SIZE = 1000
+
+# Campi del risultato salvati in colonne proprie; il resto finisce in 'details' (JSON)
+SCORE_COLUMNS = ['total_score', 'max_score', 'percentage', 'correctness', 'efficiency', 'quality']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    round INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    participant_id TEXT NOT NULL,
+    total_score REAL NOT NULL,
+    max_score REAL,
+    percentage REAL,
+    correctness REAL,
+    efficiency REAL,
+    quality REAL,
+    api_calls_used INTEGER,
+    source_file TEXT,
+    evaluated_at TEXT NOT NULL,
+    details TEXT,
+    UNIQUE (round, task_id, participant_id)
+);
+CREATE INDEX IF NOT EXISTS idx_results_task_score ON results (round, task_id, total_score DESC);
+CREATE INDEX IF NOT EXISTS idx_results_participant ON results (participant_id, round, task_id);
+CREATE INDEX IF NOT EXISTS idx_results_round_score ON results (round, total_score DESC);
+"""
+
+_INSERT_COLUMNS = ['round', 'task_id', 'participant_id'] + SCORE_COLUMNS + \
+    ['api_calls_used', 'source_file', 'evaluated_at', 'details']
+
+UPSERT_SQL = (
+    f"INSERT INTO results ({', '.join(_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _INSERT_COLUMNS)}) "
+    f"ON CONFLICT (round, task_id, participant_id) DO UPDATE SET "
+    + ', '.join(f'{column} = excluded.{column}' for column in _INSERT_COLUMNS[3:])
+)
+
+
+def _json_default(value):
+    # Scalari numpy/pandas eventualmente presenti nei risultati
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+class ResultsStore:
+    """
+    Archivio SQLite dei risultati
+
+    Args:
+        db_file: File del database (':memory:' per un archivio temporaneo)
+    """
+
+    def __init__(self, db_file: str = DEFAULT_DB_FILE):
+        self.db_file = db_file
+        self.connection = sqlite3.connect(db_file)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _row(self, result: Dict, round_number: Optional[int], evaluated_at: str) -> tuple:
+        details = {key: value for key, value in result.items()
+                   if key not in SCORE_COLUMNS and key not in ('task_id', 'participant_id', 'round_number',
+                                                              'api_calls_used', 'source_file')}
+        return (
+            int(result.get('round_number', round_number)),
+            int(result['task_id']),
+            str(result.get('participant_id') or 'Unknown'),
+            *(float(result[column]) if result.get(column) is not None else None for column in SCORE_COLUMNS),
+            int(result.get('api_calls_used', 0)),
+            result.get('source_file'),
+            evaluated_at,
+            json.dumps(details, ensure_ascii=False, default=_json_default)
+        )
+
+    def upsert_results(self, results: Iterable[Dict], round_number: int = None) -> int:
+        """
+        Inserisce o aggiorna (rivalutazione) risultati in blocco, in un'unica transazione
+
+        Args:
+            results: Risultati di evaluate_mission / evaluate_mission_file
+            round_number: Round da usare se il risultato non contiene 'round_number'
+
+        Returns:
+            Numero di risultati scritti
+        """
+        evaluated_at = datetime.now().isoformat()
+        written = 0
+        batch = []
+        with self.connection:
+            for result in results:
+                batch.append(self._row(result, round_number, evaluated_at))
+                if len(batch) >= UPSERT_BATCH_SIZE:
+                    self.connection.executemany(UPSERT_SQL, batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                self.connection.executemany(UPSERT_SQL, batch)
+                written += len(batch)
+        return written
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[Dict]:
+        rows = self.connection.execute(sql, params).fetchall()
+        return [self._to_result(row) for row in rows]
+
+    @staticmethod
+    def _to_result(row: sqlite3.Row) -> Dict:
+        result = dict(row)
+        details = result.pop('details', None)
+        if details:
+            result.update(json.loads(details))
+        result['round_number'] = result.pop('round')
+        result.pop('id', None)
+        return result
+
+    def top_for_task(self, round_number: int, task_id: int, limit: int = 20) -> List[Dict]:
+        """Migliori risultati di un task (usa l'indice round, task_id, total_score)"""
+        return self._fetch("SELECT * FROM results WHERE round = ? AND task_id = ? "
+                           "ORDER BY total_score DESC, participant_id LIMIT ?", (round_number, task_id, limit))
+
+    def by_participant(self, participant_id: str, round_number: int = None) -> List[Dict]:
+        """Tutti i risultati di un partecipante, opzionalmente di un solo round"""
+        if round_number is None:
+            return self._fetch("SELECT * FROM results WHERE participant_id = ? ORDER BY round, task_id",
+                               (participant_id,))
+        return self._fetch("SELECT * FROM results WHERE participant_id = ? AND round = ? ORDER BY task_id",
+                           (participant_id, round_number))
+
+    def results(self, round_number: int = None) -> List[Dict]:
+        """Tutti i risultati (formato accettato da HackathonEvaluator.generate_leaderboard)"""
+        if round_number is None:
+            return self._fetch("SELECT * FROM results ORDER BY round, task_id, participant_id")
+        return self._fetch("SELECT * FROM results WHERE round = ? ORDER BY task_id, participant_id",
+                           (round_number,))
+
+    def leaderboard(self, round_number: int = None, limit: int = None) -> List[Dict]:
+        """
+        Classifica aggregata in SQL
+
+        Returns:
+            Lista di dict con rank, participant_id, total_score, missions_completed,
+            average_score e punteggio per round
+        """
+        where, params = ('WHERE round = ?', [round_number]) if round_number is not None else ('', [])
+        rounds = [row[0] for row in self.connection.execute(
+            f"SELECT DISTINCT round FROM results {where} ORDER BY round", params)]
+        per_round = ', '.join(f'SUM(CASE WHEN round = {int(r)} THEN total_score ELSE 0 END) AS round_{int(r)}'
+                              for r in rounds)
+        sql = (f"SELECT participant_id, SUM(total_score) AS total_score, COUNT(*) AS missions_completed, "
+               f"AVG(total_score) AS average_score{', ' + per_round if per_round else ''} "
+               f"FROM results {where} GROUP BY participant_id ORDER BY total_score DESC, participant_id")
+        if limit:
+            sql += ' LIMIT ?'
+            params = params + [limit]
+        rows = [dict(row) for row in self.connection.execute(sql, params)]
+        for rank, row in enumerate(rows, 1):
+            row['rank'] = rank
+        return rows
+
+    def count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+
+def read_aggregated_results(aggregated: Dict) -> Tuple[List[Dict], bool]:
+    """
+    Risultati di un JSON di save_aggregated_results
+
+    I file nel formato precedente indicizzano detailed_results per sola missione: per ogni
+    missione contengono un solo partecipante (l'ultimo valutato) e vengono segnalati.
+
+    Args:
+        aggregated: Contenuto del JSON aggregato
+
+    Returns:
+        Tupla (risultati con round_number, True se il file ha perso i partecipanti per missione)
+    """
+    detailed = aggregated.get('detailed_results', {})
+    collapsed = any('/' not in str(key) for key in detailed)
+    results = [dict(result, round_number=result.get('round_number', aggregated.get('round_number')))
+               for result in detailed.values()]
+    return results, collapsed
+
+
+def _print_results(results: List[Dict]):
+    for result in results:
+        print(f"   • R{result['round_number']} task {result['task_id']:<3} {result['participant_id']:<20} "
+              f"{result['total_score']:>7.1f}/{result['max_score']:.0f} ({result['percentage']:.1f}%)")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Archivio SQLite dei risultati di valutazione')
+    parser.add_argument('--db', default=DEFAULT_DB_FILE, help=f'File del database (default: {DEFAULT_DB_FILE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    evaluate = commands.add_parser('evaluate', help='Valuta una cartella di submission JSON e salva i risultati')
+    evaluate.add_argument('--round', type=int, default=1, help='Numero del round')
+    evaluate.add_argument('--directory', default='.', help='Cartella delle submission')
+    evaluate.add_argument('--pattern', help='Pattern personalizzato per i file')
+
+    import_json = commands.add_parser('import', help='Importa un JSON di save_aggregated_results')
+    import_json.add_argument('file', help='File hackathon_results_from_json_roundN.json')
+    import_json.add_argument('--allow-collapsed', action='store_true',
+                             help='Importa anche file nel vecchio formato (un partecipante per missione)')
+
+    top = commands.add_parser('top', help='Migliori risultati di un task')
+    top.add_argument('--round', type=int, required=True)
+    top.add_argument('--task', type=int, required=True)
+    top.add_argument('--limit', type=int, default=20)
+
+    participant = commands.add_parser('participant', help='Tutti i risultati di un partecipante')
+    participant.add_argument('participant_id')
+    participant.add_argument('--round', type=int)
+
+    leaderboard = commands.add_parser('leaderboard', help='Classifica aggregata')
+    leaderboard.add_argument('--round', type=int)
+    leaderboard.add_argument('--limit', type=int)
+
+    args = parser.parse_args()
+
+    with ResultsStore(args.db) as store:
+        if args.command == 'evaluate':
+            from evaluate_json_missions import JSONMissionEvaluator
+
+            evaluator = JSONMissionEvaluator(args.round)
+            for json_file in evaluator.find_mission_files(args.directory, args.pattern):
+                evaluator.evaluate_mission_file(json_file, display_results=False)
+            written = store.upsert_results(evaluator.results_table, args.round)
+            print(f"💾 {written} risultati salvati in {args.db} (totale: {store.count()})")
+
+        elif args.command == 'import':
+            with open(args.file, 'r', encoding='utf-8') as f:
+                aggregated = json.load(f)
+            results, collapsed = read_aggregated_results(aggregated)
+            if collapsed and not args.allow_collapsed:
+                print(f"❌ {args.file} è nel vecchio formato (un solo partecipante per missione): "
+                      "rigenerarlo con evaluate_json_missions.py o usare --allow-collapsed")
+                return
+            written = store.upsert_results(results, aggregated.get('round_number'))
+            print(f"💾 {written} risultati importati in {args.db} (totale: {store.count()})")
+            if collapsed:
+                print("⚠️ File nel vecchio formato: per ogni missione è presente solo l'ultimo partecipante valutato")
+
+        elif args.command == 'top':
+            print(f"🏆 Top {args.limit} - round {args.round}, task {args.task}:")
+            _print_results(store.top_for_task(args.round, args.task, args.limit))
+
+        elif args.command == 'participant':
+            print(f"👤 Risultati di {args.participant_id}:")
+            _print_results(store.by_participant(args.participant_id, args.round))
+
+        elif args.command == 'leaderboard':
+            print("🏆 CLASSIFICA:")
+            for row in store.leaderboard(args.round, args.limit):
+                print(f"   {row['rank']:>4}. {row['participant_id']:<20} {row['total_score']:>9.1f} "
+                      f"({row['missions_completed']} missioni, media {row['average_score']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+🧭 Route Index - Indice di navigazione con prezzi multi-tratta
+Indice per un GalaxyNavigator: analizza una sola volta i travel_costs, precalcola i
+cammini minimi tra tutte le coppie di pianeti e tiene per ogni pianeta le navi
+disponibili ordinate per costo. "Il modo più economico per portare il droide X sul
+pianeta Y" paga il noleggio a ogni tratta (come book_travel) ed è memorizzato per
+pianeta di partenza e costo di noleggio.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from route_optimizer import INF, floyd_warshall, parse_travel_costs
+
+# Ordine delle velocità delle navi (valore più alto = più veloce)
+SPEED_RANK = {
+    'slow': 0,
+    'medium': 1,
+    'fast': 2,
+    'very_fast': 3,
+    'ultra_fast': 4
+}
+
+
+def dijkstra_all_pairs(matrix: List[List[float]]) -> Tuple[List[List[float]], List[List[Optional[int]]]]:
+    """Dijkstra da ogni sorgente, più efficiente di Floyd-Warshall su grafi sparsi"""
+    n = len(matrix)
+    adjacency = [[(j, cost) for j, cost in enumerate(row) if cost < INF and j != i] for i, row in enumerate(matrix)]
+
+    dist = []
+    next_hop = []
+    for source in range(n):
+        source_dist = [INF] * n
+        first_hop: List[Optional[int]] = [None] * n
+        source_dist[source] = 0
+        first_hop[source] = source
+        queue = [(0, source)]
+        while queue:
+            d, node = heapq.heappop(queue)
+            if d > source_dist[node]:
+                continue
+            for neighbour, cost in adjacency[node]:
+                candidate = d + cost
+                if candidate < source_dist[neighbour]:
+                    source_dist[neighbour] = candidate
+                    first_hop[neighbour] = neighbour if node == source else first_hop[node]
+                    heapq.heappush(queue, (candidate, neighbour))
+        dist.append(source_dist)
+        next_hop.append(first_hop)
+
+    return dist, next_hop
+
+
+class RouteIndex:
+    """
+    Indice delle rotte e delle flotte di uno stato galattico.
+
+    Le distanze sono precalcolate alla creazione; le posizioni di navi e droidi
+    vengono aggiornate in modo incrementale con move_ship() / move_droid().
+    """
+
+    def __init__(self, galaxy_state: Dict):
+        self.planets, matrix = parse_travel_costs(galaxy_state.get('travel_costs', {}))
+        self._index = {planet: i for i, planet in enumerate(self.planets)}
+
+        # Collegamenti diretti in uscita per pianeta, ordinati per costo
+        self.neighbours: Dict[str, List[Tuple[str, float]]] = {
+            origin: sorted(((self.planets[j], cost) for j, cost in enumerate(matrix[i]) if i != j and cost < INF),
+                           key=lambda edge: (edge[1], edge[0]))
+            for i, origin in enumerate(self.planets)
+        }
+
+        edges = sum(1 for row in matrix for cost in row if 0 < cost < INF)
+        n = len(self.planets)
+        if n and edges < n * n // 4:
+            dist, next_hop = dijkstra_all_pairs(matrix)
+        else:
+            dist, next_hop = floyd_warshall(matrix)
+
+        # Distanze e prossimo salto per nome di pianeta: lookup O(1)
+        self.distance = {
+            origin: {destination: dist[i][j] for j, destination in enumerate(self.planets)}
+            for i, origin in enumerate(self.planets)
+        }
+        self._next_hop = next_hop
+
+        self.ships: Dict[str, Dict] = {}
+        self._ships_at: Dict[str, List[Tuple]] = {}
+        for name, info in galaxy_state.get('ships', {}).items():
+            self.ships[name] = dict(info)
+            if info.get('available', True):
+                self._add_ship(name)
+
+        self.droid_locations = {name: info.get('location')
+                                for name, info in galaxy_state.get('droids', {}).items()}
+
+        # Cammini minimi con il noleggio su ogni tratta: (origine, noleggio) -> (costi, predecessori)
+        self._transfer_trees: Dict[Tuple[str, float], Tuple[Dict[str, float], Dict[str, str]]] = {}
+
+    # ------------------------------------------------------------------
+    # Navi per pianeta
+    # ------------------------------------------------------------------
+
+    def _ship_entry(self, name: str) -> Tuple:
+        info = self.ships[name]
+        # Ordinamento: costo di noleggio crescente, poi velocità decrescente
+        return (info.get('rental_cost', 0), -SPEED_RANK.get(info.get('speed'), 0), name)
+
+    def _add_ship(self, name: str):
+        insort(self._ships_at.setdefault(self.ships[name].get('location'), []), self._ship_entry(name))
+
+    def _remove_ship(self, name: str):
+        bucket = self._ships_at.get(self.ships[name].get('location'), [])
+        entry = self._ship_entry(name)
+        position = bisect_left(bucket, entry)
+        if position < len(bucket) and bucket[position] == entry:
+            del bucket[position]
+
+    def move_ship(self, name: str, new_location: str):
+        """Aggiorna la posizione di una nave"""
+        available = self.ships[name].get('available', True)
+        if available:
+            self._remove_ship(name)
+        self.ships[name]['location'] = new_location
+        if available:
+            self._add_ship(name)
+
+    def set_ship_available(self, name: str, available: bool):
+        """Aggiorna la disponibilità di una nave"""
+        if self.ships[name].get('available', True) == available:
+            return
+        if available:
+            self.ships[name]['available'] = True
+            self._add_ship(name)
+        else:
+            self._remove_ship(name)
+            self.ships[name]['available'] = False
+
+    def move_droid(self, name: str, new_location: str):
+        """Aggiorna la posizione di un droide"""
+        self.droid_locations[name] = new_location
+
+    def ships_at(self, planet: str) -> List[str]:
+        """Navi disponibili su un pianeta, dalla più economica"""
+        return [entry[2] for entry in self._ships_at.get(planet, [])]
+
+    def cheapest_ship_at(self, planet: str) -> Optional[str]:
+        """Nave disponibile più economica su un pianeta"""
+        bucket = self._ships_at.get(planet)
+        return bucket[0][2] if bucket else None
+
+    # ------------------------------------------------------------------
+    # Query sulle rotte
+    # ------------------------------------------------------------------
+
+    def travel_cost(self, origin: str, destination: str) -> Optional[float]:
+        """Costo minimo (anche multi-tratta, noleggi esclusi) tra due pianeti, None se non raggiungibili"""
+        cost = self.distance.get(origin, {}).get(destination, INF)
+        return None if cost == INF else cost
+
+    def path(self, origin: str, destination: str) -> List[str]:
+        """Percorso più economico tra due pianeti, scali inclusi (vuoto se non esiste)"""
+        if origin not in self._index or destination not in self._index:
+            return []
+        current, target = self._index[origin], self._index[destination]
+        path = [current]
+        while current != target:
+            current = self._next_hop[current][target]
+            if current is None:
+                return []
+            path.append(current)
+        return [self.planets[i] for i in path]
+
+    def _transfer_tree(self, origin: str, rental_cost: float) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """Dijkstra da un pianeta con peso di tratta = costo della rotta + noleggio"""
+        key = (origin, rental_cost)
+        if key not in self._transfer_trees:
+            cost = {origin: 0}
+            previous = {}
+            queue = [(0, origin)]
+            while queue:
+                d, planet = heapq.heappop(queue)
+                if d > cost[planet]:
+                    continue
+                for neighbour, edge_cost in self.neighbours.get(planet, []):
+                    candidate = d + edge_cost + rental_cost
+                    if candidate < cost.get(neighbour, INF):
+                        cost[neighbour] = candidate
+                        previous[neighbour] = planet
+                        heapq.heappush(queue, (candidate, neighbour))
+            self._transfer_trees[key] = (cost, previous)
+        return self._transfer_trees[key]
+
+    def cheapest_transfer(self, droid: str, destination: str) -> Optional[Dict]:
+        """
+        Modo più economico per portare un droide su un pianeta
+
+        La nave deve trovarsi sul pianeta del droide e viaggia con lui tratta per tratta:
+        book_travel accetta solo rotte dirette e addebita il noleggio a ogni tratta, quindi
+        costo = somma delle rotte + noleggio × tratte. Con più navi disponibili conviene
+        sempre quella con il noleggio più basso.
+
+        Returns:
+            Dict con nave, percorso, costi e origine, oppure None se il trasferimento non è possibile
+        """
+        origin = self.droid_locations.get(droid)
+        if origin is None:
+            return None
+        if origin == destination:
+            return {'droid': droid, 'origin': origin, 'destination': destination, 'ship': None,
+                    'path': [origin], 'rental_cost': 0, 'travel_cost': 0, 'cost': 0}
+
+        ship = self.cheapest_ship_at(origin)
+        if ship is None:
+            return None
+        rental = self.ships[ship].get('rental_cost', 0)
+        cost, previous = self._transfer_tree(origin, rental)
+        if destination not in cost:
+            return None
+
+        path = [destination]
+        while path[-1] != origin:
+            path.append(previous[path[-1]])
+        path.reverse()
+        legs = len(path) - 1
+        return {
+            'droid': droid,
+            'origin': origin,
+            'destination': destination,
+            'ship': ship,
+            'speed': self.ships[ship].get('speed'),
+            'path': path,
+            'rental_cost': rental * legs,
+            'travel_cost': cost[destination] - rental * legs,
+            'cost': cost[destination]
+        }
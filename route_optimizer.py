@@ -0,0 +1,278 @@
+"""
+🗺️ Route Optimizer - Rotta ottima per visitare tutti i pianeti
+Oracolo di scoring per le missioni di logistica: calcola la rotta più economica
+sul grafo dei travel_costs (Held-Karp esatto, euristica limitata per galassie grandi).
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+INF = float('inf')
+
+# Oltre questo numero di pianeti il DP esatto (O(2^n * n^2)) diventa troppo lento
+EXACT_PLANET_LIMIT = 12
+
+
+def parse_travel_costs(travel_costs: Dict[str, float]) -> Tuple[List[str], List[List[float]]]:
+    """
+    Converte le chiavi "Origine-Destinazione" dei travel_costs in una matrice dei costi
+
+    Args:
+        travel_costs: Dict {"A-B": costo} dello stato galattico
+
+    Returns:
+        Tupla (pianeti ordinati, matrice dei costi diretti con INF dove manca la rotta)
+    """
+    edges = []
+    planets = set()
+    for route, cost in travel_costs.items():
+        origin, separator, destination = route.partition('-')
+        if not separator:
+            continue
+        edges.append((origin, destination, cost))
+        planets.update((origin, destination))
+
+    planets = sorted(planets)
+    index = {planet: i for i, planet in enumerate(planets)}
+    matrix = [[0 if i == j else INF for j in range(len(planets))] for i in range(len(planets))]
+    for origin, destination, cost in edges:
+        i, j = index[origin], index[destination]
+        matrix[i][j] = min(matrix[i][j], cost)
+
+    return planets, matrix
+
+
+def floyd_warshall(matrix: List[List[float]]) -> Tuple[List[List[float]], List[List[Optional[int]]]]:
+    """Floyd-Warshall: distanze minime e prossimo salto per ricostruire i percorsi"""
+    n = len(matrix)
+    dist = [row[:] for row in matrix]
+    next_hop = [[j if matrix[i][j] < INF else None for j in range(n)] for i in range(n)]
+
+    for k in range(n):
+        dist_k = dist[k]
+        for i in range(n):
+            dist_ik = dist[i][k]
+            if dist_ik == INF:
+                continue
+            dist_i = dist[i]
+            next_i = next_hop[i]
+            for j in range(n):
+                candidate = dist_ik + dist_k[j]
+                if candidate < dist_i[j]:
+                    dist_i[j] = candidate
+                    next_i[j] = next_i[k]
+
+    return dist, next_hop
+
+
+def held_karp(dist: List[List[float]], start: Optional[int] = None,
+              return_to_start: bool = False) -> Tuple[float, List[int]]:
+    """
+    DP su bitmask per il cammino minimo che visita tutti i nodi
+
+    Args:
+        dist: Matrice delle distanze (già chiusa sui cammini minimi)
+        start: Nodo di partenza (None = partenza libera)
+        return_to_start: Se il giro deve tornare al punto di partenza
+
+    Returns:
+        Tupla (costo, ordine di visita dei nodi)
+    """
+    n = len(dist)
+    if n == 0:
+        return 0, []
+
+    full = (1 << n) - 1
+    # cost[mask][j]: costo minimo per visitare i nodi in mask terminando in j
+    cost = [[INF] * n for _ in range(1 << n)]
+    parent = [[-1] * n for _ in range(1 << n)]
+
+    starts = range(n) if start is None else [start]
+    for s in starts:
+        cost[1 << s][s] = 0
+
+    for mask in range(1, full + 1):
+        cost_mask = cost[mask]
+        for last in range(n):
+            base = cost_mask[last]
+            if base == INF:
+                continue
+            dist_last = dist[last]
+            for nxt in range(n):
+                if mask & (1 << nxt):
+                    continue
+                candidate = base + dist_last[nxt]
+                new_mask = mask | (1 << nxt)
+                if candidate < cost[new_mask][nxt]:
+                    cost[new_mask][nxt] = candidate
+                    parent[new_mask][nxt] = last
+
+    def closing_cost(last: int) -> float:
+        return dist[last][start] if return_to_start and start is not None else 0
+
+    best_last = min(range(n), key=lambda j: cost[full][j] + closing_cost(j))
+    best_cost = cost[full][best_last] + closing_cost(best_last)
+    if best_cost == INF:
+        return INF, []
+
+    order = []
+    mask, last = full, best_last
+    while last != -1:
+        order.append(last)
+        mask, last = mask ^ (1 << last), parent[mask][last]
+    order.reverse()
+    if return_to_start and start is not None:
+        order.append(start)
+
+    return best_cost, order
+
+
+def heuristic_route(dist: List[List[float]], start: Optional[int] = None,
+                    return_to_start: bool = False, max_iterations: int = 50) -> Tuple[float, List[int]]:
+    """
+    Euristica limitata per galassie grandi: nearest neighbour + 2-opt
+
+    Args:
+        max_iterations: Numero massimo di passate 2-opt sull'intera rotta
+    """
+    n = len(dist)
+    if n == 0:
+        return 0, []
+
+    first = 0 if start is None else start
+    order = [first]
+    unvisited = set(range(n)) - {first}
+    while unvisited:
+        last = order[-1]
+        nxt = min(unvisited, key=lambda j: dist[last][j])
+        order.append(nxt)
+        unvisited.remove(nxt)
+    if return_to_start:
+        order.append(first)
+
+    # 2-opt: gli estremi restano fissi (partenza e, se richiesto, ritorno)
+    end = len(order) - 1 if return_to_start else len(order)
+    for _ in range(max_iterations):
+        improved = False
+        for i in range(1, end - 1):
+            for j in range(i + 1, end):
+                a, b = order[i - 1], order[i]
+                c = order[j]
+                d = order[j + 1] if j + 1 < len(order) else None
+                delta = dist[a][c] - dist[a][b]
+                if d is not None:
+                    delta += dist[b][d] - dist[c][d]
+                if delta < -1e-9:
+                    order[i:j + 1] = reversed(order[i:j + 1])
+                    improved = True
+        if not improved:
+            break
+
+    return _order_cost(dist, order), order
+
+
+def _order_cost(dist: List[List[float]], order: List[int]) -> float:
+    return sum(dist[a][b] for a, b in zip(order, order[1:]))
+
+
+def _expand_path(order: List[int], next_hop: List[List[Optional[int]]]) -> List[int]:
+    """Espande l'ordine di visita nel percorso completo con gli scali intermedi"""
+    if not order:
+        return []
+    path = [order[0]]
+    for target in order[1:]:
+        current = path[-1]
+        while current != target:
+            current = next_hop[current][target]
+            if current is None:
+                return []
+            path.append(current)
+    return path
+
+
+def solve_visit_all(travel_costs: Dict[str, float], start: Optional[str] = None,
+                    return_to_start: bool = False,
+                    exact_limit: int = EXACT_PLANET_LIMIT) -> Optional[Dict]:
+    """
+    Calcola la rotta più economica che tocca tutti i pianeti
+
+    Args:
+        travel_costs: Dict {"A-B": costo} dello stato galattico
+        start: Pianeta di partenza (None = partenza libera)
+        return_to_start: Se la rotta deve tornare al pianeta di partenza
+        exact_limit: Numero massimo di pianeti per il calcolo esatto
+
+    Returns:
+        Dict con 'route' (pianeti in ordine, scali inclusi), 'cost' ed 'exact',
+        oppure None se non esiste una rotta che tocchi tutti i pianeti
+    """
+    planets, matrix = parse_travel_costs(travel_costs)
+    index = {planet: i for i, planet in enumerate(planets)}
+    if start is not None and start not in index:
+        return None
+
+    dist, next_hop = floyd_warshall(matrix)
+    start_index = None if start is None else index[start]
+
+    exact = len(planets) <= exact_limit
+    if exact:
+        cost, order = held_karp(dist, start_index, return_to_start)
+    else:
+        cost, order = heuristic_route(dist, start_index, return_to_start)
+
+    if cost == INF:
+        return None
+
+    return {
+        'route': [planets[i] for i in _expand_path(order, next_hop)],
+        'cost': cost,
+        'exact': exact
+    }
+
+
+def route_cost(route: List[str], travel_costs: Dict[str, float]) -> Optional[float]:
+    """Costo di una rotta sui collegamenti diretti (None se un tratto non esiste)"""
+    total = 0
+    for origin, destination in zip(route, route[1:]):
+        if origin == destination:
+            continue
+        leg_cost = travel_costs.get(f'{origin}-{destination}')
+        if leg_cost is None:
+            return None
+        total += leg_cost
+    return total
+
+
+def route_optimality(route: List[str], travel_costs: Dict[str, float],
+                     return_to_start: bool = False) -> Optional[Dict]:
+    """
+    Confronta una rotta con l'ottimo
+
+    Returns:
+        Dict con costo della rotta, costo ottimo, rapporto ottimo/speso e copertura,
+        oppure None se la rotta è vuota o contiene tratti inesistenti
+    """
+    if not route:
+        return None
+    spent = route_cost(route, travel_costs)
+    if spent is None:
+        return None
+
+    optimum = solve_visit_all(travel_costs, start=route[0], return_to_start=return_to_start)
+    planets, _ = parse_travel_costs(travel_costs)
+    visits_all = set(planets) <= set(route)
+
+    if optimum is None:
+        ratio = 0.0
+    elif spent == 0:
+        ratio = 1.0 if optimum['cost'] == 0 else 0.0
+    else:
+        ratio = min(optimum['cost'] / spent, 1.0)
+
+    return {
+        'route': route,
+        'spent': spent,
+        'optimal_cost': optimum['cost'] if optimum else None,
+        'optimal_route': optimum['route'] if optimum else None,
+        'visits_all_planets': visits_all,
+        'optimality_ratio': round(ratio, 4)
+    }
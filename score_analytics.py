@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+📊 Score Analytics - Analisi vettoriali delle distribuzioni di punteggio
+Carica i risultati in array colonnari numpy e calcola in forma vettoriale percentili
+per round/task, istogrammi di correttezza/efficienza/qualità, distribuzione delle
+API calls rispetto alle soglie del valutatore, tassi di missioni risolte (≥60% di
+correttezza) e la classifica secondo il criterio di vittoria del README.
+"""
+
+import json
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from evaluation_system import HackathonEvaluator
+from result_table import ResultTable
+
+SOLVED_CORRECTNESS = 0.60
+DEFAULT_PERCENTILES = (50, 90, 99)
+COMPONENTS = ('correctness', 'efficiency', 'quality')
+EFFICIENCY_LEVELS = ('excellent', 'good', 'acceptable', 'over')
+
+
+def load_columns(results: Iterable[Dict], round_number: int = None) -> Dict[str, np.ndarray]:
+    """
+    Converte i risultati in array colonnari
+
+    Args:
+        results: Risultati di evaluate_mission / ResultsStore.results(), oppure una ResultTable
+                 (colonne lette direttamente, senza viste dict)
+        round_number: Round da usare se il risultato non contiene 'round_number'
+
+    Returns:
+        Dict di array: round, task_id, participant (codici), total_score, max_score,
+        percentage, correctness/efficiency/quality e i loro massimi, api_calls;
+        'participants' contiene i nomi corrispondenti ai codici
+    """
+    evaluators = {}
+
+    def component_max(result: Dict, component: str) -> float:
+        max_scores = result.get('max_scores')
+        if max_scores:
+            return max_scores[f'{component}_max']
+        # Risultati senza max_scores (es. import esterni): pesi del round
+        round_value = int(result.get('round_number', round_number or 1))
+        if round_value not in evaluators:
+            evaluators[round_value] = HackathonEvaluator(round_value)
+        return evaluators[round_value].get_max_scores_for_round(result['max_score'])[f'{component}_max']
+
+    if isinstance(results, ResultTable):
+        columns = results.to_columns()
+        for component in COMPONENTS:
+            maxima = columns[f'{component}_max']
+            for index in np.flatnonzero(np.isnan(maxima)):
+                maxima[index] = component_max({'round_number': int(columns['round'][index]),
+                                               'max_score': float(columns['max_score'][index])}, component)
+        return columns
+
+    results = list(results)
+    participants, codes = np.unique([str(r.get('participant_id') or 'Unknown') for r in results] or [''],
+                                    return_inverse=True)
+    columns = {
+        'round': np.fromiter((int(r.get('round_number', round_number or 1)) for r in results), np.int32, len(results)),
+        'task_id': np.fromiter((int(r['task_id']) for r in results), np.int32, len(results)),
+        'participant': codes[:len(results)].astype(np.int32),
+        'api_calls': np.fromiter((int(r.get('api_calls_used', 0)) for r in results), np.int32, len(results)),
+    }
+    for name in ('total_score', 'max_score', 'percentage') + COMPONENTS:
+        columns[name] = np.fromiter((float(r[name]) for r in results), np.float64, len(results))
+    for component in COMPONENTS:
+        columns[f'{component}_max'] = np.fromiter((float(component_max(r, component)) for r in results),
+                                                  np.float64, len(results))
+    columns['participants'] = participants if results else np.array([], dtype=str)
+    return columns
+
+
+def _groups(columns: Dict[str, np.ndarray]):
+    """Identificativo di gruppo (round, task) per riga e chiavi ordinate dei gruppi"""
+    keys = columns['round'].astype(np.int64) << 32 | columns['task_id'].astype(np.int64)
+    unique_keys, group_ids = np.unique(keys, return_inverse=True)
+    return unique_keys, group_ids
+
+
+def _key_label(key: int) -> str:
+    return f"R{int(key) >> 32}-T{int(key) & 0xFFFFFFFF}"
+
+
+def group_percentiles(columns: Dict[str, np.ndarray], value: str = 'total_score',
+                      percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict]:
+    """
+    Percentili (interpolazione lineare) di una colonna per ogni (round, task), senza loop sulle righe
+
+    Returns:
+        Dict 'R<round>-T<task>' -> {count, mean, p50, ...}
+    """
+    if not len(columns['round']):
+        return {}
+    unique_keys, group_ids = _groups(columns)
+    values = columns[value]
+    order = np.lexsort((values, group_ids))
+    sorted_values = values[order]
+    counts = np.bincount(group_ids, minlength=len(unique_keys))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sums = np.bincount(group_ids, weights=values, minlength=len(unique_keys))
+
+    stats = {'count': counts, 'mean': sums / counts}
+    for q in percentiles:
+        position = starts + (counts - 1) * (q / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, starts + counts - 1)
+        fraction = position - lower
+        stats[f'p{q:g}'] = sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+
+    return {
+        _key_label(key): {name: (int(array[i]) if name == 'count' else round(float(array[i]), 3))
+                          for name, array in stats.items()}
+        for i, key in enumerate(unique_keys)
+    }
+
+
+def component_histograms(columns: Dict[str, np.ndarray], bins: int = 10) -> Dict[str, Dict]:
+    """Istogrammi di correttezza, efficienza e qualità in percentuale del rispettivo massimo"""
+    edges = np.linspace(0, 100, bins + 1)
+    histograms = {}
+    for component in COMPONENTS:
+        maximum = columns[f'{component}_max']
+        ratio = np.divide(columns[component], maximum, out=np.zeros_like(maximum), where=maximum > 0) * 100
+        counts, _ = np.histogram(np.clip(ratio, 0, 100), bins=edges)
+        histograms[component] = {
+            'mean_pct': round(float(ratio.mean()), 2) if len(ratio) else 0.0,
+            'bins': {f'{edges[i]:.0f}-{edges[i + 1]:.0f}%': int(count) for i, count in enumerate(counts)}
+        }
+    return histograms
+
+
+def api_call_distribution(columns: Dict[str, np.ndarray]) -> Dict[str, Dict]:
+    """
+    Distribuzione delle API calls rispetto alle soglie di efficienza applicate dal valutatore
+    (soglie dell'oracolo se disponibili, altrimenti max_api_calls del round)
+
+    Returns:
+        Dict 'R<round>-T<task>' -> soglie, media/massimo delle chiamate e conteggi per livello
+    """
+    if not len(columns['round']):
+        return {}
+    unique_keys, group_ids = _groups(columns)
+    evaluators = {}
+    thresholds = np.zeros((len(unique_keys), 3), dtype=np.int64)
+    for i, key in enumerate(unique_keys):
+        round_value, task_id = int(key) >> 32, int(key) & 0xFFFFFFFF
+        if round_value not in evaluators:
+            evaluators[round_value] = HackathonEvaluator(round_value)
+        limits = evaluators[round_value].get_efficiency_thresholds(task_id)
+        thresholds[i] = [limits['excellent'], limits['good'], limits['acceptable']]
+
+    calls = columns['api_calls']
+    # Livello di ogni riga: numero di soglie superate (0 = excellent ... 3 = oltre acceptable)
+    levels = (calls[:, None] > thresholds[group_ids]).sum(axis=1)
+    level_counts = np.zeros((len(unique_keys), len(EFFICIENCY_LEVELS)), dtype=np.int64)
+    np.add.at(level_counts, (group_ids, levels), 1)
+    counts = np.bincount(group_ids, minlength=len(unique_keys))
+    call_sums = np.bincount(group_ids, weights=calls, minlength=len(unique_keys))
+    call_max = np.zeros(len(unique_keys), dtype=np.int64)
+    np.maximum.at(call_max, group_ids, calls)
+
+    return {
+        _key_label(key): {
+            'thresholds': dict(zip(EFFICIENCY_LEVELS[:3], thresholds[i].tolist())),
+            'mean_calls': round(float(call_sums[i] / counts[i]), 2),
+            'max_calls': int(call_max[i]),
+            'levels': dict(zip(EFFICIENCY_LEVELS, level_counts[i].tolist()))
+        }
+        for i, key in enumerate(unique_keys)
+    }
+
+
+def solved_mask(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Missioni risolte: correttezza ≥ 60% del massimo di correttezza"""
+    maximum = columns['correctness_max']
+    return (maximum > 0) & (columns['correctness'] >= SOLVED_CORRECTNESS * maximum - 1e-9)
+
+
+def solved_rates(columns: Dict[str, np.ndarray]) -> Dict[str, Dict]:
+    """Tasso di missioni risolte per (round, task)"""
+    if not len(columns['round']):
+        return {}
+    unique_keys, group_ids = _groups(columns)
+    solved = solved_mask(columns)
+    counts = np.bincount(group_ids, minlength=len(unique_keys))
+    solved_counts = np.bincount(group_ids, weights=solved, minlength=len(unique_keys))
+    return {
+        _key_label(key): {'submissions': int(counts[i]), 'solved': int(solved_counts[i]),
+                          'solved_rate': round(float(solved_counts[i] / counts[i]), 4)}
+        for i, key in enumerate(unique_keys)
+    }
+
+
+def winner_ranking(columns: Dict[str, np.ndarray], limit: int = 20) -> List[Dict]:
+    """
+    Classifica secondo il criterio di vittoria: missioni risolte, poi percentuali per
+    missione nell'ordine round/task (vince la percentuale più alta alla prima differenza)
+
+    Con più submission dello stesso partecipante per una missione conta la migliore.
+    """
+    if not len(columns['round']):
+        return []
+    unique_keys, group_ids = _groups(columns)
+    participants = columns['participants']
+    codes = columns['participant']
+
+    # Matrice partecipanti × missioni: migliore percentuale e missione risolta
+    percentages = np.full((len(participants), len(unique_keys)), -1.0)
+    np.maximum.at(percentages, (codes, group_ids), columns['percentage'])
+    solved = np.zeros((len(participants), len(unique_keys)), dtype=bool)
+    np.logical_or.at(solved, (codes, group_ids), solved_mask(columns))
+    solved_count = solved.sum(axis=1)
+
+    # lexsort ordina per l'ultima chiave: missioni risolte, poi missione 1, 2, ...
+    keys = [-percentages[:, j] for j in range(len(unique_keys) - 1, -1, -1)] + [-solved_count]
+    order = np.lexsort(keys)[:limit]
+    return [{
+        'rank': rank,
+        'participant_id': str(participants[p]),
+        'solved_missions': int(solved_count[p]),
+        'percentages': {_key_label(key): round(float(percentages[p, j]), 1)
+                        for j, key in enumerate(unique_keys) if percentages[p, j] >= 0}
+    } for rank, p in enumerate(order, 1)]
+
+
+def calculate_advanced_metrics(results: Iterable[Dict], round_number: int = None,
+                               percentiles: Sequence[float] = DEFAULT_PERCENTILES, top: int = 20) -> Dict:
+    """
+    Report completo sulle distribuzioni di punteggio
+
+    Args:
+        results: Risultati di valutazione (lista di dict) o colonne già caricate con load_columns
+        round_number: Round da usare se i risultati non contengono 'round_number'
+        percentiles: Percentili da calcolare
+        top: Partecipanti nella classifica
+
+    Returns:
+        Dict con percentili, istogrammi, distribuzione delle API calls, tassi di risoluzione e classifica
+    """
+    columns = results if isinstance(results, dict) else load_columns(results, round_number)
+    solved = solved_mask(columns)
+    return {
+        'results': int(len(columns['round'])),
+        'participants': int(len(np.unique(columns['participant']))),
+        'solved_rate': round(float(solved.mean()), 4) if len(solved) else 0.0,
+        'score_percentiles': group_percentiles(columns, 'total_score', percentiles),
+        'percentage_percentiles': group_percentiles(columns, 'percentage', percentiles),
+        'component_histograms': component_histograms(columns),
+        'efficiency_distribution': api_call_distribution(columns),
+        'correctness_patterns': solved_rates(columns),
+        'winner_ranking': winner_ranking(columns, top)
+    }
+
+
+def load_results(db_file: str = None, results_json: str = None, round_number: int = None) -> List[Dict]:
+    """Risultati da un archivio SQLite (results_store) o da un JSON di save_aggregated_results"""
+    if db_file:
+        from results_store import ResultsStore
+        with ResultsStore(db_file) as store:
+            return store.results(round_number)
+    from results_store import read_aggregated_results
+
+    with open(results_json, 'r', encoding='utf-8') as f:
+        aggregated = json.load(f)
+    results, collapsed = read_aggregated_results(aggregated)
+    if collapsed:
+        print(f"⚠️ {results_json} è nel vecchio formato (un solo partecipante per missione): "
+              "percentili e classifica non includono gli altri partecipanti")
+    return results
+
+
+def print_report(report: Dict):
+    print(f"\n📊 ANALISI PUNTEGGI ({report['results']} risultati, {report['participants']} partecipanti)")
+    print(f"   ✅ Missioni risolte (≥60% correttezza): {report['solved_rate']:.1%}")
+
+    print("\n🎯 Per missione:")
+    for label, stats in report['score_percentiles'].items():
+        rates = report['correctness_patterns'][label]
+        levels = report['efficiency_distribution'][label]['levels']
+        print(f"   • {label:<8} n={stats['count']:<7} media {stats['mean']:>7.1f}  p50 {stats['p50']:>7.1f}  "
+              f"p90 {stats.get('p90', 0):>7.1f}  risolte {rates['solved_rate']:>6.1%}  "
+              f"API calls oltre soglia {levels['over']}")
+
+    print("\n📈 Componenti (media in % del massimo):")
+    for component, histogram in report['component_histograms'].items():
+        print(f"   • {component:<12} {histogram['mean_pct']:>6.1f}%")
+
+    print("\n🏆 Classifica (missioni risolte, poi percentuali in ordine di missione):")
+    for row in report['winner_ranking'][:10]:
+        print(f"   {row['rank']:>4}. {row['participant_id']:<20} {row['solved_missions']} missioni risolte")
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Analisi vettoriali delle distribuzioni di punteggio')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--db', help='Archivio SQLite creato da results_store.py')
+    source.add_argument('--results-json', help='JSON di save_aggregated_results')
+    parser.add_argument('--round', type=int, help='Limita (db) o assegna (json) il round')
+    parser.add_argument('--top', type=int, default=20, help='Partecipanti nella classifica (default: 20)')
+    parser.add_argument('--output', help='Salva il report JSON in questo file')
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    results = load_results(args.db, args.results_json, args.round)
+    report = calculate_advanced_metrics(results, args.round, top=args.top)
+    print_report(report)
+    print(f"\n⏱️ Report calcolato in {time.perf_counter() - start:.2f}s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Report salvato in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+🛎️ Scoring Service - Servizio HTTP locale di valutazione delle missioni
+Front end asyncio con un pool di worker che tengono "caldi" i valutatori di tutti i
+round (tasks CSV, oracolo, stato galattico indicizzato): pipeline CI e dashboard
+inviano la submission JSON via HTTP invece di avviare evaluate_json_missions.py per
+ogni file. Le richieste concorrenti vengono raggruppate in micro-batch per i worker.
+
+Endpoint:
+    POST /evaluate?round=N[&filename=team42_mission_3.json]   body: submission JSON
+         -> stesso dict di HackathonEvaluator.evaluate_mission
+    GET  /metrics   -> latenze p50/p99 per endpoint e statistiche dei batch
+    GET  /health
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from mock_network import EndpointMetrics
+
+DEFAULT_PORT = 8770
+DEFAULT_ROUNDS = (1, 2, 3)
+DEFAULT_MAX_BATCH = 16
+DEFAULT_BATCH_WINDOW_MS = 2.0
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+            422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+# ----------------------------------------------------------------------
+# Lato worker: un JSONMissionEvaluator per round, creato e scaldato una volta per processo
+# ----------------------------------------------------------------------
+
+_WORKER_EVALUATORS: Dict[int, Any] = {}
+
+
+def _init_worker(rounds: Sequence[int], efficiency_mode: str, latency_weight: float):
+    from evaluate_json_missions import JSONMissionEvaluator
+
+    for round_number in rounds:
+        evaluator = JSONMissionEvaluator(round_number, efficiency_mode=efficiency_mode,
+                                         latency_weight=latency_weight)
+        evaluator.evaluator.get_tasks()
+        evaluator.evaluator.get_task_oracle()
+        evaluator.evaluator.get_initial_state()
+        evaluator._load_current_galaxy_state()
+        _WORKER_EVALUATORS[round_number] = evaluator
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _score_one(round_number: int, data: Any, filename: str) -> Tuple[int, Any]:
+    evaluator = _WORKER_EVALUATORS.get(round_number)
+    if evaluator is None:
+        return 404, {'error': f"Round {round_number} non servito da questo servizio"}
+    if not isinstance(data, dict):
+        return 400, {'error': "La submission deve essere un oggetto JSON"}
+
+    mission = evaluator.parse_mission_data(data, filename)
+    if mission is None:
+        return 422, {'error': "Impossibile determinare task_id (aggiungere 'task_id' o ?filename=...)"}
+    try:
+        return 200, evaluator.evaluator.evaluate_mission(
+            task_id=mission['task_id'],
+            agent_response=mission['agent_response'],
+            intermediate_steps=mission['intermediate_steps'],
+            final_state=mission['final_state']
+        )
+    except KeyError as e:
+        return 404, {'error': str(e.args[0]) if e.args else str(e)}
+
+
+def _score_batch(requests: List[Tuple[int, Any, str]]) -> List[Tuple[int, Any]]:
+    """Valuta un micro-batch nel worker; un errore su una submission non ferma le altre"""
+    results = []
+    for round_number, data, filename in requests:
+        try:
+            results.append(_score_one(round_number, data, filename))
+        except Exception as e:
+            results.append((500, {'error': f"{type(e).__name__}: {e}"}))
+    return results
+
+
+def _json_default(value):
+    # Scalari numpy/pandas presenti nei risultati (es. max_score dal CSV)
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+# ----------------------------------------------------------------------
+# Front end asyncio
+# ----------------------------------------------------------------------
+
+class ScoringService:
+    """
+    Servizio HTTP/1.1 keep-alive di valutazione con micro-batching
+
+    Le richieste /evaluate finiscono in una coda; il batcher attende un worker libero,
+    aspetta al più batch_window_ms per raccogliere le richieste arrivate insieme e
+    invia al worker un batch di al più max_batch submission (ripartendo la coda tra
+    i worker liberi). Ogni worker valuta il batch con i valutatori già caldi.
+
+    Args:
+        rounds: Round da servire (un valutatore caldo per round in ogni worker)
+        host: Indirizzo di ascolto
+        port: Porta (0 = porta libera scelta dal sistema)
+        workers: Numero di worker
+        max_batch: Submission massime per batch
+        batch_window_ms: Attesa massima per completare un batch (0 = solo richieste già in coda)
+        use_processes: Worker come processi (default) o come thread nello stesso processo
+        efficiency_mode: Modalità di efficienza dei valutatori ('calls' o 'blended')
+        latency_weight: Peso della latenza in modalità 'blended'
+    """
+
+    def __init__(self, rounds: Sequence[int] = DEFAULT_ROUNDS, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                 workers: int = None, max_batch: int = DEFAULT_MAX_BATCH,
+                 batch_window_ms: float = DEFAULT_BATCH_WINDOW_MS, use_processes: bool = True,
+                 efficiency_mode: str = 'calls', latency_weight: float = 0.5):
+        self.rounds = tuple(rounds)
+        self.host = host
+        self.port = port
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000
+        self.use_processes = use_processes
+        self._worker_args = (self.rounds, efficiency_mode, latency_weight)
+
+        self.metrics = EndpointMetrics()
+        self.batch_stats = {'batches': 0, 'requests': 0, 'max_batch_size': 0}
+        self._executor: Optional[Executor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._busy_workers = 0
+        self._batcher: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    # ------------------------------------------------------------------
+    # Ciclo di vita
+    # ------------------------------------------------------------------
+
+    async def start(self) -> 'ScoringService':
+        """Avvia e scalda i worker, poi apre il socket"""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        if self.use_processes:
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                                 initargs=self._worker_args)
+        else:
+            # I thread condividono i valutatori del processo (stesso _WORKER_EVALUATORS)
+            _init_worker(*self._worker_args)
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='scoring')
+
+        # Il primo task di ogni processo attende il suo initializer: al ritorno i worker sono caldi
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        self.warmup_seconds = time.perf_counter() - start
+
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.metrics.reset()
+        return self
+
+    async def stop(self):
+        """Chiude il socket, completa i batch in corso e ferma i worker"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self) -> 'ScoringService':
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    # ------------------------------------------------------------------
+    # Micro-batching
+    # ------------------------------------------------------------------
+
+    async def evaluate(self, round_number: int, data: Any, filename: str = '') -> Tuple[int, Any]:
+        """Accoda una submission e attende il risultato del suo batch"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(((round_number, data, filename), future))
+        return await future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            await self._slots.acquire()
+            self._busy_workers += 1
+            if self.batch_window and self._queue.empty():
+                await asyncio.sleep(self.batch_window)
+
+            # Ripartisce la coda tra i worker liberi (questo compreso) invece di caricare tutto sul primo
+            free_workers = self.workers - self._busy_workers + 1
+            size = min(self.max_batch, max(1, math.ceil((self._queue.qsize() + 1) / free_workers)))
+            batch = [first]
+            while len(batch) < size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            task = loop.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Tuple, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            results = await loop.run_in_executor(self._executor, _score_batch, [request for request, _ in batch])
+        except Exception as e:
+            results = [(500, {'error': f"Worker non disponibile: {e}"})] * len(batch)
+        finally:
+            self._busy_workers -= 1
+            self._slots.release()
+
+        self.metrics.record('batch', (time.perf_counter() - start) * 1000)
+        self.batch_stats['batches'] += 1
+        self.batch_stats['requests'] += len(batch)
+        self.batch_stats['max_batch_size'] = max(self.batch_stats['max_batch_size'], len(batch))
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': f"Submission oltre {MAX_BODY_BYTES} byte"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                start = time.perf_counter()
+                status, payload = await self._dispatch(method, target, body)
+                path = urlsplit(target).path
+                self.metrics.record(path if path in ('/evaluate', '/metrics', '/health') else 'other',
+                                    (time.perf_counter() - start) * 1000, status)
+
+                close = headers.get('connection', '').lower() == 'close'
+                await self._respond(writer, status, payload, close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Any, close: bool = False):
+        body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+        head = (f'HTTP/1.1 {status} {_REASONS.get(status, "Error")}\r\n'
+                'Content-Type: application/json; charset=utf-8\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                f'Connection: {"close" if close else "keep-alive"}\r\n\r\n').encode('ascii')
+        writer.write(head + body)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        address = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(address.query).items()}
+
+        if method == 'GET' and address.path == '/health':
+            return 200, {'status': 'ok', 'rounds': list(self.rounds), 'workers': self.workers}
+
+        if method == 'GET' and address.path == '/metrics':
+            return 200, self.metrics_snapshot()
+
+        if method == 'POST' and address.path == '/evaluate':
+            try:
+                round_number = int(query.get('round', self.rounds[0]))
+                data = json.loads(body.decode('utf-8')) if body else None
+            except ValueError as e:
+                return 400, {'error': f"Richiesta non valida: {e}"}
+            if round_number not in self.rounds:
+                return 404, {'error': f"Round {round_number} non servito (round disponibili: {list(self.rounds)})"}
+            return await self.evaluate(round_number, data, query.get('filename', ''))
+
+        return 404, {'error': f"Endpoint sconosciuto: {method} {address.path}"}
+
+    def metrics_snapshot(self) -> Dict:
+        """Latenze per endpoint (p50/p95/p99) e statistiche dei micro-batch"""
+        batches = self.batch_stats['batches']
+        return {
+            **self.metrics.snapshot(),
+            'batches': {
+                **self.batch_stats,
+                'average_batch_size': round(self.batch_stats['requests'] / batches, 2) if batches else 0.0,
+                'queued': self._queue.qsize() if self._queue is not None else 0
+            },
+            'workers': self.workers,
+            'rounds': list(self.rounds)
+        }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servizio HTTP locale di valutazione delle missioni')
+    parser.add_argument('--rounds', type=int, nargs='+', default=list(DEFAULT_ROUNDS),
+                        help='Round da servire (default: 1 2 3)')
+    parser.add_argument('--host', default='127.0.0.1', help='Indirizzo di ascolto (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Porta (default: {DEFAULT_PORT})')
+    parser.add_argument('--workers', type=int, help='Numero di worker (default: CPU, massimo 4)')
+    parser.add_argument('--threads', action='store_true', help='Worker come thread invece che processi')
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH,
+                        help=f'Submission massime per batch (default: {DEFAULT_MAX_BATCH})')
+    parser.add_argument('--batch-window-ms', type=float, default=DEFAULT_BATCH_WINDOW_MS,
+                        help=f'Attesa massima per completare un batch (default: {DEFAULT_BATCH_WINDOW_MS})')
+    parser.add_argument('--efficiency-mode', choices=['calls', 'blended'], default='calls',
+                        help="Efficienza da sole API calls o combinata con i tempi reali degli step")
+    parser.add_argument('--latency-weight', type=float, default=0.5,
+                        help='Peso della latenza in modalità blended (default: 0.5)')
+    parser.add_argument('--metrics-file', help='File JSON in cui salvare le metriche alla chiusura')
+
+    args = parser.parse_args()
+
+    async def serve():
+        service = ScoringService(args.rounds, args.host, args.port, args.workers, args.max_batch,
+                                 args.batch_window_ms, not args.threads, args.efficiency_mode, args.latency_weight)
+        await service.start()
+        print(f"🛎️ Scoring service (round {', '.join(map(str, service.rounds))}) in ascolto su {service.url}")
+        print(f"🔥 {service.workers} worker pronti in {service.warmup_seconds:.2f}s")
+        try:
+            await service.serve_forever()
+        finally:
+            await service.stop()
+            snapshot = service.metrics_snapshot()
+            print("📊 Metriche per endpoint:")
+            for line in service.metrics.summary_lines():
+                print(line)
+            print(f"📦 Batch: {snapshot['batches']['batches']}, "
+                  f"dimensione media {snapshot['batches']['average_batch_size']}")
+            if args.metrics_file:
+                with open(args.metrics_file, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f, indent=2, ensure_ascii=False)
+                print(f"💾 Metriche salvate in: {args.metrics_file}")
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n👋 Servizio arrestato")
+
+
+if __name__ == "__main__":
+    main()
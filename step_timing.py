@@ -0,0 +1,160 @@
+"""
+⏲️ Step Timing - Tempi reali degli intermediate_steps
+Legge timestamp di inizio/fine o durate dei singoli step (dict JSON o coppie LangChain
+serializzate) e calcola tempo totale, critical path degli step concorrenti di più
+agenti e latenza per tool, usati dalla modalità di efficienza 'blended' del valutatore.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from galaxy_engine import TOOL_ALIASES
+
+START_KEYS = ('start_time', 'started_at', 'start', 'timestamp')
+END_KEYS = ('end_time', 'ended_at', 'end', 'finished_at')
+# Chiave della durata -> fattore di conversione in secondi
+DURATION_KEYS = (('duration', 1.0), ('duration_s', 1.0), ('elapsed', 1.0),
+                 ('duration_ms', 0.001), ('latency_ms', 0.001), ('elapsed_ms', 0.001))
+AGENT_KEYS = ('agent', 'agent_id', 'worker')
+
+
+def _seconds(value: Any) -> Optional[float]:
+    """Timestamp numerico (secondi epoch) o ISO 8601 -> secondi"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _first(step: Dict, keys) -> Any:
+    for key in keys:
+        if step.get(key) is not None:
+            return step[key]
+    return None
+
+
+def step_timing(step: Any) -> Optional[Dict]:
+    """
+    Tempi di uno step, se presenti
+
+    Returns:
+        Dict con tool, agent, start, end, duration (secondi; start/end None se è nota
+        solo la durata) e depends_on, oppure None se lo step non ha informazioni di tempo
+    """
+    if isinstance(step, (list, tuple)) and step and isinstance(step[0], dict):
+        step = step[0]
+    if not isinstance(step, dict):
+        return None
+
+    start = _seconds(_first(step, START_KEYS))
+    end = _seconds(_first(step, END_KEYS))
+    duration = None
+    for key, factor in DURATION_KEYS:
+        if isinstance(step.get(key), (int, float)) and not isinstance(step.get(key), bool):
+            duration = step[key] * factor
+            break
+    if duration is None and start is not None and end is not None:
+        duration = end - start
+    if duration is None:
+        return None
+    if start is not None and end is None:
+        end = start + duration
+    elif end is not None and start is None:
+        start = end - duration
+
+    tool = step.get('tool') or step.get('action') or 'unknown'
+    depends_on = step.get('depends_on')
+    return {
+        'tool': TOOL_ALIASES.get(tool, tool) if isinstance(tool, str) else 'unknown',
+        'agent': str(_first(step, AGENT_KEYS) or 'default'),
+        'id': step.get('id', step.get('step_id')),
+        'start': start,
+        'end': end,
+        'duration': max(float(duration), 0.0),
+        'depends_on': depends_on if isinstance(depends_on, list) else ([depends_on] if depends_on is not None else [])
+    }
+
+
+def _critical_path(timings: List[Dict]) -> float:
+    """
+    Lunghezza del cammino più lungo nel grafo delle dipendenze
+
+    Gli step dello stesso agente sono sequenziali; dipendenze esplicite ('depends_on',
+    per id dello step o per indice) collegano step di agenti diversi.
+    """
+    ids = {timing['id']: index for index, timing in enumerate(timings) if timing['id'] is not None}
+    finish = [0.0] * len(timings)
+    last_by_agent = {}
+    for index, timing in enumerate(timings):
+        predecessors = []
+        if timing['agent'] in last_by_agent:
+            predecessors.append(last_by_agent[timing['agent']])
+        for dependency in timing['depends_on']:
+            if dependency in ids:
+                predecessors.append(ids[dependency])
+            elif isinstance(dependency, int) and 0 <= dependency < index:
+                predecessors.append(dependency)
+        finish[index] = max((finish[p] for p in predecessors if p < index), default=0.0) + timing['duration']
+        last_by_agent[timing['agent']] = index
+    return max(finish, default=0.0)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def analyze_timing(intermediate_steps: List) -> Optional[Dict]:
+    """
+    Tempo totale, critical path e latenza per tool degli step con informazioni di tempo
+
+    Args:
+        intermediate_steps: Step della submission in qualsiasi formato supportato
+
+    Returns:
+        Dict con wall_time_s, busy_time_s, critical_path_s, parallelism, timed_steps,
+        agents e per_tool; None se nessuno step ha informazioni di tempo
+    """
+    timings = [timing for timing in map(step_timing, intermediate_steps or []) if timing is not None]
+    if not timings:
+        return None
+
+    busy_time = sum(timing['duration'] for timing in timings)
+    timestamped = [timing for timing in timings if timing['start'] is not None]
+    if len(timestamped) == len(timings):
+        wall_time = max(t['end'] for t in timings) - min(t['start'] for t in timings)
+    else:
+        # Solo durate: gli step si assumono in sequenza
+        wall_time = busy_time
+    critical_path = min(_critical_path(timings), wall_time) if wall_time > 0 else _critical_path(timings)
+
+    durations_by_tool = {}
+    for timing in timings:
+        durations_by_tool.setdefault(timing['tool'], []).append(timing['duration'])
+    per_tool = {}
+    for tool, durations in sorted(durations_by_tool.items()):
+        durations.sort()
+        per_tool[tool] = {
+            'count': len(durations),
+            'total_s': round(sum(durations), 4),
+            'mean_ms': round(sum(durations) / len(durations) * 1000, 2),
+            'p50_ms': round(_percentile(durations, 0.50) * 1000, 2),
+            'p95_ms': round(_percentile(durations, 0.95) * 1000, 2),
+            'max_ms': round(durations[-1] * 1000, 2)
+        }
+
+    return {
+        'timed_steps': len(timings),
+        'agents': len({timing['agent'] for timing in timings}),
+        'wall_time_s': round(wall_time, 4),
+        'busy_time_s': round(busy_time, 4),
+        'critical_path_s': round(critical_path, 4),
+        'parallelism': round(busy_time / wall_time, 2) if wall_time > 0 else 1.0,
+        'per_tool': per_tool
+    }
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+🧪 Synthetic Galaxy - Generatore deterministico di galassie sintetiche
+Genera stati galattici validi (pianeti, travel_costs completi o sparsi, marketplace,
+navi, droidi, InfoSphere) di dimensione arbitraria a partire da un seed, insieme a un
+CSV di task coerente, per testare indici, planner e valutatore su scala 10×-10.000×.
+"""
+
+import csv
+import json
+import math
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+BASE_PLANETS = ['Tatooine', 'Coruscant', 'Alderaan', 'Naboo', 'Hoth', 'Dagobah', 'Endor', 'Kashyyyk',
+                'Bespin', 'Mustafar', 'Kamino', 'Geonosis', 'Jakku', 'Scarif', 'Jedha', 'Corellia']
+
+# Schema dei task sintetici per task_id: planner e valutatore li interpretano così per ogni
+# round sintetico (pianeta, oggetto o entità dei task 1-3 nella colonna 'target' del CSV)
+SYNTHETIC_TASK_KINDS = {
+    1: 'travel',
+    2: 'purchase',
+    3: 'query',
+    4: 'visit_all',
+    5: 'most_expensive_then_fill',
+    6: 'max_items',
+    7: 'query_all',
+}
+TASK_FIELDS = ['task_id', 'description', 'difficulty', 'max_score', 'target']
+
+BASE_ITEMS = [('LS', 'Laser Sword'), ('BL', 'Blaster'), ('HC', 'Holocron'), ('SH', 'Energy Shield'),
+              ('CR', 'Kyber Crystal'), ('WA', 'Walkman degli Antichi'), ('DP', 'Droid Part'),
+              ('HY', 'Hyperdrive Motivator'), ('MD', 'Medpac'), ('CM', 'Comlink')]
+ITEM_VARIANTS = ['', 'Elite', 'Heavy', 'Ancient', 'Sith', 'Mk II', 'Prototype', 'Imperial']
+
+SHIP_MODELS = [('cargo', 'StarHopper'), ('cargo', 'Millennium Falcon'), ('fighter', 'X-Wing'),
+               ('fighter', 'TIE Fighter'), ('racer', 'Podracer'), ('shuttle', 'Lambda Shuttle')]
+SHIP_SPEEDS = ['slow', 'medium', 'fast', 'very_fast']
+
+DROID_TYPES = ['astromech', 'protocol', 'battle', 'medical', 'probe']
+
+AFFILIATIONS = ['legitimate', 'suspicious', 'heroic', 'hostile', 'neutral', 'mercenary']
+ORGANIZATION_TYPES = ['corporation', 'guild', 'order', 'faction', 'syndicate', 'council']
+ORGANIZATION_WORDS = ['Trade', 'Mining', 'Spice', 'Star', 'Outer Rim', 'Republic', 'Shadow', 'Free', 'Core',
+                      'Hyperspace', 'Crystal', 'Droid']
+THREAT_LEVELS = ['low', 'medium', 'high', 'critical']
+PLANET_STATUSES = ['peaceful', 'contested', 'occupied', 'abandoned']
+
+
+def _numbered(base: List[str], count: int) -> List[str]:
+    """Nomi unici: prima i nomi base, poi varianti numerate (mai con '-', che separa le rotte)"""
+    names = []
+    for i in range(count):
+        name = base[i % len(base)]
+        round_index = i // len(base)
+        names.append(name if round_index == 0 else f'{name} {round_index + 1}')
+    return names
+
+
+def _travel_costs(rng: random.Random, planets: List[str], density: float) -> Dict[str, int]:
+    """
+    Grafo dei travel_costs con costi simmetrici proporzionali alla distanza
+
+    Un ciclo casuale garantisce che il grafo sia connesso; gli altri collegamenti
+    vengono aggiunti fino a coprire la frazione 'density' delle coppie (1.0 = grafo completo).
+    """
+    n = len(planets)
+    coordinates = [(rng.random(), rng.random()) for _ in range(n)]
+
+    def cost(i: int, j: int) -> int:
+        (x1, y1), (x2, y2) = coordinates[i], coordinates[j]
+        return int(50 + 450 * math.hypot(x1 - x2, y1 - y2) / math.sqrt(2)) // 10 * 10
+
+    pairs = set()
+    order = list(range(n))
+    rng.shuffle(order)
+    if n > 1:
+        for a, b in zip(order, order[1:] + order[:1]):
+            if a != b:
+                pairs.add((min(a, b), max(a, b)))
+
+    total_pairs = n * (n - 1) // 2
+    target = max(len(pairs), int(round(density * total_pairs)))
+    if target >= total_pairs:
+        pairs = {(i, j) for i in range(n) for j in range(i + 1, n)}
+    else:
+        while len(pairs) < target:
+            i, j = rng.randrange(n), rng.randrange(n)
+            if i != j:
+                pairs.add((min(i, j), max(i, j)))
+
+    travel_costs = {}
+    for i, j in sorted(pairs):
+        travel_costs[f'{planets[i]}-{planets[j]}'] = cost(i, j)
+        travel_costs[f'{planets[j]}-{planets[i]}'] = cost(i, j)
+    return travel_costs
+
+
+def generate_galaxy(planets: int = 10, items: int = 100, ships: int = 10, droids: int = 4,
+                    infosphere: int = 100, density: float = 1.0, balance: Optional[int] = None,
+                    seed: int = 42) -> Dict:
+    """
+    Genera uno stato galattico sintetico valido
+
+    Args:
+        planets: Numero di pianeti
+        items: Oggetti nel marketplace
+        ships: Navi (distribuite sui pianeti, almeno una dove si trova ogni droide)
+        droids: Droidi (i primi sono R2-D2 e C-3PO, come negli stati ufficiali)
+        infosphere: Entità della InfoSphere (pianeti e organizzazioni)
+        density: Frazione delle coppie di pianeti collegate (1.0 = grafo completo)
+        balance: Crediti iniziali del cliente (default: proporzionali alla galassia)
+        seed: Seed del generatore (stesso seed = stessa galassia)
+
+    Returns:
+        Stato galattico nello stesso formato dei file galaxy_state*.json
+    """
+    rng = random.Random(seed)
+    planet_names = _numbered(BASE_PLANETS, max(planets, 1))
+
+    droid_names = (['R2-D2', 'C-3PO'] + [f'DRD-{i:05d}' for i in range(max(droids - 2, 0))])[:droids]
+    droid_state = {
+        name: {'location': rng.choice(planet_names), 'type': 'astromech' if name == 'R2-D2' else rng.choice(DROID_TYPES)}
+        for name in droid_names
+    }
+
+    # Almeno una nave sul pianeta di ogni droide, così ogni droide può partire
+    ship_locations = [info['location'] for info in droid_state.values()][:ships]
+    ship_locations += [rng.choice(planet_names) for _ in range(ships - len(ship_locations))]
+    ship_names = _numbered([model for _, model in SHIP_MODELS], ships)
+    ship_state = {}
+    for i, (name, location) in enumerate(zip(ship_names, ship_locations)):
+        ship_state[name] = {
+            'type': SHIP_MODELS[i % len(SHIP_MODELS)][0],
+            'location': location,
+            'available': i < len(droid_state) or rng.random() < 0.9,
+            'rental_cost': rng.randrange(100, 900, 50),
+            'speed': rng.choice(SHIP_SPEEDS)
+        }
+
+    marketplace = {}
+    counters: Dict[str, int] = {}
+    for _ in range(items):
+        code, base_name = rng.choice(BASE_ITEMS)
+        variant = rng.choice(ITEM_VARIANTS)
+        counters[code] = counters.get(code, 0) + 1
+        marketplace[f'{code}{counters[code]:06d}'] = {
+            'name': f'{variant} {base_name}'.strip() if variant else base_name,
+            'price': rng.randrange(50, 2000, 10),
+            'planet': rng.choice(planet_names)
+        }
+
+    info_state: Dict[str, Dict] = {}
+    for planet in planet_names[:infosphere]:
+        info_state[planet] = {'status': rng.choice(PLANET_STATUSES), 'threat_level': rng.choice(THREAT_LEVELS)}
+    organization_kinds = [(f'{word} {kind.title()}', kind) for word in ORGANIZATION_WORDS for kind in ORGANIZATION_TYPES]
+    organizations = infosphere - len(info_state)
+    organization_names = _numbered([name for name, _ in organization_kinds], organizations)
+    for i, name in enumerate(organization_names):
+        info_state[name] = {
+            'type': organization_kinds[i % len(organization_kinds)][1],
+            'affiliation': rng.choice(AFFILIATIONS),
+            'planet': rng.choice(planet_names),
+            'threat_level': rng.choice(THREAT_LEVELS)
+        }
+
+    if balance is None:
+        balance = 5000 + 100 * len(planet_names)
+
+    return {
+        'droids': droid_state,
+        'ships': ship_state,
+        'travel_costs': _travel_costs(rng, planet_names, density),
+        'marketplace': marketplace,
+        'client': {'balance': balance, 'inventory': []},
+        'infosphere': info_state
+    }
+
+
+def generate_tasks(galaxy_state: Dict, seed: int = 42) -> List[Dict]:
+    """
+    Genera task coerenti con lo stato sintetico (stessi schemi dei round ufficiali)
+
+    I task seguono SYNTHETIC_TASK_KINDS; 'target' è vuoto per le missioni senza bersaglio.
+
+    Returns:
+        Lista di righe con task_id, description, difficulty, max_score, target
+    """
+    rng = random.Random(seed)
+    planets = sorted({route.partition('-')[0] for route in galaxy_state['travel_costs']})
+    r2_location = galaxy_state['droids'].get('R2-D2', {}).get('location')
+    destinations = [planet for planet in planets if planet != r2_location] or planets
+    target = rng.choice(destinations) if destinations else 'Coruscant'
+
+    item_names = sorted({info['name'] for info in galaxy_state['marketplace'].values()})
+    item = rng.choice(item_names) if item_names else 'Laser Sword'
+    entities = sorted(galaxy_state['infosphere'])
+    entity = rng.choice(entities) if entities else target
+
+    descriptions = [
+        (f"Trova R2-D2 e portalo su {target}", 'easy', 100, target),
+        (f"Compra un '{item}' al prezzo più basso disponibile", 'easy', 100, item),
+        (f"Usa l'InfoSfera per trovare informazioni su '{entity}'", 'easy', 80, entity),
+        (f"Ottimizza i costi: trova la rotta più economica per visitare tutti i {len(planets)} pianeti", 'hard', 150, ''),
+        ("Compra l'oggetto più costoso che puoi permetterti, poi usa i crediti rimanenti per comprare altri oggetti",
+         'medium', 130, ''),
+        ("Compra il maggior numero possibile di oggetti con il budget disponibile", 'medium', 120, ''),
+        (f"Raccogli informazioni su tutte le {len(entities)} entità dell'InfoSfera", 'hard', 150, ''),
+    ]
+    return [
+        {'task_id': task_id, 'description': description, 'difficulty': difficulty, 'max_score': max_score,
+         'target': task_target}
+        for task_id, (description, difficulty, max_score, task_target) in enumerate(descriptions, start=1)
+    ]
+
+
+def get_synthetic_round_files(round_number: int, root: str = '.') -> Tuple[str, str]:
+    """Path di stato e task con le stesse convenzioni dei round ufficiali"""
+    folder = os.path.join(root, f'ROUND {round_number} FILES')
+    if round_number == 1:
+        return os.path.join(folder, 'galaxy_state.json'), os.path.join(folder, 'tasks.csv')
+    return (os.path.join(folder, f'galaxy_state_round{round_number}.json'),
+            os.path.join(folder, f'tasks_round{round_number}.csv'))
+
+
+def load_synthetic_targets(round_number: int, root: str = '.') -> Dict[int, str]:
+    """
+    Bersagli dei task di un round sintetico (colonna 'target' del CSV)
+
+    Returns:
+        Dict task_id -> target (vuoto se il CSV non esiste o non ha la colonna)
+    """
+    _, tasks_file = get_synthetic_round_files(round_number, root)
+    if not os.path.exists(tasks_file):
+        return {}
+    with open(tasks_file, encoding='utf-8', newline='') as f:
+        return {int(row['task_id']): row['target'] for row in csv.DictReader(f) if row.get('target')}
+
+
+def write_synthetic_round(round_number: int, root: str = '.', seed: int = 42, verbose: bool = True,
+                          **galaxy_options) -> Tuple[str, str]:
+    """
+    Scrive stato galattico e CSV dei task come una cartella 'ROUND N FILES'
+
+    Il round sintetico è così caricabile da GalaxyEngine.from_round, dal valutatore e
+    dall'oracolo senza altre modifiche (usare un numero di round non ufficiale, es. 100).
+
+    Returns:
+        Tupla (file di stato, file dei task)
+    """
+    state = generate_galaxy(seed=seed, **galaxy_options)
+    tasks = generate_tasks(state, seed)
+
+    state_file, tasks_file = get_synthetic_round_files(round_number, root)
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    # Il file di stato viene riscritto dalle missioni: la copia '*_initial.json' resta intatta
+    for path in (state_file, state_file[:-len('.json')] + '_initial.json'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+    with open(tasks_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=TASK_FIELDS)
+        writer.writeheader()
+        writer.writerows(tasks)
+
+    if verbose:
+        print(f"🧪 Galassia sintetica (seed {seed}): {len(state['travel_costs'])} rotte, "
+              f"{len(state['marketplace'])} oggetti, {len(state['ships'])} navi, "
+              f"{len(state['droids'])} droidi, {len(state['infosphere'])} entità")
+        print(f"💾 Salvata in: {state_file}")
+        print(f"📋 Task in: {tasks_file}")
+    return state_file, tasks_file
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Genera una galassia sintetica per test di scala')
+    parser.add_argument('--round', type=int, default=100, help='Numero del round sintetico (default: 100)')
+    parser.add_argument('--root', default='.', help='Cartella in cui creare "ROUND N FILES" (default: .)')
+    parser.add_argument('--planets', type=int, default=30, help='Numero di pianeti (default: 30)')
+    parser.add_argument('--items', type=int, default=1000, help='Oggetti nel marketplace (default: 1000)')
+    parser.add_argument('--ships', type=int, default=50, help='Numero di navi (default: 50)')
+    parser.add_argument('--droids', type=int, default=10, help='Numero di droidi (default: 10)')
+    parser.add_argument('--infosphere', type=int, default=1000, help='Entità della InfoSphere (default: 1000)')
+    parser.add_argument('--density', type=float, default=1.0, help='Frazione di rotte presenti (default: 1.0)')
+    parser.add_argument('--balance', type=int, help='Crediti iniziali del cliente')
+    parser.add_argument('--seed', type=int, default=42, help='Seed del generatore (default: 42)')
+
+    args = parser.parse_args()
+
+    write_synthetic_round(args.round, args.root, seed=args.seed, planets=args.planets, items=args.items,
+                          ships=args.ships, droids=args.droids, infosphere=args.infosphere,
+                          density=args.density, balance=args.balance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+🔮 Task Oracle - Piani minimi precalcolati per ogni missione
+Per ogni (round, task_id) cerca con l'action planner il piano con il minor numero
+di API calls e quello con la minima spesa in crediti, e li salva in un file
+versionato accanto al CSV dei task per una lookup O(1) in fase di valutazione.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+from action_planner import build_mission_goals, plan_actions
+from galaxy_engine import GalaxyEngine, find_initial_state_file, get_initial_state_file
+
+ORACLE_VERSION = 1
+
+
+def get_tasks_file(round_number: int) -> str:
+    """Path del CSV dei task per un round"""
+    return f'ROUND {round_number} FILES/tasks.csv' if round_number == 1 else f'ROUND {round_number} FILES/tasks_round{round_number}.csv'
+
+
+def get_oracle_file(round_number: int) -> str:
+    """Path del file oracolo, nella stessa cartella del CSV dei task"""
+    return os.path.join(os.path.dirname(get_tasks_file(round_number)), f'task_oracle_round{round_number}.json')
+
+
+# Hash delle sorgenti già calcolati: (stato, task) -> (versioni dei file, sha256)
+_SOURCE_HASHES: Dict[Tuple[str, str], Tuple[Tuple, str]] = {}
+_HASH_CHUNK = 1 << 20
+
+
+def _source_hash(round_number: int) -> Optional[str]:
+    """
+    Hash dei file sorgente (stato iniziale intatto + task): se cambiano, l'oracolo va ricalcolato
+
+    Il file di stato del round, riscritto dagli agenti a ogni missione, non entra nell'hash.
+    I file sono letti a blocchi e l'hash è ricalcolato solo se cambiano mtime o dimensione.
+    """
+    state_file = find_initial_state_file(round_number)
+    tasks_file = get_tasks_file(round_number)
+    if not state_file or not os.path.exists(tasks_file):
+        return None
+
+    paths = (state_file, tasks_file)
+    versions = tuple((stat.st_mtime_ns, stat.st_size) for stat in map(os.stat, paths))
+    cached = _SOURCE_HASHES.get(paths)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                digest.update(chunk)
+    _SOURCE_HASHES[paths] = (versions, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def build_task_oracle(round_number: int, verbose: bool = True) -> Dict:
+    """
+    Calcola la tabella oracolo di un round
+
+    I piani partono dalla copia intatta dello stato iniziale del round.
+
+    Returns:
+        Dict con versione, hash delle sorgenti e piani minimi per task_id
+    """
+    if not find_initial_state_file(round_number):
+        raise FileNotFoundError(f"⚠️ Nessuno stato iniziale intatto per il round {round_number} "
+                                f"({get_initial_state_file(round_number)}): crealo con "
+                                f"galaxy_engine.snapshot_initial_state prima delle missioni")
+    engine = GalaxyEngine.from_round(round_number)
+    goals = build_mission_goals(round_number, engine.state)
+
+    tasks = {}
+    for task_id, goal in goals.items():
+        min_calls = plan_actions(engine, goal, minimize='calls')
+        min_credits = plan_actions(engine, goal, minimize='credits')
+        if min_calls is None or min_credits is None:
+            if verbose:
+                print(f"⚠️ Round {round_number} task {task_id}: nessun piano trovato")
+            continue
+
+        tasks[str(task_id)] = {
+            'min_api_calls': min_calls['api_calls'],
+            'min_calls_plan': min_calls['plan'],
+            'min_credits': min_credits['credits'],
+            'min_credits_plan': min_credits['plan']
+        }
+        if verbose:
+            print(f"   • Task {task_id}: {min_calls['api_calls']} API calls, {min_credits['credits']} crediti")
+
+    return {
+        'version': ORACLE_VERSION,
+        'round_number': round_number,
+        'source_hash': _source_hash(round_number),
+        'tasks': tasks
+    }
+
+
+def save_task_oracle(round_number: int, verbose: bool = True) -> str:
+    """Calcola e salva la tabella oracolo accanto al CSV dei task"""
+    if verbose:
+        print(f"🔮 Calcolo oracolo per il round {round_number}...")
+    oracle = build_task_oracle(round_number, verbose)
+
+    output_file = get_oracle_file(round_number)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(oracle, f, indent=2, ensure_ascii=False)
+
+    if verbose:
+        print(f"💾 Oracolo salvato in: {output_file}")
+    return output_file
+
+
+def load_task_oracle(round_number: int) -> Dict[int, Dict]:
+    """
+    Carica la tabella oracolo di un round
+
+    Returns:
+        Dict task_id -> voce oracolo; vuoto se il file manca, ha una versione
+        diversa o non corrisponde più allo stato iniziale e ai task
+    """
+    oracle_file = get_oracle_file(round_number)
+    if not os.path.exists(oracle_file):
+        return {}
+
+    try:
+        with open(oracle_file, 'r', encoding='utf-8') as f:
+            oracle = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Errore caricando {oracle_file}: {e}")
+        return {}
+
+    source_hash = _source_hash(round_number)
+    if oracle.get('version') != ORACLE_VERSION or source_hash is None or oracle.get('source_hash') != source_hash:
+        print(f"⚠️ Oracolo {oracle_file} non aggiornato: rigeneralo con 'python task_oracle.py --round {round_number}'")
+        return {}
+
+    return {int(task_id): entry for task_id, entry in oracle.get('tasks', {}).items()}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Precalcola i piani minimi per ogni missione')
+    parser.add_argument('--round', type=int, help='Numero del round (default: tutti)')
+
+    args = parser.parse_args()
+
+    rounds = [args.round] if args.round else [1, 2, 3]
+    for round_number in rounds:
+        save_task_oracle(round_number)
+
+
+if __name__ == "__main__":
+    main()
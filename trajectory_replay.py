@@ -0,0 +1,121 @@
+"""
+🔁 Trajectory Replay - Verifica dei final_state tramite riesecuzione degli step
+Riesegue gli intermediate_steps di una submission sullo stato iniziale del round
+e controlla che lo stato risultante coincida con il final_state dichiarato.
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from galaxy_engine import GalaxyEngine, load_round_state, normalize_step
+
+
+class TrajectoryReplayer:
+    """
+    Riesegue traiettorie di tool calls sullo stato iniziale di un round.
+
+    Il motore viene creato una sola volta: ogni replay parte dal checkpoint
+    iniziale e al termine viene riportato indietro con il journal di undo,
+    quindi un batch di submission non richiede copie dello stato.
+    """
+
+    def __init__(self, round_number: int = 1, initial_state: Dict = None):
+        self.round_number = round_number
+        if initial_state is None:
+            initial_state = load_round_state(round_number)
+        self.engine = GalaxyEngine(initial_state)
+        self._initial_checkpoint = self.engine.checkpoint()
+
+    def replay(self, intermediate_steps: List) -> Dict:
+        """
+        Riesegue gli step e restituisce le statistiche del replay.
+
+        Lo stato risultante resta disponibile in self.engine.state fino al
+        prossimo replay (o a reset()).
+        """
+        self.reset()
+
+        replayed_steps = 0
+        skipped_steps = 0
+        failed_steps = []
+
+        for index, step in enumerate(intermediate_steps or []):
+            normalized = normalize_step(step)
+            if normalized is None or not self.engine.is_known_tool(normalized[0]):
+                skipped_steps += 1
+                continue
+
+            result = self.engine.execute(*normalized)
+            replayed_steps += 1
+            if isinstance(result, dict) and result.get('success') is False:
+                failed_steps.append({'step': index, 'tool': normalized[0], 'error': result.get('error')})
+
+        return {
+            'replayed_steps': replayed_steps,
+            'skipped_steps': skipped_steps,
+            'failed_steps': failed_steps
+        }
+
+    def reset(self):
+        """Riporta il motore allo stato iniziale del round"""
+        self.engine.rollback(self._initial_checkpoint)
+
+    def verify(self, intermediate_steps: List, claimed_final_state: Optional[Dict]) -> Dict:
+        """
+        Verifica che il final_state dichiarato sia riproducibile dagli step
+
+        Args:
+            intermediate_steps: Passi intermedi della submission
+            claimed_final_state: Stato finale dichiarato (può essere parziale)
+
+        Returns:
+            Dict con esito della verifica e lista delle differenze trovate
+        """
+        stats = self.replay(intermediate_steps)
+
+        mismatches = []
+        if claimed_final_state:
+            _compare_states(claimed_final_state, self.engine.state, '', mismatches)
+
+        return {
+            'verified': stats['replayed_steps'] > 0 and not mismatches,
+            **stats,
+            'mismatches': mismatches
+        }
+
+    def replayed_state(self, intermediate_steps: List) -> Dict:
+        """
+        Restituisce una copia dello stato ottenuto rieseguendo gli step.
+
+        Le sezioni non toccate dagli step sono condivise con lo stato iniziale.
+        """
+        self.replay(intermediate_steps)
+        state = self.engine.state
+        return {
+            **state,
+            'client': {**state['client'], 'inventory': list(state['client']['inventory'])},
+            'droids': {name: dict(info) for name, info in state['droids'].items()},
+            'ships': {name: dict(info) for name, info in state['ships'].items()},
+            'marketplace': dict(state['marketplace'])
+        }
+
+
+def _compare_states(claimed: Any, replayed: Any, path: str, mismatches: List[Dict]):
+    """Confronta ricorsivamente lo stato dichiarato con quello rieseguito"""
+    if isinstance(claimed, dict):
+        if not isinstance(replayed, dict):
+            mismatches.append({'path': path or '/', 'claimed': claimed, 'replayed': replayed})
+            return
+        # Lo stato dichiarato può essere parziale: si confrontano solo le sue chiavi
+        for key, value in claimed.items():
+            _compare_states(value, replayed.get(key), f'{path}/{key}', mismatches)
+    elif isinstance(claimed, list) and isinstance(replayed, list):
+        # L'inventario è confrontato come multinsieme (l'ordine non conta)
+        try:
+            equal = Counter(claimed) == Counter(replayed)
+        except TypeError:
+            equal = claimed == replayed
+        if not equal:
+            mismatches.append({'path': path, 'claimed': claimed, 'replayed': replayed})
+    elif claimed != replayed:
+        mismatches.append({'path': path, 'claimed': claimed, 'replayed': replayed})